@@ -0,0 +1,193 @@
+# agent_config.py
+from contextlib import contextmanager
+from typing import Any, Dict, Optional
+import json
+import os
+import threading
+
+try:
+    import fcntl
+except ImportError:  # Windows: updates are only serialized within one process
+    fcntl = None
+
+AGENT_FIELDS = ("role", "goal", "backstory")
+TASK_FIELDS = ("description", "expected_output")
+
+# crewai keeps the un-interpolated prompt in these private attributes and
+# restores from them on every kickoff, so clones must drop the stale copies.
+ORIGINAL_ATTRIBUTES = (
+    "_original_role", "_original_goal", "_original_backstory",
+    "_original_description", "_original_expected_output"
+)
+
+
+class ConfigVersionConflict(Exception):
+    pass
+
+
+class ConfigSnapshot:
+    """One immutable generation of agents and tasks; swapped as a whole on change."""
+
+    __slots__ = ("version", "agents", "tasks", "overrides")
+
+    def __init__(self, version: int, agents: Dict[str, Any], tasks: Dict[str, Any], overrides: Dict[str, Dict[str, str]]):
+        self.version = version
+        self.agents = agents
+        self.tasks = tasks
+        self.overrides = overrides
+
+
+class AgentConfigStore:
+    """Versioned prompt overrides for the agents and tasks built in agents.py/tasks.py.
+
+    Overrides live in a JSON file ({"version": N, "overrides": {name: {field: value}}})
+    written atomically. Every change bumps the version and builds a new
+    ConfigSnapshot of Agent/Task clones, which replaces the previous one in a
+    single assignment, so a request holding a snapshot never sees a half-applied
+    update. Updates hold an flock on "<path>.lock" from re-reading the file to
+    writing it, so workers sharing the file cannot both publish the same
+    version. Other processes pick the change up on their next current() call,
+    which compares the file's mtime, size and inode, and rebuild whenever the
+    file's version or overrides differ from their snapshot.
+    """
+
+    def __init__(self, path: str, agents: Dict[str, Any], tasks: Dict[str, Any]):
+        self.path = path
+        self.base_agents = agents
+        self.base_tasks = tasks
+        # Which agent each task runs on, so task clones follow agent clones
+        agent_names = {id(agent): name for name, agent in agents.items()}
+        self.task_agents = {
+            name: agent_names.get(id(getattr(task, "agent", None))) for name, task in tasks.items()
+        }
+        # Captured before any kickoff interpolates the live objects
+        self._defaults = {
+            **{name: {field: getattr(agent, field) for field in AGENT_FIELDS} for name, agent in agents.items()},
+            **{name: {field: getattr(task, field) for field in TASK_FIELDS} for name, task in tasks.items()}
+        }
+        self._lock = threading.RLock()
+        self._lock_path = f"{path}.lock"
+        self._stamp = None
+        self._snapshot = self._build(0, {})
+        self.reload()
+
+    def current(self) -> ConfigSnapshot:
+        self._reload_if_changed()
+        return self._snapshot
+
+    @property
+    def version(self) -> int:
+        return self.current().version
+
+    def defaults(self, name: str) -> Dict[str, str]:
+        return dict(self._defaults[name])
+
+    def values(self, name: str) -> Dict[str, str]:
+        return {**self.defaults(name), **self.current().overrides.get(name, {})}
+
+    def fields(self, name: str) -> tuple:
+        if name in self.base_agents:
+            return AGENT_FIELDS
+        if name in self.base_tasks:
+            return TASK_FIELDS
+        raise KeyError(name)
+
+    def update(self, name: str, changes: Dict[str, Optional[str]], expected_version: Optional[int] = None) -> ConfigSnapshot:
+        """Apply non-empty changes to one agent/task and publish a new version."""
+        allowed = self.fields(name)
+        with self._exclusive():
+            self._load()
+            snapshot = self._snapshot
+            if expected_version is not None and expected_version != snapshot.version:
+                raise ConfigVersionConflict(
+                    f"Config is at version {snapshot.version}, not {expected_version}"
+                )
+            overrides = {key: dict(value) for key, value in snapshot.overrides.items()}
+            entry = overrides.setdefault(name, {})
+            for field, value in changes.items():
+                if field in allowed and value:
+                    entry[field] = value
+            return self._publish(snapshot.version + 1, overrides)
+
+    def reset(self) -> ConfigSnapshot:
+        with self._exclusive():
+            self._load()
+            return self._publish(self._snapshot.version + 1, {})
+
+    def reload(self) -> None:
+        with self._lock:
+            self._load()
+
+    @contextmanager
+    def _exclusive(self):
+        """Hold the thread lock and, where available, an flock shared by every process."""
+        with self._lock:
+            if fcntl is None:
+                yield
+                return
+            with open(self._lock_path, "a") as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _file_stamp(self) -> Optional[tuple]:
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+    def _reload_if_changed(self) -> None:
+        if self._file_stamp() != self._stamp:
+            with self._lock:
+                self._load()
+
+    def _load(self) -> None:
+        self._stamp = self._file_stamp()
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            self._stamp = None
+            return
+        version, overrides = data.get("version", 0), data.get("overrides", {})
+        # Compare contents too: a same-numbered version from another writer must still win
+        if version != self._snapshot.version or overrides != self._snapshot.overrides:
+            self._snapshot = self._build(version, overrides)
+
+    def _publish(self, version: int, overrides: Dict[str, Dict[str, str]]) -> ConfigSnapshot:
+        snapshot = self._build(version, overrides)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": version, "overrides": overrides}, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+        self._stamp = self._file_stamp()
+        self._snapshot = snapshot
+        return snapshot
+
+    def _build(self, version: int, overrides: Dict[str, Dict[str, str]]) -> ConfigSnapshot:
+        agents = {
+            name: self._clone(agent, self._defaults[name], overrides.get(name, {}))
+            for name, agent in self.base_agents.items()
+        }
+        tasks = {}
+        for name, task in self.base_tasks.items():
+            changes = dict(overrides.get(name, {}))
+            agent_name = self.task_agents.get(name)
+            if agent_name and agents[agent_name] is not self.base_agents[agent_name]:
+                changes["agent"] = agents[agent_name]
+            tasks[name] = self._clone(task, self._defaults[name], changes)
+        return ConfigSnapshot(version, agents, tasks, overrides)
+
+    @staticmethod
+    def _clone(obj: Any, defaults: Dict[str, str], changes: Dict[str, Any]) -> Any:
+        """The import-time object itself when unchanged, else a copy with changes applied."""
+        if not changes:
+            return obj
+        clone = obj.model_copy(update={**defaults, **changes})
+        for attribute in ORIGINAL_ATTRIBUTES:
+            if hasattr(clone, attribute):
+                setattr(clone, attribute, None)
+        return clone
@@ -7,7 +7,7 @@ from tools import PLATFORM_LIMITS
 
 
 PLATFORM_LIMITS = {
-    "twitter": {"chars": None, "words": 280},
+    "twitter": {"chars": None, "words": 280, "graphemes": 280},
     "instagram": {"chars": None, "words": 400},
     "linkedin": {"chars": None, "words": 600},
     "facebook": {"chars": None, "words": 1000},
@@ -22,6 +22,10 @@ load_dotenv()
 os.environ["OPENAI_API_KEY"] = os.getenv("OPENAI_API_KEY")
 os.environ["OPENAI_MODEL_NAME"] = "gpt-4o-mini"
 
+# crewai's own console output for every agent; off unless AGENT_VERBOSE is set.
+# Structured, sampled traces go to the agent_trace logger instead (see logging_config).
+AGENT_VERBOSE = os.getenv("AGENT_VERBOSE", "false").lower() in ("1", "true", "yes")
+
 script_research_agent = Agent(
     role="Script Researcher",
     goal=(
@@ -35,7 +39,7 @@ script_research_agent = Agent(
     ),
     llm="gpt-4o-mini",
     memory=True,
-    verbose=True,
+    verbose=AGENT_VERBOSE,
     tools=[],
     allow_delegation=True
 )
@@ -80,7 +84,7 @@ qc_agent = Agent(
     llm="gpt-4o-mini",  # Default: OPENAI_MODEL_NAME or "gpt-4"
     function_calling_llm=None,  # Optional: Separate LLM for tool calling
     memory=True,  # Default: True
-    verbose=True,  # Default: False
+    verbose=AGENT_VERBOSE,  # Default: False
     tools=[],  # Add tools for text analysis, if needed
     allow_delegation=True
 )
@@ -101,7 +105,7 @@ script_rewriter_agent = Agent(
     llm="gpt-4o-mini",
     function_calling_llm=None,
     memory=True,
-    verbose=True,
+    verbose=AGENT_VERBOSE,
     tools=[],
     allow_delegation=True
 )
@@ -152,7 +156,7 @@ linkedin_agent = Agent(
         "formatting": "Use line breaks for readability",
     },
     memory=True,
-    verbose=True,
+    verbose=AGENT_VERBOSE,
     tools=[]
 )
 
@@ -184,7 +188,7 @@ instagram_agent = Agent(
         "formatting": "Use paragraph breaks for readability",
     },
     memory=True,
-    verbose=True,
+    verbose=AGENT_VERBOSE,
     tools=[]
 )
 
@@ -218,7 +222,7 @@ facebook_agent = Agent(
         "formatting": "Use paragraphs for easy reading",
     },
     memory=True,
-    verbose=True,
+    verbose=AGENT_VERBOSE,
     tools=[]
 )
 
@@ -250,7 +254,7 @@ twitter_agent = Agent(
         "formatting": "Use line breaks strategically",
     },
     memory=True,
-    verbose=True,
+    verbose=AGENT_VERBOSE,
     tools=[]
 )
 
@@ -283,7 +287,7 @@ wordpress_agent = Agent(
         "formatting": "Use headers, lists, and short paragraphs",
     },
     memory=True,
-    verbose=True,
+    verbose=AGENT_VERBOSE,
     tools=[]
 )
 
@@ -319,7 +323,7 @@ youtube_agent = Agent(
         "formatting": "Use timestamps, scene descriptions, and speaker annotations",
     },
     memory=True,
-    verbose=True,
+    verbose=AGENT_VERBOSE,
     tools=[]
 )
 
@@ -354,7 +358,7 @@ tiktok_agent = Agent(
         "formatting": "Use short phrases, bullet points, and emoji-based emphasis",
     },
     memory=True,
-    verbose=True,
+    verbose=AGENT_VERBOSE,
     tools=[]
 )
 
@@ -367,7 +371,7 @@ regenrate_content_agent = Agent(
     - content- If content is regenrate only regenerate the content of the week. The content would be wisdom, ideas, or quotes alond with a line defining the content.""",
     llm="gpt-4o-mini",
     memory=True,
-    verbose=True,
+    verbose=AGENT_VERBOSE,
     tools=[],
     allow_delegation=True
 )
@@ -381,7 +385,7 @@ regenrate_subcontent_agent = Agent(
      - Do not include any JSON formatting, extra newlines, or additional metadata.""",
     llm="gpt-4o-mini",
     memory=True,
-    verbose=True,
+    verbose=AGENT_VERBOSE,
     tools=[],
     allow_delegation=True
 )
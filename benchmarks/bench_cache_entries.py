@@ -0,0 +1,110 @@
+# benchmarks/bench_cache_entries.py
+"""Bytes per cached draft before (live pydantic objects) and after (CompressedPickleCodec).
+
+Run from the repository root:
+    python -m benchmarks.bench_cache_entries [--entries 500] [--output results.json]
+"""
+import argparse
+import json
+import random
+import sys
+import time
+import tracemalloc
+
+from cache import CompressedPickleCodec
+from schemas import ContentItem, WeeklyContent
+
+DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+
+def make_vocabulary(rng: random.Random, size: int = 800) -> list:
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    return ["".join(rng.choice(letters) for _ in range(rng.randint(3, 10))) for _ in range(size)]
+
+
+def make_draft(rng: random.Random, vocabulary: list, weeks: int, items_per_day: int, words_per_item: int) -> dict:
+    """A draft shaped like /extract_content output: {"Week N": WeeklyContent}"""
+    draft = {}
+    for week in range(1, weeks + 1):
+        draft[f"Week {week}"] = WeeklyContent(
+            week=f"Week {week}",
+            content_by_days={
+                day: [
+                    ContentItem(type="text", text=" ".join(rng.choice(vocabulary) for _ in range(words_per_item)))
+                    for _ in range(items_per_day)
+                ]
+                for day in DAYS
+            }
+        )
+    return draft
+
+
+def traced_bytes(build) -> tuple:
+    """Run build() and return (result, bytes still allocated by it)."""
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    result = build()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    allocated = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    return result, allocated
+
+
+def run(entries: int, weeks: int, items_per_day: int, words_per_item: int, seed: int) -> dict:
+    rng = random.Random(seed)
+    vocabulary = make_vocabulary(rng)
+    codec = CompressedPickleCodec()
+
+    drafts, live_bytes = traced_bytes(
+        lambda: [make_draft(rng, vocabulary, weeks, items_per_day, words_per_item) for _ in range(entries)]
+    )
+
+    start = time.perf_counter()
+    encoded = [codec.encode(draft) for draft in drafts]
+    encode_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for data in encoded:
+        codec.decode(data)
+    decode_seconds = time.perf_counter() - start
+
+    json_bytes = sum(
+        len(json.dumps({week: weekly.dict() for week, weekly in draft.items()}).encode("utf-8"))
+        for draft in drafts
+    )
+    encoded_bytes = sum(sys.getsizeof(data) for data in encoded)
+
+    return {
+        "benchmark": "cache_entries",
+        "entries": entries,
+        "shape": {"weeks": weeks, "days": len(DAYS), "items_per_day": items_per_day, "words_per_item": words_per_item},
+        "bytes_per_entry": {
+            "live_objects": live_bytes // entries,
+            "json": json_bytes // entries,
+            "compressed_pickle": encoded_bytes // entries
+        },
+        "reduction": round(live_bytes / encoded_bytes, 2),
+        "encode_us_per_entry": round(encode_seconds / entries * 1e6, 1),
+        "decode_us_per_entry": round(decode_seconds / entries * 1e6, 1)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entries", type=int, default=500)
+    parser.add_argument("--weeks", type=int, default=4)
+    parser.add_argument("--items-per-day", type=int, default=3)
+    parser.add_argument("--words-per-item", type=int, default=60)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Also write the JSON result to this file")
+    args = parser.parse_args()
+
+    result = run(args.entries, args.weeks, args.items_per_day, args.words_per_item, args.seed)
+    print(json.dumps(result, indent=2))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+# benchmarks/bench_extractors.py
+"""Text extraction time per FileProcessor format on synthetic fixtures.
+
+Each format is extracted from a small and a large fixture generated from the
+same seeded text; formats whose writer or reader library is not installed are
+reported as skipped.
+
+Run from the repository root:
+    python -m benchmarks.bench_extractors [--sizes 20,200] [--formats .pdf,.csv] [--output results.json]
+"""
+import argparse
+import json
+import os
+import tempfile
+
+from benchmarks.fixtures import FORMAT_WRITERS, best_of, write_fixture
+
+
+def run(sizes: list, formats: list, repeat: int, seed: int) -> dict:
+    from tools import FileProcessor
+
+    processor = FileProcessor()
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for extension in formats:
+            entries = []
+            for paragraphs in sizes:
+                try:
+                    path = write_fixture(directory, extension, paragraphs, seed)
+                except ImportError as e:
+                    entries.append({"paragraphs": paragraphs, "skipped": f"fixture writer unavailable: {e}"})
+                    continue
+                try:
+                    text = processor.extract_text_from_file(path)
+                    seconds = best_of(repeat, lambda: processor.extract_text_from_file(path))
+                except Exception as e:
+                    entries.append({"paragraphs": paragraphs, "skipped": str(e)})
+                    continue
+                size = os.path.getsize(path)
+                entries.append({
+                    "paragraphs": paragraphs,
+                    "file_bytes": size,
+                    "text_chars": len(text),
+                    "ms": round(seconds * 1e3, 3),
+                    "mb_per_s": round(size / seconds / 1e6, 2) if seconds else None
+                })
+            results[extension] = entries
+    return {"benchmark": "extractors", "repeat": repeat, "formats": results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="20,200", help="Comma-separated fixture sizes in paragraphs")
+    parser.add_argument("--formats", default=",".join(FORMAT_WRITERS), help="Comma-separated extensions")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Also write the JSON result to this file")
+    args = parser.parse_args()
+
+    result = run(
+        [int(size) for size in args.sizes.split(",")],
+        [extension.strip() for extension in args.formats.split(",")],
+        args.repeat,
+        args.seed
+    )
+    print(json.dumps(result, indent=2))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+# benchmarks/bench_post_processing.py
+"""Post-processing cost of a full /generate_custom_scripts run.
+
+Times window selection (generate_unique_content / generate_different_content),
+platform formatting (PostFormatter.format_batch, which replaced
+process_content_for_platform) and extract_title_from_content over every
+(platform, week, day, post) of a run, on a seeded research text.
+
+Run from the repository root:
+    python -m benchmarks.bench_post_processing [--weeks 4] [--posts 3] [--output results.json]
+"""
+import argparse
+import json
+
+from benchmarks.fixtures import DAYS, PLATFORMS, best_of, make_paragraphs
+from formatting import PostFormatter
+from sentences import SentenceIndex
+
+
+def run(paragraphs: int, weeks: int, posts: int, repeat: int, seed: int) -> dict:
+    from agents import PLATFORM_LIMITS
+    from tools import extract_title_from_content, generate_different_content, generate_unique_content
+
+    text = " ".join(make_paragraphs(seed, paragraphs))
+    index = SentenceIndex(text)
+    calls = [
+        (platform, week, day, post)
+        for platform in PLATFORMS
+        for week in range(1, weeks + 1)
+        for day in DAYS
+        for post in range(1, posts + 1)
+    ]
+    formatters = {platform: PostFormatter(platform, PLATFORM_LIMITS[platform]) for platform in PLATFORMS}
+    windows = [generate_different_content(index, week, day, platform, post) for platform, week, day, post in calls]
+    by_platform = {platform: [] for platform in PLATFORMS}
+    for (platform, _, _, _), window in zip(calls, windows):
+        by_platform[platform].append(window)
+    formatted = [post.content for platform in PLATFORMS for post in formatters[platform].format_batch(by_platform[platform])]
+
+    timings = {
+        "sentence_index_build": best_of(repeat, lambda: SentenceIndex(text)),
+        "generate_unique_content": best_of(repeat, lambda: [
+            generate_unique_content(index, week, day, platform) for platform, week, day, _ in calls
+        ]),
+        "generate_different_content": best_of(repeat, lambda: [
+            generate_different_content(index, week, day, platform, post) for platform, week, day, post in calls
+        ]),
+        "format_batch": best_of(repeat, lambda: [
+            formatters[platform].format_batch(by_platform[platform]) for platform in PLATFORMS
+        ]),
+        "extract_title_from_content": best_of(repeat, lambda: [extract_title_from_content(post) for post in formatted]),
+    }
+    return {
+        "benchmark": "post_processing",
+        "text": {"chars": len(text), "sentences": len(index)},
+        "posts": len(calls),
+        "repeat": repeat,
+        "ms_total": {name: round(seconds * 1e3, 3) for name, seconds in timings.items()},
+        "us_per_post": {
+            name: round(seconds / len(calls) * 1e6, 2)
+            for name, seconds in timings.items() if name != "sentence_index_build"
+        }
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--paragraphs", type=int, default=60)
+    parser.add_argument("--weeks", type=int, default=4)
+    parser.add_argument("--posts", type=int, default=3)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Also write the JSON result to this file")
+    args = parser.parse_args()
+
+    result = run(args.paragraphs, args.weeks, args.posts, args.repeat, args.seed)
+    print(json.dumps(result, indent=2))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+# benchmarks/bench_sentence_windows.py
+"""Per-post cost of picking sentence windows: split-per-post vs. a shared SentenceIndex.
+
+Mirrors /generate_custom_scripts: every (platform, week, day, post) draws a
+15-sentence window from the same base text.
+
+Run from the repository root:
+    python -m benchmarks.bench_sentence_windows [--sentences 400] [--output results.json]
+"""
+import argparse
+import json
+import random
+import time
+
+from sentences import DAYS, SentenceIndex, day_index
+
+
+def legacy_window(content: str, week: int, day: str, post_number: int) -> str:
+    """The selection logic generate_different_content used before SentenceIndex."""
+    sentences = content.split('. ')
+    base_idx = ((week - 1) * 5 + ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"].index(day)) % len(sentences)
+    post_offset = (post_number - 1) * 3
+    start_idx = (base_idx + post_offset) % len(sentences)
+    num_sentences = min(15, len(sentences))
+    selected_sentences = sentences[start_idx:start_idx + num_sentences]
+    if len(selected_sentences) < num_sentences:
+        remaining = num_sentences - len(selected_sentences)
+        selected_sentences.extend(sentences[:remaining])
+    return '. '.join(selected_sentences)
+
+
+def indexed_window(index: SentenceIndex, week: int, day: str, post_number: int) -> str:
+    base_idx = ((week - 1) * 5 + day_index(day)) % len(index)
+    return index.window((base_idx + (post_number - 1) * 3) % len(index), 15)
+
+
+def make_text(rng: random.Random, sentences: int, words_per_sentence: int) -> str:
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    vocabulary = ["".join(rng.choice(letters) for _ in range(rng.randint(3, 10))) for _ in range(500)]
+    return " ".join(
+        " ".join(rng.choice(vocabulary) for _ in range(words_per_sentence)).capitalize() + "."
+        for _ in range(sentences)
+    )
+
+
+def run(sentences: int, words_per_sentence: int, platforms: int, weeks: int, posts: int, repeat: int, seed: int) -> dict:
+    text = make_text(random.Random(seed), sentences, words_per_sentence)
+    calls = [
+        (week, day, post)
+        for _ in range(platforms)
+        for week in range(1, weeks + 1)
+        for day in DAYS
+        for post in range(1, posts + 1)
+    ]
+
+    best_legacy = best_indexed = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for week, day, post in calls:
+            legacy_window(text, week, day, post)
+        best_legacy = min(best_legacy, time.perf_counter() - start)
+
+        start = time.perf_counter()
+        index = SentenceIndex(text)
+        for week, day, post in calls:
+            indexed_window(index, week, day, post)
+        best_indexed = min(best_indexed, time.perf_counter() - start)
+
+    start = time.perf_counter()
+    SentenceIndex(text)
+    build_seconds = time.perf_counter() - start
+
+    return {
+        "benchmark": "sentence_windows",
+        "text": {"chars": len(text), "sentences": sentences, "words_per_sentence": words_per_sentence},
+        "posts": len(calls),
+        "index_build_ms": round(build_seconds * 1e3, 3),
+        "us_per_post": {
+            "legacy_split": round(best_legacy / len(calls) * 1e6, 2),
+            "sentence_index": round(best_indexed / len(calls) * 1e6, 2)
+        },
+        "speedup": round(best_legacy / best_indexed, 1)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sentences", type=int, default=400)
+    parser.add_argument("--words-per-sentence", type=int, default=18)
+    parser.add_argument("--platforms", type=int, default=7)
+    parser.add_argument("--weeks", type=int, default=4)
+    parser.add_argument("--posts", type=int, default=3)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Also write the JSON result to this file")
+    args = parser.parse_args()
+
+    result = run(
+        args.sentences, args.words_per_sentence, args.platforms,
+        args.weeks, args.posts, args.repeat, args.seed
+    )
+    print(json.dumps(result, indent=2))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+# benchmarks/bench_store_content.py
+"""DatabaseManager.store_content throughput for generation runs of several sizes.
+
+Uses a throwaway SQLite file unless --database-url points at a Postgres
+stand-in (e.g. a local container); rows written there are left in place.
+
+Run from the repository root:
+    python -m benchmarks.bench_store_content [--weeks 1,4] [--database-url URL] [--output results.json]
+"""
+import argparse
+import json
+import os
+import tempfile
+
+from benchmarks.fixtures import best_of, make_results
+
+
+def run(database_url: str, platforms: int, weeks: list, posts: int, repeat: int, seed: int) -> dict:
+    os.environ["DATABASE_URL"] = database_url
+    from database import DatabaseManager
+
+    manager = DatabaseManager()
+    runs = []
+    for week_count in weeks:
+        results = make_results(seed, platforms, week_count, posts)
+        rows = sum(len(items) for items in results.values())
+        seconds = best_of(repeat, lambda: manager.store_content(results, file_name="bench.txt", file_type="txt"))
+        runs.append({
+            "weeks": week_count,
+            "rows": rows,
+            "ms": round(seconds * 1e3, 3),
+            "rows_per_s": round(rows / seconds, 1)
+        })
+    return {
+        "benchmark": "store_content",
+        "dialect": manager.engine.dialect.name,
+        "repeat": repeat,
+        "runs": runs
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", help="Defaults to a temporary SQLite database")
+    parser.add_argument("--platforms", type=int, default=7)
+    parser.add_argument("--weeks", default="1,4", help="Comma-separated run sizes in weeks")
+    parser.add_argument("--posts", type=int, default=3, help="Posts per platform per day")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Also write the JSON result to this file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        result = run(
+            args.database_url or f"sqlite:///{os.path.join(directory, 'bench.sqlite3')}",
+            args.platforms,
+            [int(week) for week in args.weeks.split(",")],
+            args.posts,
+            args.repeat,
+            args.seed
+        )
+    print(json.dumps(result, indent=2))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
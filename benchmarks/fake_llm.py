@@ -0,0 +1,146 @@
+# benchmarks/fake_llm.py
+"""OpenAI-compatible stand-in for the LLM API with configurable latency.
+
+Serves /v1/chat/completions (plain and streamed) and /v1/embeddings, sleeping
+latency +- jitter per call and answering with seeded filler text in the
+"Final Answer:" form crewai agents parse. Point the app at it with
+OPENAI_API_BASE=http://127.0.0.1:<port>/v1.
+
+Run from the repository root:
+    python -m benchmarks.fake_llm [--port 8900] [--latency-ms 800] [--jitter-ms 200]
+"""
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import argparse
+import json
+import random
+import threading
+import time
+
+from benchmarks.fixtures import make_paragraphs
+
+EMBEDDING_DIMENSIONS = 1536
+
+
+class FakeLLM:
+    def __init__(self, latency: float = 0.8, jitter: float = 0.2, paragraphs: int = 8, seed: int = 0):
+        self.latency = latency
+        self.jitter = jitter
+        self.text = "\n\n".join(make_paragraphs(seed, paragraphs))
+        self.calls = 0
+        self._lock = threading.Lock()
+        self._rng = random.Random(seed)
+        self._server = None
+
+    def delay(self) -> float:
+        with self._lock:
+            self.calls += 1
+            return max(self.latency + self._rng.uniform(-self.jitter, self.jitter), 0.0)
+
+    def completion(self, body: dict) -> dict:
+        prompt_tokens = sum(len(str(message.get("content", "")).split()) for message in body.get("messages", []))
+        content = f"Thought: I now can give a great answer\nFinal Answer: {self.text}"
+        completion_tokens = len(content.split())
+        return {
+            "id": f"chatcmpl-fake-{self.calls}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "fake"),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens
+            }
+        }
+
+    def embeddings(self, body: dict) -> dict:
+        inputs = body.get("input", [])
+        inputs = [inputs] if isinstance(inputs, str) else inputs
+        return {
+            "object": "list",
+            "model": body.get("model", "fake"),
+            "data": [
+                {"object": "embedding", "index": i, "embedding": [((i + d) % 7) / 7 for d in range(EMBEDDING_DIMENSIONS)]}
+                for i in range(len(inputs))
+            ],
+            "usage": {"prompt_tokens": len(inputs), "total_tokens": len(inputs)}
+        }
+
+    def start(self, host: str = "127.0.0.1", port: int = 0) -> int:
+        """Serve on a background thread; returns the bound port."""
+        self._server = ThreadingHTTPServer((host, port), _handler(self))
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name="fake-llm", daemon=True).start()
+        return self._server.server_address[1]
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+
+
+def _handler(llm: FakeLLM):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            time.sleep(llm.delay())
+            if self.path.endswith("/embeddings"):
+                self._json(llm.embeddings(body))
+            elif self.path.endswith("/chat/completions"):
+                response = llm.completion(body)
+                if body.get("stream"):
+                    self._stream(response)
+                else:
+                    self._json(response)
+            else:
+                self._json({"error": {"message": f"Unknown path {self.path}"}}, 404)
+
+        def _json(self, payload: dict, status: int = 200):
+            data = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _stream(self, response: dict):
+            chunk = {
+                **{key: response[key] for key in ("id", "created", "model")},
+                "object": "chat.completion.chunk",
+                "choices": [{"index": 0, "delta": response["choices"][0]["message"], "finish_reason": "stop"}],
+                "usage": response["usage"]
+            }
+            data = f"data: {json.dumps(chunk)}\n\ndata: [DONE]\n\n".encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--latency-ms", type=float, default=800)
+    parser.add_argument("--jitter-ms", type=float, default=200)
+    args = parser.parse_args()
+
+    llm = FakeLLM(args.latency_ms / 1000, args.jitter_ms / 1000)
+    port = llm.start(args.host, args.port)
+    print(f"Fake LLM on http://{args.host}:{port}/v1 (latency {args.latency_ms} +- {args.jitter_ms} ms)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        llm.stop()
+
+
+if __name__ == "__main__":
+    main()
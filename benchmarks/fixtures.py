@@ -0,0 +1,202 @@
+# benchmarks/fixtures.py
+"""Deterministic synthetic inputs for the benchmarks: text, upload files of every
+FileProcessor format, and generated posts shaped like the endpoints' results."""
+import csv
+import json
+import os
+import random
+import time
+from typing import Callable, Dict, List
+
+DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+PLATFORMS = ["linkedin", "instagram", "facebook", "twitter", "wordpress", "youtube", "tiktok"]
+
+
+def make_vocabulary(rng: random.Random, size: int = 800) -> List[str]:
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    return ["".join(rng.choice(letters) for _ in range(rng.randint(3, 10))) for _ in range(size)]
+
+
+def make_sentence(rng: random.Random, vocabulary: List[str], words: int) -> str:
+    return " ".join(rng.choice(vocabulary) for _ in range(words)).capitalize() + "."
+
+
+def make_paragraphs(seed: int, paragraphs: int, sentences_per_paragraph: int = 6, words_per_sentence: int = 16) -> List[str]:
+    rng = random.Random(seed)
+    vocabulary = make_vocabulary(rng)
+    return [
+        " ".join(make_sentence(rng, vocabulary, words_per_sentence) for _ in range(sentences_per_paragraph))
+        for _ in range(paragraphs)
+    ]
+
+
+def make_rows(seed: int, rows: int, columns: int = 6) -> List[List[str]]:
+    rng = random.Random(seed)
+    vocabulary = make_vocabulary(rng)
+    header = [f"column_{i}" for i in range(columns)]
+    body = [
+        [str(rng.randint(0, 10_000)) if i % 3 == 0 else " ".join(rng.choice(vocabulary) for _ in range(3)) for i in range(columns)]
+        for _ in range(rows)
+    ]
+    return [header] + body
+
+
+def _pdf_escape(line: str) -> str:
+    return line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def _wrap(text: str, width: int = 90) -> List[str]:
+    lines, current = [], ""
+    for word in text.split():
+        if current and len(current) + 1 + len(word) > width:
+            lines.append(current)
+            current = word
+        else:
+            current = f"{current} {word}" if current else word
+    if current:
+        lines.append(current)
+    return lines
+
+
+def write_pdf(path: str, paragraphs: List[str], lines_per_page: int = 48) -> None:
+    """A text PDF (Helvetica, uncompressed content streams) without a PDF library."""
+    lines = [line for paragraph in paragraphs for line in _wrap(paragraph) + [""]]
+    pages = [lines[i:i + lines_per_page] for i in range(0, len(lines), lines_per_page)] or [[]]
+
+    objects = {1: b"<< /Type /Catalog /Pages 2 0 R >>", 3: b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"}
+    kids = []
+    for number, page_lines in enumerate(pages):
+        page_id, content_id = 4 + 2 * number, 5 + 2 * number
+        stream = "BT /F1 10 Tf 14 TL 50 790 Td\n" + "".join(f"({_pdf_escape(line)}) '\n" for line in page_lines) + "ET"
+        data = stream.encode("latin-1", "replace")
+        objects[content_id] = b"<< /Length %d >>\nstream\n" % len(data) + data + b"\nendstream"
+        objects[page_id] = (
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 842] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_id
+        )
+        kids.append(f"{page_id} 0 R")
+    objects[2] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>".encode()
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = {}
+    for object_id in sorted(objects):
+        offsets[object_id] = len(out)
+        out += b"%d 0 obj\n" % object_id + objects[object_id] + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offsets[object_id] for object_id in sorted(objects))
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    with open(path, "wb") as f:
+        f.write(out)
+
+
+def write_docx(path: str, paragraphs: List[str]) -> None:
+    from docx import Document
+    document = Document()
+    for paragraph in paragraphs:
+        document.add_paragraph(paragraph)
+    document.save(path)
+
+
+def write_xlsx(path: str, rows: List[List[str]]) -> None:
+    from openpyxl import Workbook
+    workbook = Workbook()
+    sheet = workbook.active
+    for row in rows:
+        sheet.append(row)
+    workbook.save(path)
+
+
+def write_pptx(path: str, paragraphs: List[str], paragraphs_per_slide: int = 3) -> None:
+    from pptx import Presentation
+    from pptx.util import Inches
+    presentation = Presentation()
+    layout = presentation.slide_layouts[6]
+    for start in range(0, len(paragraphs), paragraphs_per_slide):
+        slide = presentation.slides.add_slide(layout)
+        box = slide.shapes.add_textbox(Inches(0.5), Inches(0.5), Inches(9), Inches(6))
+        box.text_frame.text = "\n".join(paragraphs[start:start + paragraphs_per_slide])
+    presentation.save(path)
+
+
+def write_csv(path: str, rows: List[List[str]]) -> None:
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        csv.writer(f).writerows(rows)
+
+
+def write_html(path: str, paragraphs: List[str]) -> None:
+    body = "\n".join(
+        f"<section><h2>Section {i + 1}</h2><p>{paragraph}</p></section>" for i, paragraph in enumerate(paragraphs)
+    )
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(f"<!DOCTYPE html><html><head><title>Fixture</title></head><body>{body}</body></html>")
+
+
+def write_markdown(path: str, paragraphs: List[str]) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n\n".join(f"## Section {i + 1}\n\n{paragraph}" for i, paragraph in enumerate(paragraphs)))
+
+
+def write_json(path: str, paragraphs: List[str]) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"sections": [{"id": i, "title": f"Section {i + 1}", "body": p} for i, p in enumerate(paragraphs)]}, f)
+
+
+def write_txt(path: str, paragraphs: List[str]) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n\n".join(paragraphs))
+
+
+# extension -> (writer, whether it takes table rows instead of paragraphs)
+FORMAT_WRITERS: Dict[str, tuple] = {
+    ".pdf": (write_pdf, False),
+    ".docx": (write_docx, False),
+    ".xlsx": (write_xlsx, True),
+    ".csv": (write_csv, True),
+    ".pptx": (write_pptx, False),
+    ".html": (write_html, False),
+    ".md": (write_markdown, False),
+    ".json": (write_json, False),
+    ".txt": (write_txt, False),
+}
+
+
+def write_fixture(directory: str, extension: str, paragraphs: int, seed: int = 0) -> str:
+    """Write one fixture file for extension; tabular formats get paragraphs * 5 rows."""
+    writer, tabular = FORMAT_WRITERS[extension]
+    path = os.path.join(directory, f"fixture_{paragraphs}{extension}")
+    writer(path, make_rows(seed, paragraphs * 5) if tabular else make_paragraphs(seed, paragraphs))
+    return path
+
+
+def make_results(seed: int, platforms: int, weeks: int, posts_per_day: int, words_per_post: int = 60) -> Dict[str, List[Dict]]:
+    """Generated posts shaped like the /generate_custom_scripts results."""
+    rng = random.Random(seed)
+    vocabulary = make_vocabulary(rng)
+    results: Dict[str, List[Dict]] = {}
+    for platform in PLATFORMS[:platforms]:
+        posts = []
+        for week in range(1, weeks + 1):
+            for day in DAYS:
+                for post in range(1, posts_per_day + 1):
+                    content = " ".join(rng.choice(vocabulary) for _ in range(words_per_post))
+                    posts.append({
+                        "week_day": f"Week {week} - {day} - Post {post}",
+                        "title": f"{platform} - Week {week}, {day} - Post {post}",
+                        "content": content,
+                        "platform": platform,
+                        "word_count": words_per_post,
+                        "char_count": len(content),
+                    })
+        results[platform] = posts
+    return results
+
+
+def best_of(repeat: int, function: Callable[[], object]) -> float:
+    """Fastest of repeat timed calls, in seconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
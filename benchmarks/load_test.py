@@ -0,0 +1,365 @@
+# benchmarks/load_test.py
+"""End-to-end load test: boots the app on a local DB behind a fake LLM and
+drives a weighted mix of endpoints at a fixed concurrency.
+
+Reports per endpoint: requests, errors, throughput and p50/p95/p99/max
+latency under the mix, plus the app's process-wide peak RSS during it. RSS
+under a mix cannot be pinned on one endpoint, so with --isolate-seconds each
+endpoint is then driven alone for that long and gets its own latencies, peak
+RSS and RSS growth over the phase. RSS is summed over the app process and its
+children (uvicorn workers) and read from /proc, so it needs Linux.
+
+Run from the repository root (needs uvicorn and the app's requirements):
+    python -m benchmarks.load_test [--concurrency 8] [--duration 60] \\
+        [--mix generate_custom_scripts=1,extract_content=1,get_pending_content=4,outputs=2] \\
+        [--llm-latency-ms 800] [--database-url URL] [--output results.json]
+"""
+from concurrent.futures import ThreadPoolExecutor
+from glob import glob
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+import argparse
+import http.client
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+
+from benchmarks.fake_llm import FakeLLM
+from benchmarks.fixtures import make_paragraphs
+
+# name -> (method, path, multipart form fields or None); uploads get a text fixture
+ENDPOINTS = {
+    "generate_custom_scripts": (
+        "POST", "/generate_custom_scripts?weeks=1&days=Monday,Wednesday&platform_posts=twitter:1,linkedin:1", {}
+    ),
+    "generate_social_media_scripts": ("POST", "/generate_social_media_scripts?weeks=1&platform=twitter", {}),
+    "extract_content": ("POST", "/extract_content", {"week": "1", "days": "monday,wednesday"}),
+    "get_pending_content": ("GET", "/get_pending_content", None),
+    "get_pending_files": ("GET", "/get_pending_files", None),
+    "outputs": ("GET", "/outputs?limit=20&include_content=false", None),
+    "usage": ("GET", "/usage?group_by=day,platform", None),
+}
+DEFAULT_MIX = "generate_custom_scripts=1,extract_content=1,get_pending_content=4,outputs=2"
+
+
+def parse_mix(spec: str) -> Dict[str, float]:
+    mix = {}
+    for item in spec.split(","):
+        name, _, weight = item.partition("=")
+        name = name.strip()
+        if name not in ENDPOINTS:
+            raise ValueError(f"Unknown endpoint {name!r}; choose from {', '.join(ENDPOINTS)}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def multipart(fields: Dict[str, str], file_name: str, file_data: bytes) -> Tuple[bytes, str]:
+    boundary = uuid.uuid4().hex
+    parts = [
+        f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode("utf-8")
+        for name, value in fields.items()
+    ]
+    parts.append(
+        f'--{boundary}\r\nContent-Disposition: form-data; name="file"; filename="{file_name}"\r\n'
+        f"Content-Type: text/plain\r\n\r\n".encode("utf-8") + file_data + b"\r\n"
+    )
+    parts.append(f"--{boundary}--\r\n".encode("utf-8"))
+    return b"".join(parts), f"multipart/form-data; boundary={boundary}"
+
+
+def percentile(values: List[float], fraction: float) -> Optional[float]:
+    """Nearest-rank percentile of values."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, int(round(fraction * len(ordered))) - 1))]
+
+
+def read_status(pid: int, field: str) -> int:
+    """A kB field (VmRSS, VmHWM) of /proc/<pid>/status, in bytes."""
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith(field + ":"):
+                return int(line.split()[1]) * 1024
+    return 0
+
+
+def process_tree(pid: int) -> List[int]:
+    """pid and all its descendants, e.g. a uvicorn supervisor and its workers."""
+    pids = [pid]
+    for parent in pids:
+        for children in glob(f"/proc/{parent}/task/*/children"):
+            try:
+                with open(children) as f:
+                    pids.extend(int(child) for child in f.read().split())
+            except FileNotFoundError:
+                continue
+    return pids
+
+
+def tree_status(pid: int, field: str) -> Dict[int, int]:
+    """read_status for every process in pid's tree that is still alive."""
+    values = {}
+    for member in process_tree(pid):
+        try:
+            values[member] = read_status(member, field)
+        except FileNotFoundError:
+            continue
+    return values
+
+
+class RssSampler:
+    """Samples the summed RSS of a process tree every interval seconds on a background thread."""
+
+    def __init__(self, pid: int, interval: float = 0.05):
+        self.pid = pid
+        self.interval = interval
+        self.samples: List[Tuple[float, int]] = []
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="rss-sampler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            rss = tree_status(self.pid, "VmRSS")
+            if not rss:
+                return
+            self.samples.append((time.perf_counter(), sum(rss.values())))
+            self._stop.wait(self.interval)
+
+    def between(self, start: float, end: float) -> List[int]:
+        return [rss for at, rss in self.samples if start <= at <= end]
+
+
+class LoadTest:
+    def __init__(self, host: str, port: int, mix: Dict[str, float], upload: bytes, timeout: float, seed: int = 0):
+        self.host = host
+        self.port = port
+        self.names = list(mix)
+        self.weights = [mix[name] for name in self.names]
+        self.upload = upload
+        self.timeout = timeout
+        self.rng = random.Random(seed)
+        self.results: Dict[str, List[Tuple[float, float, bool]]] = {name: [] for name in self.names}
+        self._lock = threading.Lock()
+
+    def request(self, name: str) -> None:
+        method, path, fields = ENDPOINTS[name]
+        body, headers = None, {}
+        if fields is not None:
+            body, content_type = multipart(fields, f"load-{uuid.uuid4().hex[:8]}.txt", self.upload)
+            headers["Content-Type"] = content_type
+        start = time.perf_counter()
+        ok = False
+        try:
+            connection = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+            connection.request(method, path, body=body, headers=headers)
+            response = connection.getresponse()
+            response.read()
+            ok = response.status < 400
+            connection.close()
+        except Exception:
+            ok = False
+        end = time.perf_counter()
+        with self._lock:
+            self.results[name].append((start, end, ok))
+
+    def run(self, concurrency: int, duration: float) -> float:
+        deadline = time.perf_counter() + duration
+
+        def worker(index: int):
+            rng = random.Random(self.rng.random() + index)
+            while time.perf_counter() < deadline:
+                self.request(rng.choices(self.names, self.weights)[0])
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            list(pool.map(worker, range(concurrency)))
+        return time.perf_counter() - started
+
+    def report(self, elapsed: float) -> Dict[str, Dict]:
+        report = {}
+        for name, entries in self.results.items():
+            latencies = [(end - start) * 1000 for start, end, ok in entries if ok]
+            entry = {
+                "requests": len(entries),
+                "errors": sum(1 for _, _, ok in entries if not ok),
+                "throughput_rps": round(len(latencies) / elapsed, 3)
+            }
+            for label, fraction in (("p50_ms", 0.50), ("p95_ms", 0.95), ("p99_ms", 0.99)):
+                value = percentile(latencies, fraction)
+                entry[label] = round(value, 1) if value is not None else None
+            entry["max_ms"] = round(max(latencies), 1) if latencies else None
+            report[name] = entry
+        return report
+
+
+def wait_until_up(host: str, port: int, process: Optional[subprocess.Popen], timeout: float) -> None:
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        if process is not None and process.poll() is not None:
+            raise RuntimeError(f"App exited with code {process.returncode} during startup")
+        try:
+            connection = http.client.HTTPConnection(host, port, timeout=2)
+            connection.request("GET", "/openapi.json")
+            connection.getresponse().read()
+            return
+        except OSError:
+            time.sleep(0.25)
+    raise RuntimeError(f"App did not start on {host}:{port} within {timeout}s")
+
+
+def boot_app(port: int, llm_port: int, database_url: str, workdir: str, workers: int, log_path: str) -> subprocess.Popen:
+    """Start uvicorn main:app from the repository root with the app's state under workdir."""
+    env = {
+        **os.environ,
+        "DATABASE_URL": database_url,
+        "OPENAI_API_KEY": "fake-key",
+        "OPENAI_API_BASE": f"http://127.0.0.1:{llm_port}/v1",
+        "OPENAI_BASE_URL": f"http://127.0.0.1:{llm_port}/v1",
+        "CREWAI_DISABLE_TELEMETRY": "true",
+        "OTEL_SDK_DISABLED": "true",
+        "ARCHIVE_INTERVAL_SECONDS": "0",
+        "OUTPUT_MAINTENANCE_INTERVAL_SECONDS": "0",
+        "LOG_LEVEL": os.getenv("LOG_LEVEL", "WARNING"),
+        "AGENT_CONFIG_PATH": os.path.join(workdir, "agent_config.json"),
+        "CONTENT_STORAGE_DIR": os.path.join(workdir, "content_storage"),
+    }
+    repository = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    log = open(log_path, "w")
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(workers), "--app-dir", repository],
+        cwd=workdir, env=env, stdout=log, stderr=subprocess.STDOUT
+    )
+
+
+def to_mb(value: int) -> float:
+    return round(value / 2 ** 20, 1)
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=60, help="Seconds of load after warmup")
+    parser.add_argument("--warmup", type=float, default=5, help="Seconds of untimed load first")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="name=weight pairs; names: " + ", ".join(ENDPOINTS))
+    parser.add_argument("--llm-latency-ms", type=float, default=800)
+    parser.add_argument("--llm-jitter-ms", type=float, default=200)
+    parser.add_argument("--paragraphs", type=int, default=20, help="Size of the uploaded text")
+    parser.add_argument("--database-url", help="Defaults to a temporary SQLite database")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers (RSS is summed over all of them)")
+    parser.add_argument("--app-url", help="Drive an already running app (http://host:port) instead of booting one")
+    parser.add_argument("--pid", type=int, help="PID to sample RSS from with --app-url")
+    parser.add_argument(
+        "--isolate-seconds", type=float, default=15,
+        help="After the mix, drive each endpoint alone this long to attribute RSS to it; 0 skips"
+    )
+    parser.add_argument("--timeout", type=float, default=600, help="Per-request timeout in seconds")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Also write the JSON result to this file")
+    args = parser.parse_args()
+
+    mix = parse_mix(args.mix)
+    upload = "\n\n".join(make_paragraphs(args.seed, args.paragraphs)).encode("utf-8")
+    llm = process = None
+    with tempfile.TemporaryDirectory() as workdir:
+        try:
+            if args.app_url:
+                url = urlsplit(args.app_url if "//" in args.app_url else f"//{args.app_url}")
+                host, port, pid = url.hostname, url.port or 80, args.pid
+            else:
+                llm = FakeLLM(args.llm_latency_ms / 1000, args.llm_jitter_ms / 1000, seed=args.seed)
+                llm_port = llm.start()
+                host, port = "127.0.0.1", free_port()
+                process = boot_app(
+                    port, llm_port,
+                    args.database_url or f"sqlite:///{os.path.join(workdir, 'load.sqlite3')}",
+                    workdir, args.workers, os.path.join(workdir, "app.log")
+                )
+                pid = process.pid
+            wait_until_up(host, port, process, timeout=120)
+
+            if args.warmup:
+                LoadTest(host, port, mix, upload, args.timeout, args.seed).run(args.concurrency, args.warmup)
+            sampler = RssSampler(pid) if pid else None
+            if sampler:
+                sampler.start()
+            test = LoadTest(host, port, mix, upload, args.timeout, args.seed + 1)
+            started = time.perf_counter()
+            elapsed = test.run(args.concurrency, args.duration)
+            mixed_rss = sampler.between(started, started + elapsed) if sampler else []
+
+            # One endpoint at a time, so RSS can be attributed to it
+            isolated = {}
+            for name in (mix if args.isolate_seconds > 0 else ()):
+                phase = LoadTest(host, port, {name: 1.0}, upload, args.timeout, args.seed + 2)
+                started = time.perf_counter()
+                phase_elapsed = phase.run(args.concurrency, args.isolate_seconds)
+                isolated[name] = phase.report(phase_elapsed)[name]
+                rss = sampler.between(started, started + phase_elapsed) if sampler else []
+                isolated[name]["peak_rss_mb"] = to_mb(max(rss)) if rss else None
+                isolated[name]["rss_growth_mb"] = to_mb(max(rss) - rss[0]) if rss else None
+            if sampler:
+                sampler.stop()
+
+            endpoints = test.report(elapsed)
+            total = sum(entry["requests"] for entry in endpoints.values())
+            result = {
+                "benchmark": "load_test",
+                "concurrency": args.concurrency,
+                "duration_s": round(elapsed, 2),
+                "mix": mix,
+                "workers": args.workers,
+                "llm": {
+                    "latency_ms": args.llm_latency_ms,
+                    "jitter_ms": args.llm_jitter_ms,
+                    "calls": llm.calls if llm else None
+                },
+                "requests": total,
+                "throughput_rps": round(sum(entry["throughput_rps"] for entry in endpoints.values()), 3),
+                # Whole app (all processes), not per endpoint; see "isolated" for that
+                "process_peak_rss_mb": to_mb(max(mixed_rss)) if mixed_rss else None,
+                "process_vm_hwm_mb": {
+                    str(member): to_mb(hwm) for member, hwm in tree_status(pid, "VmHWM").items()
+                } if pid else None,
+                "endpoints": endpoints,
+                "isolated": isolated
+            }
+        finally:
+            if process is not None:
+                process.terminate()
+                try:
+                    process.wait(timeout=15)
+                except subprocess.TimeoutExpired:
+                    process.kill()
+            if llm is not None:
+                llm.stop()
+
+    print(json.dumps(result, indent=2))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
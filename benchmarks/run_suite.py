@@ -0,0 +1,119 @@
+# benchmarks/run_suite.py
+"""Run the microbenchmarks with default settings and compare against a baseline.
+
+Writes one JSON document with the commit, interpreter and every benchmark's
+result. With --compare, each timing (ms / us) is checked against the same
+timing in an earlier document and the run fails if any got slower than
+--threshold times the baseline.
+
+Run from the repository root:
+    python -m benchmarks.run_suite --output bench-$(git rev-parse --short HEAD).json
+    python -m benchmarks.run_suite --compare bench-<base>.json [--threshold 1.25]
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+from datetime import datetime
+
+from benchmarks import bench_extractors, bench_post_processing, bench_sentence_windows, bench_store_content
+from benchmarks.fixtures import FORMAT_WRITERS
+
+# Keys whose values (or the values under them) are durations, lower is better
+TIMING_KEYS = ("ms", "ms_total", "us_per_post", "index_build_ms")
+# Fields that identify an entry in a list of results
+IDENTITY_KEYS = ("paragraphs", "weeks")
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return "unknown"
+
+
+def run_suite(repeat: int, only: list) -> dict:
+    suites = {
+        "extractors": lambda: bench_extractors.run([20, 200], list(FORMAT_WRITERS), repeat, 0),
+        "post_processing": lambda: bench_post_processing.run(60, 4, 3, repeat, 0),
+        "sentence_windows": lambda: bench_sentence_windows.run(400, 18, 7, 4, 3, repeat, 0),
+    }
+    results = {}
+    for name, suite in suites.items():
+        if not only or name in only:
+            results[name] = suite()
+    if not only or "store_content" in only:
+        with tempfile.TemporaryDirectory() as directory:
+            results["store_content"] = bench_store_content.run(
+                f"sqlite:///{os.path.join(directory, 'bench.sqlite3')}", 7, [1, 4], 3, repeat, 0
+            )
+    return {
+        "commit": git_commit(),
+        "python": sys.version.split()[0],
+        "machine": platform.platform(),
+        "created_at": datetime.now().isoformat(),
+        "results": results
+    }
+
+
+def timings(value, path: str = "", timing: bool = False) -> dict:
+    """Flatten a result into {path: seconds-like number} for the timing leaves."""
+    flat = {}
+    if isinstance(value, dict):
+        for key, item in value.items():
+            flat.update(timings(item, f"{path}/{key}", timing or key in TIMING_KEYS))
+    elif isinstance(value, list):
+        for position, item in enumerate(value):
+            identity = next((f"{key}={item[key]}" for key in IDENTITY_KEYS if isinstance(item, dict) and key in item), position)
+            flat.update(timings(item, f"{path}[{identity}]", timing))
+    elif timing and isinstance(value, (int, float)) and not isinstance(value, bool):
+        flat[path] = value
+    return flat
+
+
+def compare(baseline: dict, current: dict) -> list:
+    """(path, baseline, current, ratio) for every shared timing, slowest ratio first."""
+    before, after = timings(baseline["results"]), timings(current["results"])
+    rows = [
+        (path, before[path], after[path], after[path] / before[path])
+        for path in sorted(before.keys() & after.keys()) if before[path] > 0
+    ]
+    return sorted(rows, key=lambda row: row[3], reverse=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--only", default="", help="Comma-separated subset: extractors, post_processing, sentence_windows, store_content")
+    parser.add_argument("--output", help="Write the JSON document to this file")
+    parser.add_argument("--compare", help="Baseline JSON document from an earlier run")
+    parser.add_argument("--threshold", type=float, default=1.25, help="Slowdown ratio that counts as a regression")
+    args = parser.parse_args()
+
+    result = run_suite(args.repeat, [name.strip() for name in args.only.split(",") if name.strip()])
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+    else:
+        print(json.dumps(result, indent=2))
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        rows = compare(baseline, result)
+        regressions = [row for row in rows if row[3] > args.threshold]
+        print(f"Compared {len(rows)} timings against {baseline.get('commit', '?')[:12]}", file=sys.stderr)
+        for path, before, after, ratio in rows:
+            marker = "REGRESSION" if ratio > args.threshold else ""
+            print(f"{ratio:6.2f}x  {before:>12} -> {after:<12} {path} {marker}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
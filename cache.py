@@ -0,0 +1,779 @@
+# cache.py
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+import hashlib
+import hmac
+import json
+import os
+import pickle
+import secrets
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+import weakref
+import zlib
+
+
+# Crockford base32, whose character order matches byte order so ids sort by time
+_ID_ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+
+
+_id_lock = threading.Lock()
+_last_id_parts = [0, 0]  # [ms timestamp, random part] of the last id issued by this process
+
+
+def new_sortable_id() -> str:
+    """Unique, lexicographically time-sortable id (ULID layout: 48-bit ms time + 80 random bits).
+
+    Ids issued by one process within the same millisecond increment the random
+    part, so they still sort in creation order.
+    """
+    with _id_lock:
+        ms = time.time_ns() // 1_000_000
+        if ms <= _last_id_parts[0]:
+            ms, randomness = _last_id_parts[0], _last_id_parts[1] + 1
+        else:
+            randomness = secrets.randbits(80)
+        _last_id_parts[0], _last_id_parts[1] = ms, randomness
+
+    value = ms << 80 | (randomness & ((1 << 80) - 1))
+    chars = []
+    for _ in range(26):
+        chars.append(_ID_ALPHABET[value & 31])
+        value >>= 5
+    return "".join(reversed(chars))
+
+
+def approximate_size(value: Any) -> int:
+    """Rough in-memory footprint of a cached value, measured as its JSON size in bytes"""
+    def default(obj):
+        if hasattr(obj, "dict"):
+            return obj.dict()
+        if hasattr(obj, "__dict__"):
+            return vars(obj)
+        return str(obj)
+
+    try:
+        return len(json.dumps(value, default=default, ensure_ascii=False).encode("utf-8"))
+    except (TypeError, ValueError):
+        return len(str(value).encode("utf-8"))
+
+
+class CompressedPickleCodec:
+    """Pickle + zlib encoding for cached values.
+
+    Drafts are dicts of lists of small pydantic models, so most of their live
+    footprint is per-object overhead and repeated field names; compressed they
+    shrink several-fold (see benchmarks/bench_cache_entries.py) and are only
+    decoded when read.
+    """
+
+    def __init__(self, level: int = 6):
+        self.level = level
+
+    def encode(self, value: Any) -> bytes:
+        return self.encode_sized(value)[0]
+
+    def encode_sized(self, value: Any) -> tuple:
+        """Encoded bytes and the uncompressed pickle size, from one pickling pass."""
+        pickled = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        return zlib.compress(pickled, self.level), len(pickled)
+
+    def decode(self, data: bytes) -> Any:
+        return pickle.loads(zlib.decompress(data))
+
+
+class SignedCodec:
+    """Prefixes another codec's bytes with an HMAC-SHA256 tag and checks it on decode.
+
+    Used for stores other hosts can write to: unpickling runs code, so only
+    values tagged with the shared secret are ever passed to the inner codec.
+    """
+
+    TAG_BYTES = hashlib.sha256().digest_size
+
+    def __init__(self, secret: bytes, codec: Optional[CompressedPickleCodec] = None):
+        if not secret:
+            raise ValueError("SignedCodec needs a non-empty secret")
+        self.secret = secret
+        self.codec = codec or CompressedPickleCodec()
+
+    def encode(self, value: Any) -> bytes:
+        data = self.codec.encode(value)
+        return self._tag(data) + data
+
+    def decode(self, data: bytes) -> Any:
+        tag, payload = data[:self.TAG_BYTES], data[self.TAG_BYTES:]
+        if not hmac.compare_digest(tag, self._tag(payload)):
+            raise ValueError("Stored value failed its signature check")
+        return self.codec.decode(payload)
+
+    def _tag(self, data: bytes) -> bytes:
+        return hmac.new(self.secret, data, hashlib.sha256).digest()
+
+
+class TTLCache:
+    """Bounded cache with sliding TTL and LRU eviction.
+
+    Every access pushes an entry's deadline to now + ttl, and with a single ttl
+    that is the same as moving it to the back of the LRU order. One OrderedDict
+    therefore stays sorted by deadline, and expiry only pops from the front
+    (amortized O(1)) instead of scanning every entry.
+
+    With a codec, values are held encoded (sized exactly by their byte length)
+    and decoded on every read, so callers must set() or update() after mutating.
+    """
+
+    def __init__(
+        self,
+        ttl: float,
+        max_entries: int = 1000,
+        max_bytes: Optional[int] = None,
+        sizer: Callable[[Any], int] = approximate_size,
+        codec: Optional[CompressedPickleCodec] = None
+    ):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.sizer = sizer
+        self.codec = codec
+        self._entries: "OrderedDict[str, list]" = OrderedDict()  # key -> [value, deadline, size]
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.expirations = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._expire(time.monotonic())
+            return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            self._expire(time.monotonic())
+            return key in self._entries
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Return a live entry and refresh its TTL, or default."""
+        with self._lock:
+            now = time.monotonic()
+            self._expire(now)
+            item = self._entries.get(key)
+            if item is None:
+                self.misses += 1
+                return default
+            item[1] = now + self.ttl
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return self._decode(item[0])
+
+    def set(self, key: str, value: Any) -> None:
+        """Insert or replace an entry, evicting the least recently used ones if over budget."""
+        value, size = self._encode(value)
+        with self._lock:
+            now = time.monotonic()
+            self._expire(now)
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[2]
+            self._entries[key] = [value, now + self.ttl, size]
+            self._bytes += size
+            self._evict()
+
+    def pop(self, key: str, default: Any = None) -> Any:
+        with self._lock:
+            item = self._entries.pop(key, None)
+            if item is None:
+                return default
+            self._bytes -= item[2]
+            return self._decode(item[0])
+
+    def update(self, key: str, fn: Callable[[Any], Any]) -> Any:
+        """Atomically replace a live entry with fn(entry) and refresh its TTL.
+
+        Returns the new value, or None if the key is absent. Exceptions raised by
+        fn propagate and leave the entry unchanged.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._expire(now)
+            item = self._entries.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+            value = fn(self._decode(item[0]))
+            stored, size = self._encode(value)
+            self._bytes += size - item[2]
+            self._entries[key] = [stored, now + self.ttl, size]
+            self._entries.move_to_end(key)
+            self.hits += 1
+            self._evict()
+            return value
+
+    def expires_at(self, key: str) -> Optional[float]:
+        """Wall-clock expiry time (epoch seconds) of an entry, or None if absent."""
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            return time.time() + (item[1] - time.monotonic())
+
+    def expire(self) -> int:
+        """Drop expired entries now; returns how many were removed."""
+        with self._lock:
+            return self._expire(time.monotonic())
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            self._expire(time.monotonic())
+            lookups = self.hits + self.misses
+            return {
+                "backend": "memory",
+                "encoded": self.codec is not None,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "expirations": self.expirations,
+                "evictions": self.evictions
+            }
+
+    def _encode(self, value: Any) -> tuple:
+        if self.codec is not None:
+            data = self.codec.encode(value)
+            return data, len(data)
+        return value, self.sizer(value) if self.max_bytes else 0
+
+    def _decode(self, stored: Any) -> Any:
+        return self.codec.decode(stored) if self.codec is not None else stored
+
+    def _expire(self, now: float) -> int:
+        removed = 0
+        while self._entries:
+            key, item = next(iter(self._entries.items()))
+            if item[1] > now:
+                break
+            self._entries.popitem(last=False)
+            self._bytes -= item[2]
+            removed += 1
+        self.expirations += removed
+        return removed
+
+    def _evict(self) -> None:
+        # Always keep the newest entry, even if it alone exceeds the byte budget
+        while len(self._entries) > 1 and (
+            len(self._entries) > self.max_entries
+            or (self.max_bytes and self._bytes > self.max_bytes)
+        ):
+            _, item = self._entries.popitem(last=False)
+            self._bytes -= item[2]
+            self.evictions += 1
+
+
+class SQLiteTTLStore:
+    """TTLCache-compatible store in a SQLite file shared by every worker on a host.
+
+    Values are stored encoded, so callers must set() an entry again after mutating it.
+    Expiry and eviction go through an index on expires_at rather than a full scan.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        ttl: float,
+        max_entries: int = 1000,
+        max_bytes: Optional[int] = None,
+        codec: Optional[CompressedPickleCodec] = None
+    ):
+        self.ttl = ttl
+        self.codec = codec or CompressedPickleCodec()
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS temp_storage ("
+            "key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL NOT NULL, size INTEGER NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_temp_storage_expires_at ON temp_storage (expires_at)")
+        self.hits = 0
+        self.misses = 0
+        self.expirations = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._expire(time.time())
+            return self._conn.execute("SELECT COUNT(*) FROM temp_storage").fetchone()[0]
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM temp_storage WHERE key = ? AND expires_at > ?", (key, time.time())
+            ).fetchone()
+            return row is not None
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Return a live entry and refresh its TTL, or default."""
+        with self._lock:
+            now = time.time()
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT value FROM temp_storage WHERE key = ? AND expires_at > ?", (key, now)
+                ).fetchone()
+                if row is not None:
+                    self._conn.execute(
+                        "UPDATE temp_storage SET expires_at = ? WHERE key = ?", (now + self.ttl, key)
+                    )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            if row is None:
+                self.misses += 1
+                return default
+            self.hits += 1
+            return self.codec.decode(row[0])
+
+    def set(self, key: str, value: Any) -> None:
+        """Insert or replace an entry, evicting the soonest-expiring ones if over budget."""
+        data = self.codec.encode(value)
+        with self._lock:
+            now = time.time()
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._expire(now)
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO temp_storage (key, value, expires_at, size) VALUES (?, ?, ?, ?)",
+                    (key, data, now + self.ttl, len(data))
+                )
+                self._evict()
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def pop(self, key: str, default: Any = None) -> Any:
+        with self._lock:
+            row = self._conn.execute(
+                "DELETE FROM temp_storage WHERE key = ? RETURNING value", (key,)
+            ).fetchone()
+            return self.codec.decode(row[0]) if row is not None else default
+
+    def update(self, key: str, fn: Callable[[Any], Any]) -> Any:
+        """Atomically replace a live entry with fn(entry) and refresh its TTL.
+
+        The row stays write-locked (BEGIN IMMEDIATE) while fn runs, so concurrent
+        updates from other workers are serialized. Returns the new value, or None
+        if the key is absent.
+        """
+        with self._lock:
+            now = time.time()
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT value FROM temp_storage WHERE key = ? AND expires_at > ?", (key, now)
+                ).fetchone()
+                if row is None:
+                    self._conn.execute("COMMIT")
+                    self.misses += 1
+                    return None
+                value = fn(self.codec.decode(row[0]))
+                data = self.codec.encode(value)
+                self._conn.execute(
+                    "UPDATE temp_storage SET value = ?, expires_at = ?, size = ? WHERE key = ?",
+                    (data, now + self.ttl, len(data), key)
+                )
+                self._evict()
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            self.hits += 1
+            return value
+
+    def expires_at(self, key: str) -> Optional[float]:
+        """Wall-clock expiry time (epoch seconds) of an entry, or None if absent."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT expires_at FROM temp_storage WHERE key = ?", (key,)
+            ).fetchone()
+            return row[0] if row is not None else None
+
+    def expire(self) -> int:
+        """Drop expired entries now; returns how many were removed."""
+        with self._lock:
+            return self._expire(time.time())
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            self._expire(time.time())
+            entries, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM temp_storage"
+            ).fetchone()
+            lookups = self.hits + self.misses
+            return {
+                "backend": "sqlite",
+                "entries": entries,
+                "bytes": size,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "expirations": self.expirations,
+                "evictions": self.evictions
+            }
+
+    def _expire(self, now: float) -> int:
+        removed = self._conn.execute("DELETE FROM temp_storage WHERE expires_at <= ?", (now,)).rowcount
+        self.expirations += removed
+        return removed
+
+    def _evict(self) -> None:
+        entries, size = self._conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM temp_storage"
+        ).fetchone()
+        # Soonest deadline == least recently used, since every access slides the TTL
+        while entries > 1 and (entries > self.max_entries or (self.max_bytes and size > self.max_bytes)):
+            key, entry_size = self._conn.execute(
+                "SELECT key, size FROM temp_storage ORDER BY expires_at LIMIT 1"
+            ).fetchone()
+            self._conn.execute("DELETE FROM temp_storage WHERE key = ?", (key,))
+            entries -= 1
+            size -= entry_size
+            self.evictions += 1
+
+
+class RedisTTLStore:
+    """TTLCache-compatible store on any Redis-protocol server, shared across hosts.
+
+    Size bounds are left to the server's maxmemory / eviction policy; the
+    max_entries and max_bytes settings are not enforced here. Values are
+    signed with secret (see SignedCodec), so a client that can write to the
+    server but does not hold the secret cannot get the app to unpickle its data.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        ttl: float,
+        secret: str,
+        prefix: str = "temp_storage:",
+        codec: Optional[CompressedPickleCodec] = None
+    ):
+        import redis
+
+        self.ttl = ttl
+        self.codec = SignedCodec(secret.encode("utf-8"), codec)
+        self.prefix = prefix
+        self._client = redis.Redis.from_url(url)
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self._client.scan_iter(match=f"{self.prefix}*", count=1000))
+
+    def __contains__(self, key: str) -> bool:
+        return bool(self._client.exists(self.prefix + key))
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Return a live entry and refresh its TTL, or default."""
+        data = self._client.getex(self.prefix + key, px=int(self.ttl * 1000))
+        if data is None:
+            self.misses += 1
+            return default
+        self.hits += 1
+        return self.codec.decode(data)
+
+    def set(self, key: str, value: Any) -> None:
+        data = self.codec.encode(value)
+        self._client.set(self.prefix + key, data, px=int(self.ttl * 1000))
+
+    def pop(self, key: str, default: Any = None) -> Any:
+        data = self._client.getdel(self.prefix + key)
+        return self.codec.decode(data) if data is not None else default
+
+    def update(self, key: str, fn: Callable[[Any], Any]) -> Any:
+        """Atomically replace a live entry with fn(entry) and refresh its TTL.
+
+        Uses WATCH/MULTI and retries if another writer changed the key meanwhile.
+        Returns the new value, or None if the key is absent.
+        """
+        import redis
+
+        with self._client.pipeline() as pipe:
+            while True:
+                try:
+                    pipe.watch(self.prefix + key)
+                    data = pipe.get(self.prefix + key)
+                    if data is None:
+                        pipe.reset()
+                        self.misses += 1
+                        return None
+                    value = fn(self.codec.decode(data))
+                    pipe.multi()
+                    pipe.set(
+                        self.prefix + key,
+                        self.codec.encode(value),
+                        px=int(self.ttl * 1000)
+                    )
+                    pipe.execute()
+                    self.hits += 1
+                    return value
+                except redis.WatchError:
+                    continue
+
+    def expires_at(self, key: str) -> Optional[float]:
+        """Wall-clock expiry time (epoch seconds) of an entry, or None if absent."""
+        remaining_ms = self._client.pttl(self.prefix + key)
+        if remaining_ms < 0:
+            return None
+        return time.time() + remaining_ms / 1000
+
+    def expire(self) -> int:
+        # Redis expires keys on its own
+        return 0
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "backend": "redis",
+            "entries": len(self),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0
+        }
+
+
+class SpillStore:
+    """Dict-like store with a memory budget that spills cold entries to disk.
+
+    Values are encoded (pickle + zlib) once when set, so callers must set()
+    an entry again after mutating it. Least recently used entries beyond
+    max_memory_bytes are appended to segment files in a private subdirectory
+    of directory; they are read back (and promoted to memory) only when
+    accessed again. Segments whose entries have all been reloaded or replaced
+    are deleted, and the oldest segments are dropped once the on-disk total
+    exceeds max_disk_bytes. The subdirectory is removed by close() or at exit.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        max_memory_bytes: int = 32 * 1024 * 1024,
+        max_disk_bytes: int = 1024 * 1024 * 1024,
+        segment_bytes: int = 16 * 1024 * 1024,
+        codec: Optional[CompressedPickleCodec] = None
+    ):
+        self.codec = codec or CompressedPickleCodec()
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self.segment_bytes = segment_bytes
+        # Spilled data is only meaningful to the store that wrote it, so each
+        # store gets its own subdirectory and never touches anything else in directory
+        os.makedirs(directory, exist_ok=True)
+        self.directory = tempfile.mkdtemp(prefix=f"spill-{os.getpid()}-", dir=directory)
+        self._cleanup = weakref.finalize(self, shutil.rmtree, self.directory, True)
+
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[Any, tuple]" = OrderedDict()  # key -> (value, encoded, footprint)
+        self._memory_bytes = 0
+        self._disk: Dict[Any, tuple] = {}  # key -> (segment, offset, length, footprint)
+        self._segments: "OrderedDict[int, list]" = OrderedDict()  # segment -> [file size, live bytes]
+        self._active_segment = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.spills = 0
+        self.dropped = 0
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._memory) + len(self._disk)
+
+    def __contains__(self, key) -> bool:
+        with self._lock:
+            return key in self._memory or key in self._disk
+
+    def __setitem__(self, key, value) -> None:
+        self.set(key, value)
+
+    def __getitem__(self, key):
+        missing = object()
+        value = self.get(key, missing)
+        if value is missing:
+            raise KeyError(key)
+        return value
+
+    def set(self, key, value) -> None:
+        data, pickled_size = self.codec.encode_sized(value)
+        # The live value is approximated by its pickled size, plus the encoded copy held for spilling
+        footprint = pickled_size + len(data)
+        with self._lock:
+            self._discard(key)
+            self._memory[key] = (value, data, footprint)
+            self._memory_bytes += footprint
+            self._spill()
+
+    def get(self, key, default: Any = None) -> Any:
+        with self._lock:
+            item = self._memory.get(key)
+            if item is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return item[0]
+
+            location = self._disk.get(key)
+            if location is None:
+                self.misses += 1
+                return default
+
+            data = self._read(location)
+            value = self.codec.decode(data)
+            self._forget_on_disk(key)
+            self._memory[key] = (value, data, location[3])
+            self._memory_bytes += location[3]
+            self.disk_hits += 1
+            self._spill(keep=key)
+            return value
+
+    def pop(self, key, default: Any = None) -> Any:
+        value = self.get(key, default)
+        with self._lock:
+            self._discard(key)
+        return value
+
+    def close(self) -> None:
+        """Drop every entry and delete this store's spill directory."""
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+            self._disk.clear()
+            self._segments.clear()
+            self._cleanup()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                "memory_entries": len(self._memory),
+                "memory_bytes": self._memory_bytes,
+                "max_memory_bytes": self.max_memory_bytes,
+                "disk_entries": len(self._disk),
+                "disk_bytes": sum(segment[0] for segment in self._segments.values()),
+                "segments": len(self._segments),
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+                "spills": self.spills,
+                "dropped": self.dropped
+            }
+
+    def _segment_path(self, segment: int) -> str:
+        return os.path.join(self.directory, f"segment-{segment:08d}.seg")
+
+    def _discard(self, key) -> None:
+        item = self._memory.pop(key, None)
+        if item is not None:
+            self._memory_bytes -= item[2]
+        if key in self._disk:
+            self._forget_on_disk(key)
+
+    def _spill(self, keep=None) -> None:
+        while self._memory_bytes > self.max_memory_bytes and len(self._memory) > 1:
+            key, (_, data, footprint) = next(iter(self._memory.items()))
+            if key == keep:
+                break
+            self._memory.popitem(last=False)
+            self._memory_bytes -= footprint
+            self._write(key, data, footprint)
+            self.spills += 1
+        self._enforce_disk_budget()
+
+    def _write(self, key, data: bytes, footprint: int) -> None:
+        segment = self._segments.get(self._active_segment)
+        if segment is not None and segment[0] + len(data) > self.segment_bytes:
+            self._active_segment += 1
+            segment = None
+        if segment is None:
+            segment = self._segments[self._active_segment] = [0, 0]
+
+        with open(self._segment_path(self._active_segment), "ab") as f:
+            f.write(data)
+        self._disk[key] = (self._active_segment, segment[0], len(data), footprint)
+        segment[0] += len(data)
+        segment[1] += len(data)
+
+    def _read(self, location: tuple) -> bytes:
+        segment, offset, length, _ = location
+        with open(self._segment_path(segment), "rb") as f:
+            f.seek(offset)
+            return f.read(length)
+
+    def _forget_on_disk(self, key) -> None:
+        segment, _, length, _ = self._disk.pop(key)
+        self._segments[segment][1] -= length
+        if self._segments[segment][1] == 0 and segment != self._active_segment:
+            self._remove_segment(segment)
+
+    def _remove_segment(self, segment: int) -> None:
+        del self._segments[segment]
+        try:
+            os.remove(self._segment_path(segment))
+        except FileNotFoundError:
+            pass
+
+    def _enforce_disk_budget(self) -> None:
+        disk_bytes = sum(segment[0] for segment in self._segments.values())
+        while disk_bytes > self.max_disk_bytes and len(self._segments) > 1:
+            segment, (file_size, _) = next(iter(self._segments.items()))
+            lost = [key for key, location in self._disk.items() if location[0] == segment]
+            for key in lost:
+                del self._disk[key]
+            self.dropped += len(lost)
+            self._remove_segment(segment)
+            disk_bytes -= file_size
+
+
+def create_temp_store(ttl: float):
+    """Build the temp content store selected by TEMP_STORAGE_BACKEND (memory, sqlite or redis)."""
+    backend = os.getenv("TEMP_STORAGE_BACKEND", "memory").lower()
+    max_entries = int(os.getenv("TEMP_STORAGE_MAX_ENTRIES", "1000"))
+    max_bytes = int(os.getenv("TEMP_STORAGE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+    if backend == "memory":
+        # Drafts are held compressed unless TEMP_STORAGE_COMPACT=0
+        compact = os.getenv("TEMP_STORAGE_COMPACT", "1") != "0"
+        return TTLCache(
+            ttl=ttl,
+            max_entries=max_entries,
+            max_bytes=max_bytes,
+            codec=CompressedPickleCodec() if compact else None
+        )
+    if backend == "sqlite":
+        return SQLiteTTLStore(
+            os.getenv("TEMP_STORAGE_PATH", "./temp_storage.sqlite3"),
+            ttl=ttl,
+            max_entries=max_entries,
+            max_bytes=max_bytes
+        )
+    if backend == "redis":
+        if not os.getenv("TEMP_STORAGE_SECRET"):
+            raise ValueError("TEMP_STORAGE_BACKEND=redis requires TEMP_STORAGE_SECRET to sign stored values")
+        return RedisTTLStore(
+            os.getenv("REDIS_URL", "redis://localhost:6379/0"),
+            ttl=ttl,
+            secret=os.environ["TEMP_STORAGE_SECRET"]
+        )
+    raise ValueError(f"Unsupported TEMP_STORAGE_BACKEND: {backend}. Use memory, sqlite or redis")
@@ -0,0 +1,87 @@
+# crew_registry.py
+from typing import Any, Callable, Dict, Optional
+import logging
+import threading
+
+from crewai import Crew, Process
+
+from agent_config import AgentConfigStore, ConfigSnapshot
+from logging_config import AGENT_TRACE_LOGGER, trace_sampled
+
+logger = logging.getLogger(__name__)
+trace_logger = logging.getLogger(AGENT_TRACE_LOGGER)
+
+PLATFORMS = ("linkedin", "instagram", "facebook", "twitter", "wordpress", "youtube", "tiktok")
+
+# Pipeline stage -> (agent name, task name) in the agent config store
+STAGES = {
+    "research": ("script_research_agent", "script_research_task"),
+    "qc": ("qc_agent", "qc_task"),
+    "rewrite": ("script_rewriter_agent", "script_rewriter_task"),
+    "regenerate_content": ("regenrate_content_agent", "regenrate_content_task"),
+    **{platform: (f"{platform}_agent", f"{platform}_task") for platform in PLATFORMS}
+}
+
+
+def trace_callback(stage: str, event: str) -> Callable[[Any], None]:
+    """crewai step/task callback that logs to the sampled agent trace logger."""
+    def callback(output: Any) -> None:
+        # Skip rendering the step at all for requests that were not sampled
+        if trace_sampled.get() is False or not trace_logger.isEnabledFor(logging.INFO):
+            return
+        trace_logger.info(f"{stage} {event}", extra={"stage": stage, "event": event, "output": str(output)[:4000]})
+    return callback
+
+
+class CrewRegistry:
+    """Prebuilt single-task sequential crews for every pipeline stage.
+
+    All stages are built and validated together from one config snapshot,
+    once at startup and again whenever the config store swaps in a new
+    snapshot (a new version, or another worker's overrides); requests
+    only pass inputs to kickoff(). Callers that kick off the same stage
+    concurrently should run on crew.copy().
+    """
+
+    def __init__(self, config: AgentConfigStore):
+        self.config = config
+        self._lock = threading.Lock()
+        self._snapshot: Optional[ConfigSnapshot] = None
+        self._crews: Dict[str, Crew] = {}
+        self.builds = 0
+        self.build()
+
+    @property
+    def version(self) -> Optional[int]:
+        return self._snapshot.version if self._snapshot is not None else None
+
+    def get(self, stage: str) -> Crew:
+        if self.config.current() is not self._snapshot:
+            self.build()
+        return self._crews[stage]
+
+    def build(self) -> int:
+        """(Re)build every stage from the current config; returns its version."""
+        with self._lock:
+            snapshot = self.config.current()
+            if snapshot is self._snapshot:
+                return snapshot.version
+            crews = {stage: self._build_stage(snapshot, stage) for stage in STAGES}
+            self._crews, self._snapshot = crews, snapshot
+            self.builds += 1
+            logger.info(f"Built {len(crews)} crews for config version {snapshot.version}")
+            return snapshot.version
+
+    @staticmethod
+    def _build_stage(snapshot: ConfigSnapshot, stage: str) -> Crew:
+        agent_name, task_name = STAGES[stage]
+        agent, task = snapshot.agents[agent_name], snapshot.tasks[task_name]
+        if getattr(task, "agent", agent) is not agent:
+            raise ValueError(f"Stage {stage}: {task_name} is not assigned to {agent_name}")
+        return Crew(
+            agents=[agent],
+            tasks=[task],
+            process=Process.sequential,
+            step_callback=trace_callback(stage, "step"),
+            task_callback=trace_callback(stage, "task")
+        )
@@ -1,10 +1,12 @@
 # database.py
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, func, select, text, bindparam, literal, DateTime
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.inspection import inspect
-from models import Base, Content, ContentStatus, PlatformEnum
-from datetime import datetime
+from models import Base, Content, ContentArchive, ContentStatus, PlatformEnum, compute_content_hash
+from datetime import datetime, date, timedelta
+import logging
 import os
 from typing import List, Dict
 from pathlib import Path
@@ -13,6 +15,54 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+# Async drivers used for the read path, keyed by the sync URL scheme
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "postgres": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def get_async_database_url(database_url: str) -> str:
+    """Map a sync DATABASE_URL onto the matching async driver."""
+    # An explicit ASYNC_DATABASE_URL always wins
+    async_url = os.getenv('ASYNC_DATABASE_URL')
+    if async_url:
+        return async_url
+
+    scheme, sep, rest = database_url.partition("://")
+    if scheme not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for database scheme: {scheme}")
+    return f"{ASYNC_DRIVERS[scheme]}{sep}{rest}"
+
+
+# Columns shared by 'content' and 'content_archive', in table order
+CONTENT_COLUMNS = [
+    "id", "week", "day", "content", "title", "status", "date_upload",
+    "platform", "file_name", "file_type", "content_hash"
+]
+
+CONTENT_PARTITIONED_DDL = """
+CREATE TABLE content (
+    id BIGINT NOT NULL DEFAULT nextval('content_id_seq'),
+    week INTEGER NOT NULL,
+    day VARCHAR(20) NOT NULL,
+    content VARCHAR NOT NULL,
+    title VARCHAR(255) NOT NULL,
+    status contentstatus,
+    date_upload DATE NOT NULL,
+    platform platformenum NOT NULL,
+    file_name VARCHAR(255) NOT NULL,
+    file_type VARCHAR(10) NOT NULL,
+    content_hash VARCHAR(64),
+    CONSTRAINT content_pkey PRIMARY KEY (id, date_upload)
+) PARTITION BY RANGE (date_upload)
+"""
+
+
 class DatabaseManager:
     def __init__(self):
         # Get database URL from environment variable
@@ -27,11 +77,231 @@ class DatabaseManager:
         """Check if tables exist and create them if they don't."""
         inspector = inspect(self.engine)
         table_names = inspector.get_table_names()
-        
+
+        # Everything except 'content' (e.g. content_archive) is created as plain tables
+        Base.metadata.create_all(
+            self.engine,
+            tables=[table for table in Base.metadata.sorted_tables if table.name != 'content']
+        )
+        if self.is_postgres:
+            self.sync_status_enum()
+
         if 'content' not in table_names:  # Ensure table is present
-            print("Table 'content' not found. Creating now...")
-            Base.metadata.create_all(self.engine)  # Create missing tables
-            print("Table 'content' created successfully.")
+            logger.info("Table 'content' not found. Creating now...")
+            if self.is_postgres:
+                self.create_partitioned_content_table()
+            else:
+                Base.metadata.create_all(self.engine, tables=[Content.__table__])
+            logger.info("Table 'content' created successfully.")
+        else:
+            self.migrate_schema()
+
+        self.ensure_content_partitions()
+
+    def sync_status_enum(self):
+        """Add ContentStatus members missing from an existing PostgreSQL enum type."""
+        # ADD VALUE cannot be used inside the transaction that adds it
+        with self.engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+            for status in ContentStatus:
+                connection.execute(text(f"ALTER TYPE contentstatus ADD VALUE IF NOT EXISTS '{status.name}'"))
+
+    @property
+    def is_postgres(self) -> bool:
+        return self.engine.dialect.name == 'postgresql'
+
+    def migrate_schema(self):
+        """Bring an existing 'content' table up to date with the model."""
+        inspector = inspect(self.engine)
+        columns = {column['name'] for column in inspector.get_columns('content')}
+
+        with self.engine.begin() as connection:
+            if 'content_hash' not in columns:
+                logger.info("Adding column 'content_hash' to table 'content'...")
+                connection.execute(text("ALTER TABLE content ADD COLUMN content_hash VARCHAR(64)"))
+
+        # Rebuilding as a partitioned table also widens the SMALLINT id to BIGINT
+        if self.is_postgres and not self.is_content_partitioned():
+            self.partition_content_table()
+
+        with self.engine.begin() as connection:
+            connection.execute(text("CREATE INDEX IF NOT EXISTS ix_content_content_hash ON content (content_hash)"))
+            connection.execute(text("CREATE INDEX IF NOT EXISTS ix_content_status ON content (status)"))
+
+        self.backfill_content_hashes()
+
+    def is_content_partitioned(self) -> bool:
+        """Whether 'content' is already a partitioned table (PostgreSQL only)."""
+        with self.engine.connect() as connection:
+            return connection.execute(text(
+                "SELECT 1 FROM pg_partitioned_table pt "
+                "JOIN pg_class c ON c.oid = pt.partrelid WHERE c.relname = 'content'"
+            )).first() is not None
+
+    def create_partitioned_content_table(self, connection=None):
+        """Create 'content' range-partitioned by date_upload (PostgreSQL only).
+
+        The partition key has to be part of the primary key, so the table key is
+        (id, date_upload); ids still come from a single BIGINT sequence.
+        """
+        if connection is None:
+            with self.engine.begin() as connection:
+                return self.create_partitioned_content_table(connection)
+
+        connection.execute(text("CREATE SEQUENCE IF NOT EXISTS content_id_seq AS BIGINT"))
+        connection.execute(text(CONTENT_PARTITIONED_DDL))
+        connection.execute(text("ALTER SEQUENCE content_id_seq OWNED BY content.id"))
+        connection.execute(text("CREATE TABLE IF NOT EXISTS content_default PARTITION OF content DEFAULT"))
+        connection.execute(text("CREATE INDEX IF NOT EXISTS ix_content_content_hash ON content (content_hash)"))
+        connection.execute(text("CREATE INDEX IF NOT EXISTS ix_content_status ON content (status)"))
+
+    def partition_content_table(self):
+        """Rebuild an existing unpartitioned 'content' table as a partitioned one."""
+        logger.info("Migrating table 'content' to BIGINT ids partitioned by date_upload...")
+        column_list = ", ".join(CONTENT_COLUMNS)
+        with self.engine.begin() as connection:
+            oldest = connection.execute(text("SELECT MIN(date_upload) FROM content")).scalar()
+
+            connection.execute(text("ALTER TABLE content RENAME TO content_unpartitioned"))
+            connection.execute(text("ALTER TABLE content_unpartitioned RENAME CONSTRAINT content_pkey TO content_unpartitioned_pkey"))
+            connection.execute(text("ALTER INDEX IF EXISTS ix_content_content_hash RENAME TO ix_content_unpartitioned_content_hash"))
+            connection.execute(text("ALTER INDEX IF EXISTS ix_content_status RENAME TO ix_content_unpartitioned_status"))
+            # Detach the old sequence so it survives the drop and keeps issuing ids
+            connection.execute(text("ALTER TABLE content_unpartitioned ALTER COLUMN id DROP DEFAULT"))
+            connection.execute(text("ALTER SEQUENCE IF EXISTS content_id_seq OWNED BY NONE"))
+            connection.execute(text("ALTER SEQUENCE IF EXISTS content_id_seq AS BIGINT"))
+
+            self.create_partitioned_content_table(connection)
+            self.ensure_content_partitions(start=oldest, connection=connection)
+
+            connection.execute(text(
+                f"INSERT INTO content ({column_list}) SELECT {column_list} FROM content_unpartitioned"
+            ))
+            connection.execute(text("DROP TABLE content_unpartitioned"))
+        logger.info("Table 'content' migrated successfully.")
+
+    def ensure_content_partitions(self, start: date = None, months_ahead: int = 3, connection=None):
+        """Create monthly date_upload partitions from start up to months_ahead from now.
+
+        Partitions are created ahead of time so new rows never land in the default
+        partition. No-op for databases without declarative partitioning.
+        """
+        if not self.is_postgres:
+            return
+        if connection is None:
+            with self.engine.begin() as connection:
+                return self.ensure_content_partitions(start, months_ahead, connection)
+
+        today = datetime.now().date()
+        month = (start or today).replace(day=1)
+        last = today.replace(day=1)
+        for _ in range(months_ahead):
+            last = (last + timedelta(days=32)).replace(day=1)
+
+        while month <= last:
+            next_month = (month + timedelta(days=32)).replace(day=1)
+            self.create_content_partition(connection, month, next_month)
+            month = next_month
+
+    @staticmethod
+    def create_content_partition(connection, month: date, next_month: date):
+        """Create one monthly partition, moving its rows out of content_default first.
+
+        PostgreSQL refuses to create a partition while the default partition
+        holds rows in its range (e.g. rows inserted before this job ran), so
+        those rows are copied into a standalone table that is then attached.
+        """
+        name = f"content_p{month:%Y%m}"
+        if connection.execute(text("SELECT to_regclass(:name)"), {"name": name}).scalar() is not None:
+            return
+        bounds = f"FOR VALUES FROM ('{month.isoformat()}') TO ('{next_month.isoformat()}')"
+        in_range = "date_upload >= :start AND date_upload < :end"
+        params = {"start": month, "end": next_month}
+        stranded = connection.execute(
+            text(f"SELECT COUNT(*) FROM content_default WHERE {in_range}"), params
+        ).scalar()
+        if not stranded:
+            connection.execute(text(f"CREATE TABLE {name} PARTITION OF content {bounds}"))
+            return
+
+        connection.execute(text(f"CREATE TABLE {name} (LIKE content INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"))
+        connection.execute(text(f"INSERT INTO {name} SELECT * FROM content_default WHERE {in_range}"), params)
+        connection.execute(text(f"DELETE FROM content_default WHERE {in_range}"), params)
+        connection.execute(text(f"ALTER TABLE content ATTACH PARTITION {name} {bounds}"))
+        logger.info(f"Moved {stranded} rows from content_default into new partition {name}")
+
+    def archive_uploaded_content(self, older_than_days: int, batch_size: int = 1000) -> int:
+        """Move uploaded content older than older_than_days into content_archive.
+
+        Each batch is locked with FOR UPDATE SKIP LOCKED on PostgreSQL, so
+        workers running the job at the same time archive disjoint rows.
+        Returns the number of rows archived.
+        """
+        cutoff = datetime.now().date() - timedelta(days=older_than_days)
+        content_table = Content.__table__
+        session = next(self.get_db_session())
+        archived = 0
+
+        try:
+            while True:
+                ids = [
+                    row.id for row in
+                    session.query(Content.id)
+                    .filter(Content.status == ContentStatus.uploaded)
+                    .filter(Content.date_upload < cutoff)
+                    .limit(batch_size)
+                    .with_for_update(skip_locked=True)
+                    .all()
+                ]
+                if not ids:
+                    break
+
+                # Copy and delete each batch in the same transaction
+                session.execute(
+                    ContentArchive.__table__.insert().from_select(
+                        CONTENT_COLUMNS + ["archived_at"],
+                        select(
+                            *[content_table.c[name] for name in CONTENT_COLUMNS],
+                            literal(datetime.now(), DateTime)
+                        ).where(content_table.c.id.in_(ids))
+                    )
+                )
+                session.execute(content_table.delete().where(content_table.c.id.in_(ids)))
+                session.commit()
+                archived += len(ids)
+
+            return archived
+        except SQLAlchemyError as e:
+            session.rollback()
+            raise Exception(f"Error archiving uploaded content: {str(e)}")
+        finally:
+            session.close()
+
+    def backfill_content_hashes(self, batch_size: int = 500):
+        """Compute content_hash for rows stored before the column existed."""
+        session = next(self.get_db_session())
+        try:
+            while True:
+                rows = (
+                    session.query(Content.id, Content.content)
+                    .filter(Content.content_hash.is_(None))
+                    .limit(batch_size)
+                    .all()
+                )
+                if not rows:
+                    break
+                session.execute(
+                    Content.__table__.update()
+                    .where(Content.__table__.c.id == bindparam('row_id'))
+                    .values(content_hash=bindparam('row_hash')),
+                    [{"row_id": row.id, "row_hash": compute_content_hash(row.content)} for row in rows]
+                )
+                session.commit()
+                logger.info(f"Backfilled content_hash for {len(rows)} rows")
+        except SQLAlchemyError as e:
+            session.rollback()
+            raise Exception(f"Error backfilling content hashes: {str(e)}")
+        finally:
+            session.close()
 
     def get_db_session(self):
         """Get a database session"""
@@ -47,10 +317,10 @@ class DatabaseManager:
         stored_contents = []
 
         try:
-            print(f"Available platform enums: {[e.name for e in PlatformEnum]}")
+            logger.debug(f"Available platform enums: {[e.name for e in PlatformEnum]}")
 
             for platform, posts in content_data.items():
-                print(f"Attempting to store platform: {platform}")  # ✅ Moved inside loop
+                logger.debug(f"Attempting to store platform: {platform}")
 
                 for post in posts:
                     # Extract week and day from week_day string (e.g., "Week 1 - Monday")
@@ -63,7 +333,7 @@ class DatabaseManager:
                         day=day,
                         content=post['content'],
                         title=post['title'],
-                        status=ContentStatus.pending,
+                        status=ContentStatus.duplicate if post.get('duplicate_of') else ContentStatus.pending,
                         date_upload=datetime.now().date(),
                         platform=PlatformEnum[platform.upper()],
                         file_name=file_name,
@@ -97,6 +367,45 @@ class DatabaseManager:
         finally:
             session.close()
 
+    def update_content_status_bulk(
+        self,
+        status: ContentStatus,
+        content_ids: List[int] = None,
+        file_name: str = None,
+        platform: PlatformEnum = None,
+        week: int = None
+    ) -> List[int]:
+        """Set the status of every matching content entry with a single UPDATE.
+
+        Rows are matched by ids and/or file_name, platform and week. Rows already
+        in the target status are left alone. Returns the ids that changed.
+        """
+        if not content_ids and not (file_name or platform or week):
+            raise ValueError("At least one of content_ids, file_name, platform or week is required")
+
+        content_table = Content.__table__
+        statement = content_table.update().where(content_table.c.status != status)
+        if content_ids:
+            statement = statement.where(content_table.c.id.in_(content_ids))
+        if file_name:
+            statement = statement.where(content_table.c.file_name == file_name)
+        if platform:
+            statement = statement.where(content_table.c.platform == platform)
+        if week:
+            statement = statement.where(content_table.c.week == week)
+
+        session = next(self.get_db_session())
+        try:
+            result = session.execute(statement.values(status=status).returning(content_table.c.id))
+            updated_ids = [row.id for row in result]
+            session.commit()
+            return updated_ids
+        except SQLAlchemyError as e:
+            session.rollback()
+            raise Exception(f"Error updating content status: {str(e)}")
+        finally:
+            session.close()
+
     def get_pending_content(self) -> List[Content]:
         """Get all pending content"""
         session = next(self.get_db_session())
@@ -133,3 +442,74 @@ class DatabaseManager:
             raise Exception(f"Error fetching pending content: {str(e)}")
         finally:
             session.close()
+
+
+class AsyncDatabaseManager:
+    """Async counterpart of DatabaseManager used by the read endpoints.
+
+    Writes (store_content, status updates, ...) stay on the sync DatabaseManager.
+    """
+
+    def __init__(self):
+        database_url = get_async_database_url(os.getenv('DATABASE_URL'))
+        self.engine = create_async_engine(database_url, pool_pre_ping=True)
+        self.SessionLocal = async_sessionmaker(bind=self.engine, expire_on_commit=False)
+
+    async def dispose(self):
+        """Close all pooled connections"""
+        await self.engine.dispose()
+
+    async def get_pending_content_summaries(self, file_name: str = None):
+        """Fetch lightweight listing rows (no content body) for pending content."""
+        try:
+            async with self.SessionLocal() as session:
+                query = select(
+                    Content.id,
+                    Content.title,
+                    Content.platform,
+                    Content.week,
+                    Content.day,
+                    Content.date_upload
+                ).where(Content.status == ContentStatus.pending)
+
+                if file_name:
+                    query = query.where(Content.file_name == file_name)
+
+                result = await session.execute(query.order_by(Content.id))
+                return result.all()
+        except SQLAlchemyError as e:
+            raise Exception(f"Error fetching pending content summaries: {str(e)}")
+
+    async def get_pending_files(self):
+        """Fetch distinct file names with pending content and their first upload date."""
+        try:
+            async with self.SessionLocal() as session:
+                result = await session.execute(
+                    select(Content.file_name, func.min(Content.date_upload).label("date_upload"))
+                    .where(Content.status == ContentStatus.pending)
+                    .group_by(Content.file_name)
+                )
+                return result.all()
+        except SQLAlchemyError as e:
+            raise Exception(f"Error fetching pending files: {str(e)}")
+
+    async def get_content_by_id(self, content_id: int):
+        """Get a single content entry, including its body"""
+        try:
+            async with self.SessionLocal() as session:
+                return await session.get(Content, content_id)
+        except SQLAlchemyError as e:
+            raise Exception(f"Error fetching content {content_id}: {str(e)}")
+
+    async def get_content_by_ids(self, content_ids: List[int]) -> List[Content]:
+        """Get several content entries, including their bodies, in one query"""
+        if not content_ids:
+            return []
+        try:
+            async with self.SessionLocal() as session:
+                result = await session.execute(
+                    select(Content).where(Content.id.in_(content_ids)).order_by(Content.id)
+                )
+                return list(result.scalars().all())
+        except SQLAlchemyError as e:
+            raise Exception(f"Error fetching content for ids {content_ids}: {str(e)}")
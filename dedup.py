@@ -0,0 +1,101 @@
+# dedup.py
+from collections import defaultdict
+from typing import Dict, List, Optional, Set, Tuple
+import hashlib
+import random
+import re
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+WORD = re.compile(r"\w+")
+MAX_HASH = (1 << 64) - 1
+
+
+def choose_bands(num_perm: int, threshold: float) -> Tuple[int, int]:
+    """LSH (bands, rows) whose S-curve midpoint (1/b)^(1/r) is closest to threshold."""
+    options = [(num_perm // rows, rows) for rows in range(1, num_perm + 1) if num_perm % rows == 0]
+    return min(options, key=lambda option: abs((1 / option[0]) ** (1 / option[1]) - threshold))
+
+
+class MinHasher:
+    """MinHash signatures over word shingles.
+
+    Each shingle is hashed once to 64 bits; the num_perm permutations are
+    XOR masks over that hash, so a signature is a single vectorized
+    masks x shingles min() with numpy, or num_perm C-level min() passes
+    without it.
+    """
+
+    def __init__(self, num_perm: int = 64, shingle_words: int = 3, seed: int = 1):
+        rng = random.Random(seed)
+        self.num_perm = num_perm
+        self.shingle_words = shingle_words
+        self.masks = [rng.getrandbits(64) for _ in range(num_perm)]
+        self._mask_array = np.array(self.masks, dtype=np.uint64)[:, None] if np is not None else None
+
+    def shingles(self, text: str) -> Set[int]:
+        words = WORD.findall(text.lower())
+        size = min(self.shingle_words, len(words))
+        return {
+            int.from_bytes(hashlib.blake2b(" ".join(words[i:i + size]).encode("utf-8"), digest_size=8).digest(), "little")
+            for i in range(len(words) - size + 1)
+        } if size else set()
+
+    def signature(self, text: str) -> Tuple[int, ...]:
+        hashes = self.shingles(text)
+        if not hashes:
+            return (MAX_HASH,) * self.num_perm
+        if self._mask_array is not None:
+            values = np.fromiter(hashes, dtype=np.uint64, count=len(hashes))
+            return tuple((self._mask_array ^ values).min(axis=1).tolist())
+        return tuple(min(map(mask.__xor__, hashes)) for mask in self.masks)
+
+
+def similarity(left: Tuple[int, ...], right: Tuple[int, ...]) -> float:
+    """Estimated Jaccard similarity of two signatures."""
+    return sum(a == b for a, b in zip(left, right)) / len(left)
+
+
+class NearDuplicateIndex:
+    """Finds earlier texts whose estimated shingle Jaccard is >= threshold.
+
+    Signatures are banded (LSH) so only texts sharing a band are compared.
+    """
+
+    def __init__(self, threshold: float = 0.5, hasher: Optional[MinHasher] = None):
+        self.threshold = threshold
+        self.hasher = hasher or MinHasher()
+        self.bands, self.rows = choose_bands(self.hasher.num_perm, threshold)
+        self._buckets: List[Dict[Tuple[int, ...], List[str]]] = [defaultdict(list) for _ in range(self.bands)]
+        self._signatures: Dict[str, Tuple[int, ...]] = {}
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+    def check(self, key: str, text: str) -> Optional[Tuple[str, float]]:
+        """Return (earlier key, similarity) if text near-duplicates an earlier one;
+        otherwise remember text under key and return None."""
+        signature = self.hasher.signature(text)
+        match = self._best_match(signature)
+        if match is None:
+            self._add(key, signature)
+        return match
+
+    def _best_match(self, signature: Tuple[int, ...]) -> Optional[Tuple[str, float]]:
+        candidates = set()
+        for band, bucket in enumerate(self._buckets):
+            candidates.update(bucket.get(signature[band * self.rows:(band + 1) * self.rows], ()))
+        best = None
+        for key in candidates:
+            score = similarity(signature, self._signatures[key])
+            if score >= self.threshold and (best is None or score > best[1]):
+                best = (key, score)
+        return best
+
+    def _add(self, key: str, signature: Tuple[int, ...]) -> None:
+        self._signatures[key] = signature
+        for band, bucket in enumerate(self._buckets):
+            bucket[signature[band * self.rows:(band + 1) * self.rows]].append(key)
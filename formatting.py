@@ -0,0 +1,170 @@
+# formatting.py
+from typing import Dict, List, Optional
+import re
+import unicodedata
+
+# Appended after the post body, separated by SUFFIX_SEPARATOR
+PLATFORM_SUFFIXES = {
+    "twitter": "#Content #Social",
+    "instagram": "#Instagram #Social",
+    "linkedin": "#Professional #Development",
+    "facebook": "Like and share if you agree! 👍",
+    "youtube": "#Professional #Development",
+}
+SUFFIX_SEPARATOR = "\n\n"
+ELLIPSIS = "…"
+
+WORD = re.compile(r"\S+")
+ZWJ = "‍"
+
+
+def _extends_grapheme(char: str, previous: str) -> bool:
+    """Whether char belongs to the same user-perceived character as previous.
+
+    Approximates extended grapheme clusters without the regex module: combining
+    marks, variation selectors, emoji modifiers, ZWJ sequences and regional
+    indicator pairs (flags) stay with the preceding character.
+    """
+    code = ord(char)
+    return (
+        unicodedata.combining(char) != 0
+        or char == ZWJ
+        or previous == ZWJ
+        or 0xFE00 <= code <= 0xFE0F
+        or 0x1F3FB <= code <= 0x1F3FF
+        or 0xE0020 <= code <= 0xE007F
+        or unicodedata.category(char) in ("Mn", "Me")
+    )
+
+
+def grapheme_boundaries(text: str) -> List[int]:
+    """Offsets at which each grapheme cluster of text ends."""
+    boundaries = []
+    previous = ""
+    pending_flag = False
+    for offset, char in enumerate(text):
+        regional = 0x1F1E6 <= ord(char) <= 0x1F1FF
+        if boundaries and (_extends_grapheme(char, previous) or (regional and pending_flag)):
+            boundaries[-1] = offset + 1
+            pending_flag = False
+        else:
+            boundaries.append(offset + 1)
+            pending_flag = regional
+        previous = char
+    return boundaries
+
+
+def grapheme_count(text: str) -> int:
+    if text.isascii():
+        return len(text)
+    return len(grapheme_boundaries(text))
+
+
+class FormattedPost:
+    __slots__ = ("content", "word_count", "char_count", "grapheme_count", "truncated")
+
+    def __init__(self, content: str, word_count: int, char_count: int, grapheme_count: int, truncated: bool):
+        self.content = content
+        self.word_count = word_count
+        self.char_count = char_count
+        self.grapheme_count = grapheme_count
+        self.truncated = truncated
+
+
+class PostFormatter:
+    """Enforces a platform's char/word/grapheme limits and appends its suffix.
+
+    Room for the suffix (and an ellipsis when the body is cut) is reserved
+    from every limit up front, so the finished post, suffix included, always
+    fits. A suffix that would leave no room for at least one word or an
+    ellipsis under some limit is dropped rather than overflowing it. Each
+    body is scanned once, word by word: the cut point and the
+    word/char/grapheme counts come out of that same scan, and the body is
+    kept as a slice of the original text so its line breaks survive.
+    """
+
+    def __init__(self, platform: str, limits: Dict, suffix: Optional[str] = None):
+        self.platform = platform
+        self.suffix = PLATFORM_SUFFIXES.get(platform, "") if suffix is None else suffix
+        tail = SUFFIX_SEPARATOR + self.suffix if self.suffix else ""
+        if tail and not (
+            self._leaves_room(limits.get("words"), len(self.suffix.split()))
+            and self._leaves_room(limits.get("chars"), len(tail))
+            and self._leaves_room(limits.get("graphemes"), grapheme_count(tail))
+        ):
+            self.suffix = tail = ""
+        self.tail = tail
+        self.tail_words = len(self.suffix.split())
+        self.tail_chars = len(tail)
+        self.tail_graphemes = grapheme_count(tail)
+
+        def budget(limit: Optional[int], used: int) -> Optional[int]:
+            return max(limit - used, 0) if limit else None
+
+        self.max_words = budget(limits.get("words"), self.tail_words)
+        self.max_chars = budget(limits.get("chars"), self.tail_chars)
+        self.max_graphemes = budget(limits.get("graphemes"), self.tail_graphemes)
+
+    def format(self, content: str) -> FormattedPost:
+        text = content.strip()
+        words = graphemes = end = 0
+        # Last cut point that still leaves room for an ellipsis, used if the body is cut
+        safe_words = safe_graphemes = safe_end = 0
+        truncated = False
+
+        for match in WORD.finditer(text):
+            if self.max_words is not None and words >= self.max_words:
+                truncated = True
+                break
+            start, stop = match.span()
+            # Whitespace before the word plus the word itself
+            span_graphemes = grapheme_count(text[end:stop])
+            if not self._fits(stop, graphemes + span_graphemes, 0):
+                truncated = True
+                if words == 0:
+                    # A single word longer than the whole budget: cut inside it
+                    safe_end = self._cut_word(text, start, stop)
+                    safe_graphemes = grapheme_count(text[:safe_end])
+                    safe_words = 1 if safe_end > start else 0
+                break
+            words, end, graphemes = words + 1, stop, graphemes + span_graphemes
+            if self._fits(stop, graphemes, len(ELLIPSIS)):
+                safe_words, safe_end, safe_graphemes = words, end, graphemes
+
+        if truncated:
+            body = text[:safe_end] + ELLIPSIS
+            words, graphemes = safe_words, safe_graphemes + 1
+        else:
+            body = text[:end]
+
+        formatted = body + self.tail if body else self.suffix
+        return FormattedPost(
+            content=formatted,
+            word_count=words + self.tail_words,
+            char_count=len(formatted),
+            grapheme_count=graphemes + (self.tail_graphemes if body else grapheme_count(self.suffix)),
+            truncated=truncated
+        )
+
+    def format_batch(self, contents: List[str]) -> List[FormattedPost]:
+        return [self.format(content) for content in contents]
+
+    @staticmethod
+    def _leaves_room(limit: Optional[int], used: int) -> bool:
+        """Whether a limit still has room for one word or ellipsis after used."""
+        return not limit or limit - used >= len(ELLIPSIS)
+
+    def _fits(self, chars: int, graphemes: int, reserve: int) -> bool:
+        return (self.max_chars is None or chars + reserve <= self.max_chars) and (
+            self.max_graphemes is None or graphemes + reserve <= self.max_graphemes
+        )
+
+    def _cut_word(self, text: str, start: int, stop: int) -> int:
+        """End offset of the longest grapheme prefix of text[start:stop] that fits with an ellipsis."""
+        end = start
+        graphemes = grapheme_count(text[:start])
+        for boundary in grapheme_boundaries(text[start:stop]):
+            if not self._fits(start + boundary, graphemes + 1, len(ELLIPSIS)):
+                break
+            end, graphemes = start + boundary, graphemes + 1
+        return end
@@ -0,0 +1,165 @@
+# logging_config.py
+from contextvars import ContextVar
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional
+import atexit
+import copy
+import json
+import logging
+import os
+import queue
+import random
+import sys
+from datetime import datetime, timezone
+
+from cache import new_sortable_id
+
+# Set per request by the request-id middleware, per run by background jobs
+request_id: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+job_id: ContextVar[Optional[str]] = ContextVar("job_id", default=None)
+# Whether this request's agent traces are kept (decided once, so a trace is all or nothing)
+trace_sampled: ContextVar[Optional[bool]] = ContextVar("trace_sampled", default=None)
+
+AGENT_TRACE_LOGGER = "agent_trace"
+
+# Attributes every LogRecord has; anything else came in through extra={...}
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {
+    "message", "asctime", "taskName", "request_id", "job_id"
+}
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line with the request/job id and any extra fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, var in (("request_id", request_id), ("job_id", job_id)):
+            value = getattr(record, key, None) or var.get()
+            if value:
+                entry[key] = value
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRIBUTES and key not in entry:
+                entry[key] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class ContextFilter(logging.Filter):
+    """Copies the request/job id onto the record while still on the caller's thread."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = getattr(record, "request_id", None) or request_id.get() or ""
+        record.job_id = getattr(record, "job_id", None) or job_id.get() or ""
+        return True
+
+
+class _QueueHandler(QueueHandler):
+    """Enqueues records with the message and traceback rendered but not yet formatted."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg, record.args = record.message, None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class TraceSampler(logging.Filter):
+    """Keeps a fraction of agent traces: whole requests when one is active, else single records."""
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        sampled = trace_sampled.get()
+        if sampled is None:
+            return random.random() < self.rate
+        return sampled
+
+
+def parse_levels(spec: str) -> Dict[str, str]:
+    """"database=WARNING,agent_trace=INFO" -> {"database": "WARNING", "agent_trace": "INFO"}."""
+    levels = {}
+    for item in spec.split(","):
+        if "=" in item:
+            name, level = item.split("=", 1)
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+AGENT_TRACE_SAMPLE_RATE = float(os.getenv("AGENT_TRACE_SAMPLE_RATE", "0.01"))
+_listener: Optional[QueueListener] = None
+
+
+class RequestContextMiddleware:
+    """Gives each HTTP request an id (X-Request-ID if the client sent one) and a trace sampling decision."""
+
+    def __init__(self, app, header: str = "x-request-id"):
+        self.app = app
+        self.header = header.encode("latin-1")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        value = dict(scope.get("headers") or ()).get(self.header, b"").decode("latin-1")[:128]
+        current = value or new_sortable_id()
+        id_token = request_id.set(current)
+        sample_token = trace_sampled.set(random.random() < AGENT_TRACE_SAMPLE_RATE)
+
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers") or ()) + [(self.header, current.encode("latin-1"))]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            request_id.reset(id_token)
+            trace_sampled.reset(sample_token)
+
+
+def configure_logging() -> None:
+    """Route every logger through a queue to one stdout writer thread.
+
+    LOG_FORMAT=json (default) or text, LOG_LEVEL for the root logger and
+    LOG_LEVELS for per-logger overrides. Records are formatted and written by
+    the listener thread, so request threads only pay for the enqueue.
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    handler = logging.StreamHandler(sys.stdout)
+    if os.getenv("LOG_FORMAT", "json").lower() == "json":
+        handler.setFormatter(JsonFormatter())
+    else:
+        handler.setFormatter(logging.Formatter(
+            "%(asctime)s %(levelname)s %(name)s [%(request_id)s %(job_id)s] %(message)s"
+        ))
+
+    log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue(-1)
+    queue_handler = _QueueHandler(log_queue)
+    queue_handler.addFilter(ContextFilter())
+
+    root = logging.getLogger()
+    root.handlers = [queue_handler]
+    root.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+    for name, level in parse_levels(os.getenv("LOG_LEVELS", "")).items():
+        logging.getLogger(name).setLevel(level)
+    logging.getLogger(AGENT_TRACE_LOGGER).addFilter(TraceSampler(AGENT_TRACE_SAMPLE_RATE))
+
+    _listener = QueueListener(log_queue, handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
@@ -1,7 +1,6 @@
 import os
-from fastapi import FastAPI, UploadFile, File, HTTPException , Query, Form
-import json
-from typing import Optional, Dict, List, Union, Any
+from fastapi import FastAPI, UploadFile, File, HTTPException , Query, Form, Response
+from typing import Optional, Dict, List
 from pydantic import BaseModel
 from agents import (
     script_research_agent, qc_agent, script_rewriter_agent, regenrate_content_agent, regenrate_subcontent_agent,
@@ -12,23 +11,46 @@ from tasks import (
     script_research_task, qc_task, script_rewriter_task, regenrate_content_task, regenrate_subcontent_task,
     linkedin_task, instagram_task, facebook_task, twitter_task, wordpress_task, youtube_task, tiktok_task
 )
-from crewai import Crew, Process
-from tools import process_content_for_platform, extract_title_from_content, generate_unique_content,generate_different_content, FileProcessor
-from database import DatabaseManager
+from crewai import Crew
+from tools import extract_title_from_content, generate_unique_content,generate_different_content, FileProcessor
+from database import DatabaseManager, AsyncDatabaseManager
+from cache import create_temp_store, new_sortable_id, SpillStore
+from output_store import OutputStore
+from responses import FastJSONResponse, CompressionMiddleware
+from sentences import SentenceIndex, sentence_index
+from dedup import NearDuplicateIndex
+from formatting import FormattedPost, PostFormatter
+from phrase_filter import phrase_filter
+from agent_config import AgentConfigStore, ConfigVersionConflict
+from crew_registry import CrewRegistry, PLATFORMS
+from metrics import MetricsRegistry
+from usage import UsageTracker
+from logging_config import configure_logging, RequestContextMiddleware, job_id
+from profiling import ProfileStore, ProfilingMiddleware
 from pathlib import Path
 from models import Content, ContentStatus, PlatformEnum
+from schemas import ContentItem, WeeklyContent
 from fastapi.middleware.cors import CORSMiddleware
-import random
 from threading import Timer
 import time
 from datetime import datetime, timedelta
-from io import BytesIO
-import re
+import asyncio
+import hashlib
+import logging
 
+# JSON logs through a background writer; LOG_LEVEL, LOG_LEVELS and LOG_FORMAT configure it
+configure_logging()
+logger = logging.getLogger(__name__)
 
 app = FastAPI()
-# Initialize database manager
+# Initialize database managers: sync for writes, async for the read endpoints
 db_manager = DatabaseManager()
+async_db_manager = AsyncDatabaseManager()
+
+
+@app.on_event("shutdown")
+async def close_async_db():
+    await async_db_manager.dispose()
 
 
 # Add CORS Middleware
@@ -40,6 +62,100 @@ app.add_middleware(
     allow_headers=["*"],  # Adjust this to specify allowed headers
 )
 
+# Opt-in sampling profiles of single generation requests (X-Profile header or
+# ?profile= flag), only when PROFILING_ENABLED is set; with PROFILING_TOKEN the
+# flag must carry that token. Read back with GET /profiles/{id}.
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "false").lower() in ("1", "true", "yes")
+profile_store = ProfileStore(
+    os.getenv("PROFILE_DIR", "./profiles"),
+    keep=int(os.getenv("PROFILE_KEEP", "50"))
+)
+app.add_middleware(
+    ProfilingMiddleware,
+    store=profile_store,
+    paths=("/generate_social_media_scripts", "/generate_custom_scripts", "/extract_content"),
+    enabled=PROFILING_ENABLED,
+    token=os.getenv("PROFILING_TOKEN") or None,
+    interval=float(os.getenv("PROFILE_INTERVAL_MS", "5")) / 1000
+)
+
+# Request ids (X-Request-ID) on every log line and response, plus agent trace sampling
+app.add_middleware(RequestContextMiddleware)
+
+# Compress large responses (brotli when available and accepted, else gzip)
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=int(os.getenv("RESPONSE_COMPRESSION_MIN_BYTES", "1024"))
+)
+
+# Stage timings and pipeline counters, scraped at /metrics. With METRICS_ENABLED=false
+# every timer and counter is a no-op and /metrics returns 404.
+metrics = MetricsRegistry(enabled=os.getenv("METRICS_ENABLED", "true").lower() not in ("0", "false", "no"))
+extraction_bytes = metrics.counter("extraction_bytes_total", "Bytes of uploaded files passed to text extraction", ("file_type",))
+extracted_chars = metrics.counter("extracted_chars_total", "Characters of text extracted from uploads", ("file_type",))
+db_rows_stored = metrics.counter("db_rows_stored_total", "Content rows written to the database", ("endpoint",))
+qc_passes = metrics.counter("qc_passes_total", "Quality-control passes by outcome", ("outcome",))
+llm_tokens = metrics.counter("llm_tokens_total", "LLM tokens used per stage", ("endpoint", "stage", "platform", "type"))
+llm_cost = metrics.counter("llm_cost_usd_total", "Estimated LLM cost in USD per stage", ("endpoint", "stage", "platform"))
+
+
+def record_usage_metrics(endpoint: str, usage: UsageTracker) -> None:
+    if not metrics.enabled:
+        return
+    for row in usage.rows():
+        labels = {"endpoint": endpoint, "stage": row["stage"], "platform": row["platform"]}
+        metrics.inc(llm_tokens, row["prompt_tokens"], type="prompt", **labels)
+        metrics.inc(llm_tokens, row["completion_tokens"], type="completion", **labels)
+        metrics.inc(llm_cost, row["cost_usd"] or 0.0, **labels)
+
+
+def persist_usage(endpoint: str, kind: str, usage: UsageTracker, file_name: Optional[str] = None) -> None:
+    """Store and export the usage of a run that has no output run to carry it.
+
+    Covers failed generation runs, extraction and the regenerate endpoints, so
+    every kickoff's tokens show up in GET /usage.
+    """
+    rows = usage.rows()
+    if rows:
+        output_store.submit_usage(rows, kind, file_name=file_name)
+    record_usage_metrics(endpoint, usage)
+
+# Prompt overrides for agents/tasks; changes rebuild them in-process without a restart
+agent_config = AgentConfigStore(
+    os.getenv("AGENT_CONFIG_PATH", "./agent_config.json"),
+    agents={
+        "script_research_agent": script_research_agent,
+        "qc_agent": qc_agent,
+        "script_rewriter_agent": script_rewriter_agent,
+        "linkedin_agent": linkedin_agent,
+        "instagram_agent": instagram_agent,
+        "facebook_agent": facebook_agent,
+        "twitter_agent": twitter_agent,
+        "wordpress_agent": wordpress_agent,
+        "youtube_agent": youtube_agent,
+        "tiktok_agent": tiktok_agent,
+        "regenrate_content_agent": regenrate_content_agent,
+        "regenrate_subcontent_agent": regenrate_subcontent_agent,
+    },
+    tasks={
+        "script_research_task": script_research_task,
+        "qc_task": qc_task,
+        "script_rewriter_task": script_rewriter_task,
+        "linkedin_task": linkedin_task,
+        "instagram_task": instagram_task,
+        "facebook_task": facebook_task,
+        "twitter_task": twitter_task,
+        "wordpress_task": wordpress_task,
+        "youtube_task": youtube_task,
+        "tiktok_task": tiktok_task,
+        "regenrate_content_task": regenrate_content_task,
+        "regenrate_subcontent_task": regenrate_subcontent_task,
+    }
+)
+
+# Research, QC, rewrite and per-platform crews, rebuilt when the config version changes
+crew_registry = CrewRegistry(agent_config)
+
 # Ensure the uploads directory exists
 UPLOAD_DIR = './uploads'
 OUTPUT_DIR = './outputs'
@@ -54,17 +170,150 @@ class ContentResponse(BaseModel):
     timestamp: str
     word_count: int
     char_count: int
+    duplicate_of: Optional[str] = None
+    similarity: Optional[float] = None
 
-def save_output_to_file(data: Dict, filename: str) -> str:
-    """Save generated content to a JSON file"""
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    output_filename = f"{filename}_{timestamp}.json"
-    output_path = os.path.join(OUTPUT_DIR, output_filename)
-    
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=4, ensure_ascii=False)
-    
-    return output_path
+
+# Near-duplicate handling for a run's posts: off, flag (kept, and stored with status
+# "duplicate" for review), drop, or regenerate (shift the sentence window, drop if
+# still a duplicate)
+DUPLICATE_POLICY = os.getenv("DUPLICATE_POLICY", "flag").lower()
+DUPLICATE_THRESHOLD = float(os.getenv("DUPLICATE_THRESHOLD", "0.5"))
+DUPLICATE_REGENERATE_ATTEMPTS = int(os.getenv("DUPLICATE_REGENERATE_ATTEMPTS", "2"))
+
+
+def deduplicate_post(duplicates: Optional[NearDuplicateIndex], label: str, post: FormattedPost, regenerate):
+    """Apply DUPLICATE_POLICY to one formatted post.
+
+    regenerate(attempt) returns a replacement FormattedPost. Returns (post, duplicate)
+    where post is None if it should be dropped and duplicate is the
+    (label, similarity) of the earlier post it repeats, if any.
+    """
+    if duplicates is None:
+        return post, None
+    duplicate = duplicates.check(label, post.content)
+    if duplicate and DUPLICATE_POLICY == "regenerate":
+        for attempt in range(1, DUPLICATE_REGENERATE_ATTEMPTS + 1):
+            candidate = regenerate(attempt)
+            duplicate = duplicates.check(label, candidate.content)
+            if duplicate is None:
+                return candidate, None
+    if duplicate and DUPLICATE_POLICY in ("drop", "regenerate"):
+        return None, duplicate
+    return post, duplicate
+
+
+def new_duplicate_index() -> Optional[NearDuplicateIndex]:
+    return NearDuplicateIndex(DUPLICATE_THRESHOLD) if DUPLICATE_POLICY != "off" else None
+
+
+# QC_MODE=auto checks research output with the compiled forbidden-phrase filter
+# first: clean text skips the LLM QC pass, and text whose phrases all have a
+# rewrite is fixed in place. QC_MODE=llm always runs the LLM pass, and so does
+# auto while the QC agent or task prompts are overridden, since the compiled
+# list only mirrors the default prompts.
+QC_MODE = os.getenv("QC_MODE", "auto").lower()
+QC_CONFIG_NAMES = ("qc_agent", "qc_task")
+
+
+def qc_filter_applies() -> bool:
+    """Whether the active QC prompts are still the ones phrase_filter was written from."""
+    return all(agent_config.values(name) == agent_config.defaults(name) for name in QC_CONFIG_NAMES)
+
+
+def run_quality_control(researched_content: str, usage: UsageTracker) -> str:
+    """Return QC-cleaned content, calling the QC crew only when needed."""
+    if QC_MODE != "llm" and not qc_filter_applies():
+        logger.info("QC: QC prompts are overridden, running the LLM QC pass")
+    elif QC_MODE != "llm":
+        if phrase_filter.is_clean(researched_content):
+            logger.info("QC: no forbidden phrases found, skipping LLM QC pass")
+            metrics.inc(qc_passes, outcome="clean")
+            return researched_content
+        rewritten, unresolved = phrase_filter.rewrite(researched_content)
+        if not unresolved:
+            logger.info("QC: forbidden phrases rewritten, skipping LLM QC pass")
+            metrics.inc(qc_passes, outcome="rewritten")
+            return rewritten
+        logger.info(f"QC: {len(unresolved)} phrases need the LLM QC pass: {', '.join(sorted(set(unresolved)))}")
+        researched_content = rewritten
+
+    metrics.inc(qc_passes, outcome="llm")
+    qc_crew = crew_registry.get("qc")
+    qc_result = usage.kickoff(
+        qc_crew,
+        "qc",
+        inputs={
+            "text": researched_content
+        }
+    )
+
+    # Handle CrewOutput correctly
+    if hasattr(qc_result, 'output'):
+        return qc_result.output
+    elif isinstance(qc_result, dict) and 'output' in qc_result:
+        return qc_result['output']
+    return researched_content
+
+
+def scrub(text: str) -> str:
+    """Rewrite forbidden phrases in a final post before it is formatted."""
+    return phrase_filter.rewrite(text)[0]
+
+
+# Generation outputs are appended to compressed NDJSON segments by a background writer
+output_store = OutputStore(
+    OUTPUT_DIR,
+    retention_days=int(os.environ["OUTPUT_RETENTION_DAYS"]) if os.getenv("OUTPUT_RETENTION_DAYS") else None
+)
+
+
+def backfill_output_index():
+    job_id.set(f"output-backfill-{new_sortable_id()}")
+    try:
+        indexed = output_store.backfill_index()
+        logger.info(f"Output store: indexed {indexed} earlier runs")
+    except Exception as e:
+        logger.error(f"Output index backfill error: {str(e)}")
+
+
+@app.on_event("startup")
+def start_output_index_backfill():
+    # Legacy JSON files are imported off the request path
+    Timer(0, backfill_output_index).start()
+
+
+@app.on_event("shutdown")
+def close_output_store():
+    output_store.close()
+
+
+# How often output segments older than OUTPUT_RETENTION_DAYS are removed;
+# independent of the archival job, 0 disables it
+OUTPUT_MAINTENANCE_INTERVAL_SECONDS = int(os.getenv("OUTPUT_MAINTENANCE_INTERVAL_SECONDS", str(24 * 60 * 60)))
+
+
+def run_output_maintenance():
+    job_id.set(f"output-maintenance-{new_sortable_id()}")
+    try:
+        removed = output_store.apply_retention()
+        logger.info(f"Output store: removed {removed} expired segments")
+    except Exception as e:
+        logger.error(f"Output store maintenance error: {str(e)}")
+    finally:
+        schedule_output_maintenance()
+
+
+def schedule_output_maintenance():
+    timer = Timer(OUTPUT_MAINTENANCE_INTERVAL_SECONDS, run_output_maintenance)
+    timer.daemon = True
+    timer.start()
+
+
+@app.on_event("startup")
+def start_output_maintenance():
+    if OUTPUT_MAINTENANCE_INTERVAL_SECONDS > 0 and output_store.retention_days is not None:
+        schedule_output_maintenance()
 
 # # Word/Character count limits for each platform
 # PLATFORM_LIMITS = {
@@ -84,17 +333,20 @@ async def upload_file(file: UploadFile = File(...)):
         file_path = os.path.join(UPLOAD_DIR, file.filename) 
         with open(file_path, "wb") as buffer:
             buffer.write(file.file.read())
-        print(f"File successfully uploaded: {file_path}")
+        logger.info(f"File successfully uploaded: {file_path}")
         return {"file_path": file_path, "message": "File uploaded successfully."}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"File upload failed: {e}")
 
-@app.post("/generate_social_media_scripts")
+@app.post("/generate_social_media_scripts", response_class=FastJSONResponse)
 async def generate_social_media_scripts(
     file: UploadFile = File(...),
     weeks: int = 1,
     platform: str = "all"
-) -> Dict:
+) -> FastJSONResponse:
+    # Token usage of every kickoff in this run
+    run_usage = UsageTracker()
+    output_run_id = None
     try:
         # Save and extract text from file
         file_path = os.path.join(UPLOAD_DIR, file.filename)
@@ -107,9 +359,12 @@ async def generate_social_media_scripts(
 
         processor = FileProcessor()
         try:
-            extracted_text = processor.extract_text_from_file(file_path)
-            print(f"Successfully extracted text from {file.filename}")
-            print(f"Extracted text length: {len(extracted_text)} characters")
+            with metrics.stage("social", "extract"):
+                extracted_text = processor.extract_text_from_file(file_path)
+            metrics.inc(extraction_bytes, len(content), file_type=file_type)
+            metrics.inc(extracted_chars, len(extracted_text), file_type=file_type)
+            logger.info(f"Successfully extracted text from {file.filename}")
+            logger.info(f"Extracted text length: {len(extracted_text)} characters")
         except Exception as e:
             raise HTTPException(
                 status_code=400,
@@ -117,172 +372,193 @@ async def generate_social_media_scripts(
             )
 
         # Research Phase
-        research_crew = Crew(
-            agents=[script_research_agent],
-            tasks=[script_research_task],
-            process=Process.sequential
-        )
-        research_result = research_crew.kickoff(
-            inputs={
-                "text": extracted_text,
-                "file_path": file_path
-            }
-        )
+        research_crew = crew_registry.get("research")
+        with metrics.stage("social", "research"):
+            research_result = run_usage.kickoff(
+                research_crew,
+                "research",
+                inputs={
+                    "text": extracted_text,
+                    "file_path": file_path
+                }
+            )
         researched_content = research_result['output'] if isinstance(research_result, dict) else extracted_text
 
-        # QC Phase
-        qc_crew = Crew(
-            agents=[qc_agent],
-            tasks=[qc_task],
-            process=Process.sequential
-        )
-        qc_result = qc_crew.kickoff(
-            inputs={
-                "text": researched_content
-            }
-        )
-        cleaned_content = qc_result['output'] if isinstance(qc_result, dict) else researched_content
+        # QC Phase (the LLM pass only runs when the phrase filter can't settle it)
+        with metrics.stage("social", "qc"):
+            cleaned_content = run_quality_control(researched_content, run_usage)
+        # Segment once; every day's window is sliced from this index
+        cleaned_sentences = SentenceIndex(cleaned_content)
 
         # Platform selection
-        platforms = {
-            "linkedin": (linkedin_agent, linkedin_task),
-            "instagram": (instagram_agent, instagram_task),
-            "facebook": (facebook_agent, facebook_task),
-            "twitter": (twitter_agent, twitter_task),
-            "wordpress": (wordpress_agent, wordpress_task),
-            "youtube": (youtube_agent, youtube_task),
-            "tiktok": (tiktok_agent, tiktok_task)
-        }
-
-        if platform != "all" and platform not in platforms:
+        if platform != "all" and platform not in PLATFORMS:
             raise HTTPException(
                 status_code=400,
-                detail=f"Invalid platform: {platform}. Available platforms: {', '.join(platforms.keys())}"
+                detail=f"Invalid platform: {platform}. Available platforms: {', '.join(PLATFORMS)}"
             )
 
-        selected_platforms = platforms.items() if platform == "all" else [(platform, platforms[platform])]
+        selected_platforms = PLATFORMS if platform == "all" else [platform]
         
         # Generate content for each platform
         results = {}
-        for platform_name, (agent, task) in selected_platforms:
-            platform_crew = Crew(
-                agents=[agent],
-                tasks=[task],
-                process=Process.sequential
-            )
+        for platform_name in selected_platforms:
+            platform_crew = crew_registry.get(platform_name)
             
             platform_posts = []
+            duplicates = new_duplicate_index()
+            formatter = PostFormatter(platform_name, PLATFORM_LIMITS[platform_name])
             for week in range(1, weeks + 1):
                 for day in ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "saturday", "sunday"]:
                     # Generate unique content for each day
-                    crew_result = platform_crew.kickoff(
-                        inputs={
-                            "text": cleaned_content,
-                            "day": day,
-                            "week": week,
-                            "platform": platform_name,
-                            "limits": PLATFORM_LIMITS[platform_name]
-                        }
-                    )
-                    
-                    # Generate unique content based on the day and week
-                    raw_content = generate_unique_content(
-                        crew_result['output'] if isinstance(crew_result, dict) else cleaned_content,
-                        week,
-                        day,
-                        platform_name
-                    )
+                    with metrics.stage("social", "platform_kickoff", platform_name):
+                        crew_result = run_usage.kickoff(
+                            platform_crew,
+                            "platform_kickoff",
+                            platform=platform_name,
+                            inputs={
+                                "text": cleaned_content,
+                                "day": day,
+                                "week": week,
+                                "platform": platform_name,
+                                "limits": PLATFORM_LIMITS[platform_name]
+                            }
+                        )
                     
-                    # Process content according to platform limits
-                    processed_content = process_content_for_platform(
-                        raw_content, 
-                        platform_name,
-                        PLATFORM_LIMITS[platform_name]
-                    )
+                    with metrics.stage("social", "post_processing", platform_name):
+                        # Generate unique content based on the day and week
+                        day_content = crew_result['output'] if isinstance(crew_result, dict) else cleaned_sentences
+                        raw_content = generate_unique_content(
+                            day_content,
+                            week,
+                            day,
+                            platform_name
+                        )
+                        
+                        # Enforce platform limits; counts come from the same pass
+                        formatted = formatter.format(scrub(raw_content))
+
+                    # Skip or replace windows that repeat an earlier post
+                    with metrics.stage("social", "deduplicate", platform_name):
+                        formatted, duplicate = deduplicate_post(
+                            duplicates,
+                            f"Week {week} - {day}",
+                            formatted,
+                            lambda attempt: formatter.format(scrub(
+                                generate_unique_content(day_content, week, day, platform_name, shift=attempt * 5)
+                            ))
+                        )
+                    if formatted is None:
+                        continue
                     
                     # Extract title from content
-                    title = extract_title_from_content(processed_content)
-                    
-                    # Calculate word and character counts
-                    word_count = len(processed_content.split())
-                    char_count = len(processed_content)
+                    title = extract_title_from_content(formatted.content)
                     
                     post = ContentResponse(
                         week_day=f"Week {week} - {day}",
                         title=title,
-                        content=processed_content,
+                        content=formatted.content,
                         platform=platform_name,
                         timestamp=datetime.now().isoformat(),
-                        word_count=word_count,
-                        char_count=char_count
+                        word_count=formatted.word_count,
+                        char_count=formatted.char_count,
+                        duplicate_of=duplicate[0] if duplicate else None,
+                        similarity=round(duplicate[1], 3) if duplicate else None
                     )
                     platform_posts.append(post.dict())
             
             results[platform_name] = platform_posts
 
-        # Save to JSON file
-        output_file = os.path.join(OUTPUT_DIR, f"content_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(results, f, indent=4, ensure_ascii=False)
+        # Queue the run for the output store
+        with metrics.stage("social", "output_store"):
+            output_run_id = output_store.submit(
+                results,
+                kind="content",
+                file_name=file.filename,
+                source_hash=hashlib.sha256(content).hexdigest(),
+                usage=run_usage.rows()
+            )
+        record_usage_metrics("social", run_usage)
 
         # Store in database
         try:
-            stored_contents = db_manager.store_content(
-                content_data=results,
-                file_name=file.filename,
-                file_type=file_type
-            )
+            with metrics.stage("social", "store_content"):
+                stored_contents = db_manager.store_content(
+                    content_data=results,
+                    file_name=file.filename,
+                    file_type=file_type
+                )
+            metrics.inc(db_rows_stored, len(stored_contents), endpoint="social")
             db_storage_status = "success"
             db_storage_message = f"Successfully stored {len(stored_contents)} content items in database"
         except Exception as e:
             db_storage_status = "failed"
             db_storage_message = f"Failed to store in database: {str(e)}"
-            print(f"Database storage error: {str(e)}")
+            logger.error(f"Database storage error: {str(e)}")
         
-        return {
+        return FastJSONResponse({
             "status": "success",
             "message": "Content generated successfully",
-            "output_file": output_file,
+            # Runs no longer get their own JSON file; this points at GET /outputs/{run_id}
+            "output_file": f"/outputs/{output_run_id}",
+            "output_run_id": output_run_id,
+            "usage": run_usage.summary(),
             "database_storage": {
                 "status": db_storage_status,
                 "message": db_storage_message
             },
             "results": results
-        }
+        })
 
     except Exception as e:
-        print(f"Error during content generation: {str(e)}")
+        logger.exception(f"Error during content generation: {str(e)}")
         raise HTTPException(
             status_code=500,
             detail=f"Content generation failed: {str(e)}"
         )
     finally:
+        # A run that failed before its output was queued still spent tokens
+        if output_run_id is None:
+            persist_usage("social", "content", run_usage, file.filename)
         # Cleanup uploaded file
         if 'file_path' in locals() and os.path.exists(file_path):
             os.remove(file_path)
 
+def content_summary(content) -> Dict:
+    """Listing projection of a content row (no body)"""
+    return {
+        "id": content.id,
+        "week": content.week,
+        "day": content.day,
+        "title": content.title,
+        "platform": content.platform.value,
+        "date_upload": content.date_upload.isoformat()
+    }
+
+
+def content_detail(content: Content) -> Dict:
+    """Full representation of a content row, including its body"""
+    return {
+        "id": content.id,
+        "week": content.week,
+        "day": content.day,
+        "title": content.title,
+        "content": content.content,
+        "platform": content.platform.value,
+        "date_upload": content.date_upload.isoformat(),
+        "file_name": content.file_name
+    }
+
+
 # Add new endpoint to get content from database
 @app.get("/get_pending_content")
 async def get_pending_content():
-    """Get all pending content from database"""
+    """Get a listing of all pending content from database (bodies via /content/{id})"""
     try:
-        pending_content = db_manager.get_pending_content()
+        pending_content = await async_db_manager.get_pending_content_summaries()
         return {
             "status": "success",
             "count": len(pending_content),
-            "content": [
-                {
-                    "id": content.id,
-                    "week": content.week,
-                    "day": content.day,
-                    "title": content.title,
-                    "content": content.content,
-                    "platform": content.platform.value,
-                    "date_upload": content.date_upload.isoformat(),
-                    "file_name": content.file_name
-                }
-                for content in pending_content
-            ]
+            "content": [content_summary(content) for content in pending_content]
         }
     except Exception as e:
         raise HTTPException(
@@ -296,21 +572,15 @@ async def get_pending_content():
 async def get_pending_content():
     """Get all pending files from database"""
     try:
-        pending_files = db_manager.get_pending_content()
-        
-        # Use a dictionary to ensure distinct file names
-        unique_files = {}
-        for content in pending_files:
-            if content.file_name not in unique_files:
-                unique_files[content.file_name] = content
+        pending_files = await async_db_manager.get_pending_files()
 
-        # Convert the unique files into the desired response format
+        # Convert the distinct files into the desired response format
         distinct_files = [
             {
-                "date_upload": unique_files[file_name].date_upload.isoformat(),
-                "file_name": file_name
+                "date_upload": pending_file.date_upload.isoformat(),
+                "file_name": pending_file.file_name
             }
-            for file_name in unique_files
+            for pending_file in pending_files
         ]
         
         return {
@@ -328,10 +598,10 @@ async def get_pending_content():
 # Add new endpoint to get content from database
 @app.get("/get_pending_content_file", response_model=dict)
 async def get_pending_content(file_name: str = Query(..., description="The name of the file to filter content by")):
-    """Get all pending content from a specific file based on file_name."""
+    """Get a listing of pending content from a specific file based on file_name."""
     try:
-        # Fetch content from the database filtered by file_name
-        pending_content = db_manager.get_pending_content_file(file_name=file_name)
+        # Fetch listing rows from the database filtered by file_name
+        pending_content = await async_db_manager.get_pending_content_summaries(file_name=file_name)
         
         if not pending_content:
             raise HTTPException(status_code=404, detail="No content found for the specified file.")
@@ -340,20 +610,10 @@ async def get_pending_content(file_name: str = Query(..., description="The name
         return {
             "status": "success",
             "count": len(pending_content),
-            "content": [
-                {
-                    "id": content.id,
-                    "week": content.week,
-                    "day": content.day,
-                    "title": content.title,
-                    "content": content.content,
-                    "platform": content.platform,
-                    "date_upload": content.date_upload.isoformat(),
-                    "file_name": content.file_name
-                }
-                for content in pending_content
-            ]
+            "content": [content_summary(content) for content in pending_content]
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -361,34 +621,163 @@ async def get_pending_content(file_name: str = Query(..., description="The name
         )
 
 
+@app.get("/content/{content_id}")
+async def get_content(content_id: int):
+    """Get a single content entry with its full body."""
+    try:
+        content = await async_db_manager.get_content_by_id(content_id)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to fetch content: {str(e)}")
 
-@app.put("/regenerate_script")
-async def regenerate_script(content: str):
+    if not content:
+        raise HTTPException(status_code=404, detail="Content not found")
+
+    return {"status": "success", "content": content_detail(content)}
+
+
+@app.get("/content")
+async def get_contents(ids: str = Query(..., description="Comma-separated content ids, e.g. 1,2,3")):
+    """Get the full bodies of several content entries in one request."""
+    try:
+        content_ids = [int(content_id) for content_id in ids.split(",") if content_id.strip()]
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid ids: {ids}. Expected comma-separated integers")
+
+    try:
+        contents = await async_db_manager.get_content_by_ids(content_ids)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to fetch content: {str(e)}")
+
+    found_ids = {content.id for content in contents}
+    return {
+        "status": "success",
+        "count": len(contents),
+        "content": [content_detail(content) for content in contents],
+        "missing_ids": [content_id for content_id in content_ids if content_id not in found_ids]
+    }
+
+
+
+class StatusUpdateRequest(BaseModel):
+    status: str
+    ids: Optional[List[int]] = None
+    file_name: Optional[str] = None
+    platform: Optional[str] = None
+    week: Optional[int] = None
+
+
+@app.put("/update_content_status")
+async def update_content_status(request: StatusUpdateRequest):
     """
-    Regenerate a script by its content using the script writer agent.
-    
-    Args:
-        content: The content of the content to regenerate
-        
-    Returns:
-        Dict containing the regenerated script details and status
+    Set the status of many content entries at once.
+
+    Entries are selected by ids and/or file_name, platform and week
+    (e.g. every post of a file for one platform and week).
     """
-    session = next(db_manager.get_db_session())
     try:
-        # Get the existing content
-        content = session.query(Content).filter(Content.content== content).first()
-        if not content:
-            raise HTTPException(status_code=404, detail="Content not found")
+        status = ContentStatus(request.status.lower())
+    except ValueError:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid status: {request.status}. Valid statuses are: {', '.join(s.value for s in ContentStatus)}"
+        )
 
-        # Create crew with script writer agent
-        script_crew = Crew(
-            agents=[script_rewriter_agent],
-            tasks=[script_rewriter_task],
-            process=Process.sequential
+    platform = None
+    if request.platform:
+        if request.platform.upper() not in PlatformEnum.__members__:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Invalid platform: {request.platform}. Available platforms: {', '.join(p.value.lower() for p in PlatformEnum)}"
+            )
+        platform = PlatformEnum[request.platform.upper()]
+
+    if not (request.ids or request.file_name or platform or request.week):
+        raise HTTPException(status_code=400, detail="Provide ids or at least one of file_name, platform, week.")
+
+    try:
+        updated_ids = await asyncio.to_thread(
+            db_manager.update_content_status_bulk,
+            status,
+            content_ids=request.ids,
+            file_name=request.file_name,
+            platform=platform,
+            week=request.week
         )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to update content status: {str(e)}")
+
+    return {
+        "status": "success",
+        "message": f"Updated {len(updated_ids)} content items to {status.value}",
+        "updated": len(updated_ids),
+        "ids": updated_ids
+    }
+
+
+# Uploaded content older than this many days is moved to content_archive
+ARCHIVE_AFTER_DAYS = int(os.getenv("ARCHIVE_AFTER_DAYS", "30"))
+# How often the archival job runs; 0 disables the background job
+ARCHIVE_INTERVAL_SECONDS = int(os.getenv("ARCHIVE_INTERVAL_SECONDS", str(24 * 60 * 60)))
+
+
+def run_archival_job():
+    """Archive old uploaded content, keep partitions ahead of time, then reschedule."""
+    job_id.set(f"archival-{new_sortable_id()}")
+    try:
+        archived = db_manager.archive_uploaded_content(ARCHIVE_AFTER_DAYS)
+        db_manager.ensure_content_partitions()
+        logger.info(f"Archived {archived} uploaded content items older than {ARCHIVE_AFTER_DAYS} days")
+    except Exception as e:
+        logger.error(f"Archival job error: {str(e)}")
+    finally:
+        schedule_archival_job()
+
+
+def schedule_archival_job():
+    timer = Timer(ARCHIVE_INTERVAL_SECONDS, run_archival_job)
+    timer.daemon = True
+    timer.start()
+
+
+@app.on_event("startup")
+async def start_archival_job():
+    if ARCHIVE_INTERVAL_SECONDS > 0:
+        schedule_archival_job()
+
+
+@app.post("/archive_content")
+async def archive_content(older_than_days: int = ARCHIVE_AFTER_DAYS):
+    """Move uploaded content older than older_than_days into the archive table now."""
+    if older_than_days < 0:
+        raise HTTPException(status_code=400, detail="older_than_days must not be negative.")
+    try:
+        archived = await asyncio.to_thread(db_manager.archive_uploaded_content, older_than_days)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to archive content: {str(e)}")
+
+    return {
+        "status": "success",
+        "message": f"Archived {archived} content items",
+        "archived": archived
+    }
 
-        # Generate new script
-        crew_result = script_crew.kickoff(
+
+# Maximum number of script rewrites run in parallel by /regenerate_scripts
+REGENERATE_CONCURRENCY = int(os.getenv("REGENERATE_CONCURRENCY", "4"))
+
+
+class RegenerateBatchRequest(BaseModel):
+    ids: List[int]
+
+
+def rewrite_script(script_crew: Crew, content: Content, usage: UsageTracker) -> tuple:
+    """Run the script rewriter over a stored post and return (processed_content, title)."""
+    # Generate new script
+    with metrics.stage("regenerate_script", "rewrite", content.platform.value.lower()):
+        crew_result = usage.kickoff(
+            script_crew,
+            "rewrite",
+            platform=content.platform.value.lower(),
             inputs={
                 "text": content.content,
                 "day": content.day,
@@ -398,32 +787,55 @@ async def regenerate_script(content: str):
             }
         )
 
-        # Extract the text content from crew result
-        if isinstance(crew_result, dict):
-            new_content = str(crew_result.get('output', ''))
-        elif hasattr(crew_result, 'raw_output'):
-            new_content = str(crew_result.raw_output)
-        elif hasattr(crew_result, 'output'):
-            new_content = str(crew_result.output)
-        else:
-            new_content = str(crew_result)
+    # Extract the text content from crew result
+    if isinstance(crew_result, dict):
+        new_content = str(crew_result.get('output', ''))
+    elif hasattr(crew_result, 'raw_output'):
+        new_content = str(crew_result.raw_output)
+    elif hasattr(crew_result, 'output'):
+        new_content = str(crew_result.output)
+    else:
+        new_content = str(crew_result)
 
-        # Ensure we have content to process
-        if not new_content:
-            raise HTTPException(
-                status_code=500,
-                detail="Failed to generate new content"
-            )
+    # Ensure we have content to process
+    if not new_content:
+        raise ValueError("Failed to generate new content")
 
-        # Process the new content according to platform limits
-        processed_content = process_content_for_platform(
-            new_content,
-            content.platform.value.lower(),
-            PLATFORM_LIMITS[content.platform.value.lower()]
-        )
+    # Process the new content according to platform limits
+    platform = content.platform.value.lower()
+    processed_content = PostFormatter(platform, PLATFORM_LIMITS[platform]).format(scrub(new_content)).content
+
+    # Generate new title
+    return processed_content, extract_title_from_content(processed_content)
+
+
+@app.put("/regenerate_script")
+async def regenerate_script(content_id: Optional[int] = None, content_hash: Optional[str] = None):
+    """
+    Regenerate a script using the script writer agent.
+    
+    Args:
+        content_id: The id of the content to regenerate (preferred)
+        content_hash: SHA-256 hex digest of the content's body, looked up via its index
+        
+    Returns:
+        Dict containing the regenerated script details and status
+    """
+    if content_id is None and content_hash is None:
+        raise HTTPException(status_code=400, detail="Either content_id or content_hash must be provided")
 
-        # Generate new title
-        new_title = extract_title_from_content(processed_content)
+    run_usage = UsageTracker()
+    session = next(db_manager.get_db_session())
+    try:
+        # Get the existing content
+        if content_id is not None:
+            content = session.query(Content).filter(Content.id == content_id).first()
+        else:
+            content = session.query(Content).filter(Content.content_hash == content_hash.lower()).first()
+        if not content:
+            raise HTTPException(status_code=404, detail="Content not found")
+
+        processed_content, new_title = rewrite_script(crew_registry.get("rewrite"), content, run_usage)
 
         # Update the content in the database
         content.content = processed_content
@@ -433,18 +845,13 @@ async def regenerate_script(content: str):
         return {
             "status": "success",
             "message": "Script regenerated successfully",
-            "content": {
-                "id": content.id,
-                "week": content.week,
-                "day": content.day,
-                "title": new_title,
-                "content": processed_content,
-                "platform": content.platform.value,
-                "date_upload": content.date_upload.isoformat(),
-                "file_name": content.file_name
-            }
+            "usage": run_usage.summary(),
+            "content": content_detail(content)
         }
 
+    except HTTPException:
+        session.rollback()
+        raise
     except Exception as e:
         session.rollback()
         raise HTTPException(
@@ -452,18 +859,82 @@ async def regenerate_script(content: str):
             detail=f"Failed to regenerate script: {str(e)}"
         )
     finally:
+        persist_usage("regenerate_script", "regenerate_script", run_usage)
         session.close()
 
 
+@app.put("/regenerate_scripts")
+async def regenerate_scripts(request: RegenerateBatchRequest):
+    """
+    Regenerate many scripts concurrently and commit all results in one transaction.
+
+    Ids that are missing or fail to regenerate are reported and left unchanged.
+    """
+    content_ids = list(dict.fromkeys(request.ids))
+    if not content_ids:
+        raise HTTPException(status_code=400, detail="ids must not be empty")
+
+    run_usage = UsageTracker()
+    session = next(db_manager.get_db_session())
+    try:
+        contents = session.query(Content).filter(Content.id.in_(content_ids)).all()
+        found_ids = {content.id for content in contents}
 
+        base_crew = crew_registry.get("rewrite")
+        semaphore = asyncio.Semaphore(REGENERATE_CONCURRENCY)
 
-@app.post("/generate_custom_scripts")
+        async def regenerate_one(content: Content):
+            async with semaphore:
+                # Each kickoff gets its own copy so parallel runs don't share task state
+                return await asyncio.to_thread(rewrite_script, base_crew.copy(), content, run_usage)
+
+        outcomes = await asyncio.gather(
+            *(regenerate_one(content) for content in contents),
+            return_exceptions=True
+        )
+
+        regenerated, failed = [], []
+        for content, outcome in zip(contents, outcomes):
+            if isinstance(outcome, Exception):
+                failed.append({"id": content.id, "error": str(outcome)})
+                continue
+            content.content, content.title = outcome
+            regenerated.append(content)
+
+        session.commit()
+
+        return {
+            "status": "success" if not failed else "partial",
+            "message": f"Regenerated {len(regenerated)} of {len(content_ids)} scripts",
+            "usage": run_usage.summary(),
+            "content": [content_detail(content) for content in regenerated],
+            "failed": failed,
+            "missing_ids": [content_id for content_id in content_ids if content_id not in found_ids]
+        }
+
+    except Exception as e:
+        session.rollback()
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to regenerate scripts: {str(e)}"
+        )
+    finally:
+        persist_usage("regenerate_scripts", "regenerate_script", run_usage)
+        session.close()
+
+
+
+
+@app.post("/generate_custom_scripts", response_class=FastJSONResponse)
 async def generate_custom_scripts(
     file: UploadFile = File(...),
     weeks: int = 1,
     days: str = "Monday,Wednesday,Friday",  # Example default value
     platform_posts: str = "instagram:3,facebook:2,twitter:1"  # Example default value
-) -> Dict:
+) -> FastJSONResponse:
+    # Token usage of every kickoff in this run
+    run_usage = UsageTracker()
+    output_run_id = None
     try:
         # Save and extract text from file
         file_path = os.path.join(UPLOAD_DIR, file.filename)
@@ -499,9 +970,12 @@ async def generate_custom_scripts(
 
         processor = FileProcessor()
         try:
-            extracted_text = processor.extract_text_from_file(file_path)
-            print(f"Successfully extracted text from {file.filename}")
-            print(f"Extracted text length: {len(extracted_text)} characters")
+            with metrics.stage("custom", "extract"):
+                extracted_text = processor.extract_text_from_file(file_path)
+            metrics.inc(extraction_bytes, len(content), file_type=file_type)
+            metrics.inc(extracted_chars, len(extracted_text), file_type=file_type)
+            logger.info(f"Successfully extracted text from {file.filename}")
+            logger.info(f"Extracted text length: {len(extracted_text)} characters")
         except Exception as e:
             raise HTTPException(
                 status_code=400,
@@ -519,140 +993,134 @@ async def generate_custom_scripts(
         research_inputs['day'] = selected_days[0] if selected_days else 'Monday' # Default day
 
         # Research Phase
-        research_crew = Crew(
-            agents=[script_research_agent],
-            tasks=[script_research_task],
-            process=Process.sequential
-        )
-        research_result = research_crew.kickoff(
-            inputs={
-                "text": extracted_text,
-                "file_path": file_path,
-                "week": "1",  # Convert to string to match format in extract_content
-                "day": "Monday"  # Provide a default day if not already specified
-            }
-        )
+        research_crew = crew_registry.get("research")
+        with metrics.stage("custom", "research"):
+            research_result = run_usage.kickoff(
+                research_crew,
+                "research",
+                inputs={
+                    "text": extracted_text,
+                    "file_path": file_path,
+                    "week": "1",  # Convert to string to match format in extract_content
+                    "day": "Monday"  # Provide a default day if not already specified
+                }
+            )
         researched_content = research_result['output'] if isinstance(research_result, dict) else extracted_text
 
 
-        # QC Phase
-        qc_crew = Crew(
-            agents=[qc_agent],
-            tasks=[qc_task],
-            process=Process.sequential
-        )
-        qc_result = qc_crew.kickoff(
-            inputs={
-                "text": researched_content
-            }
-        )
-
-         # Handle CrewOutput correctly
-        if hasattr(qc_result, 'output'):
-            cleaned_content = qc_result.output
-        elif isinstance(qc_result, dict) and 'output' in qc_result:
-            cleaned_content = qc_result['output']
-        else:
-            cleaned_content = researched_content
+        # QC Phase (the LLM pass only runs when the phrase filter can't settle it)
+        with metrics.stage("custom", "qc"):
+            cleaned_content = run_quality_control(researched_content, run_usage)
+        # Segment once; every post's window is sliced from this index
+        cleaned_sentences = SentenceIndex(cleaned_content)
 
 
               #  print("Cleaned Content:", temp_storage)
 
-        # Platform selection (case-insensitive)
-        platforms = {
-            "linkedin": (linkedin_agent, linkedin_task),
-            "instagram": (instagram_agent, instagram_task),
-            "facebook": (facebook_agent, facebook_task),
-            "twitter": (twitter_agent, twitter_task),
-            "wordpress": (wordpress_agent, wordpress_task),
-            "youtube": (youtube_agent, youtube_task),
-            "tiktok": (tiktok_agent, tiktok_task)
-        }
-
         # Validate platforms (case-insensitive)
-        invalid_platforms = [p for p in platform_post_counts.keys() if p not in [k.lower() for k in platforms.keys()]]
+        invalid_platforms = [p for p in platform_post_counts.keys() if p not in PLATFORMS]
         if invalid_platforms:
             raise HTTPException(
                 status_code=400,
-                detail=f"Invalid platforms: {', '.join(invalid_platforms)}. Available platforms: {', '.join(platforms.keys())}"
+                detail=f"Invalid platforms: {', '.join(invalid_platforms)}. Available platforms: {', '.join(PLATFORMS)}"
             )
 
          
         # Generate content for each platform
         results = {}
-        for platform_name_lower, post_count in platform_post_counts.items():
-            platform_name = next(k for k in platforms.keys() if k.lower() == platform_name_lower)
-            platform_crew = Crew(
-                agents=[platforms[platform_name][0]],
-                tasks=[platforms[platform_name][1]],
-                process=Process.sequential
-            )
+        for platform_name, post_count in platform_post_counts.items():
+            platform_crew = crew_registry.get(platform_name)
             
             platform_posts = []
+            duplicates = new_duplicate_index()
+            formatter = PostFormatter(platform_name, PLATFORM_LIMITS[platform_name])
             for week in range(1, weeks + 1):
                 for day in selected_days:
                     # Generate base content for this day
-                    crew_result = platform_crew.kickoff(
-                        inputs={
-                            "text": cleaned_content,
-                            "day": day,
-                            "week": week,
-                            "platform": platform_name,
-                            "limits": PLATFORM_LIMITS[platform_name]
-                        }
-                    )
-                    
-                    base_content = crew_result['output'] if isinstance(crew_result, dict) else cleaned_content
-                    
-                    for post_index in range(post_count):
-                        # Generate different content for each post using the new function
-                        raw_content = generate_different_content(
-                            base_content,
-                            week,
-                            day,
-                            platform_name,
-                            post_index + 1
+                    with metrics.stage("custom", "platform_kickoff", platform_name):
+                        crew_result = run_usage.kickoff(
+                            platform_crew,
+                            "platform_kickoff",
+                            platform=platform_name,
+                            inputs={
+                                "text": cleaned_content,
+                                "day": day,
+                                "week": week,
+                                "platform": platform_name,
+                                "limits": PLATFORM_LIMITS[platform_name]
+                            }
                         )
+                    
+                    with metrics.stage("custom", "post_processing", platform_name):
+                        base_content = sentence_index(crew_result['output']) if isinstance(crew_result, dict) else cleaned_sentences
                         
-                        # Process content according to platform limits
-                        processed_content = process_content_for_platform(
-                            raw_content, 
-                            platform_name,
-                            PLATFORM_LIMITS[platform_name]
-                        )
+                        # Generate a different window for each post, then enforce
+                        # platform limits on the day's posts as one batch
+                        day_posts = formatter.format_batch([
+                            scrub(generate_different_content(
+                                base_content,
+                                week,
+                                day,
+                                platform_name,
+                                post_index + 1
+                            ))
+                            for post_index in range(post_count)
+                        ])
+
+                    for post_index, formatted in enumerate(day_posts):
+                        # Skip or replace windows that repeat an earlier post
+                        with metrics.stage("custom", "deduplicate", platform_name):
+                            formatted, duplicate = deduplicate_post(
+                                duplicates,
+                                f"Week {week} - {day} - Post {post_index + 1}",
+                                formatted,
+                                lambda attempt: formatter.format(scrub(
+                                    generate_different_content(
+                                        base_content, week, day, platform_name, post_index + 1, shift=attempt * 15
+                                    )
+                                ))
+                            )
+                        if formatted is None:
+                            continue
                         
                         # Create unique title for each post
                         title = f"{platform_name} - Week {week}, {day} - Post {post_index + 1}"
                         
-                        # Calculate word and character counts
-                        word_count = len(processed_content.split())
-                        char_count = len(processed_content)
-                        
                         post = ContentResponse(
                             week_day=f"Week {week} - {day} - Post {post_index + 1}",
                             title=title,
-                            content=processed_content,
+                            content=formatted.content,
                             platform=platform_name,
                             timestamp=datetime.now().isoformat(),
-                            word_count=word_count,
-                            char_count=char_count
+                            word_count=formatted.word_count,
+                            char_count=formatted.char_count,
+                            duplicate_of=duplicate[0] if duplicate else None,
+                            similarity=round(duplicate[1], 3) if duplicate else None
                         )
                         platform_posts.append(post.dict())
             
             results[platform_name] = platform_posts
 
-        # Save to JSON file
-        output_file = os.path.join(OUTPUT_DIR, f"custom_content_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(results, f, indent=4, ensure_ascii=False)
+        # Queue the run for the output store
+        with metrics.stage("custom", "output_store"):
+            output_run_id = output_store.submit(
+                results,
+                kind="custom_content",
+                file_name=file.filename,
+                source_hash=hashlib.sha256(content).hexdigest(),
+                usage=run_usage.rows()
+            )
+        record_usage_metrics("custom", run_usage)
 
         # Store in database
         try:
-            stored_contents = db_manager.store_content(
-                content_data=results,
-                file_name=file.filename,
-                file_type=file_type
-            )
+            with metrics.stage("custom", "store_content"):
+                stored_contents = db_manager.store_content(
+                    content_data=results,
+                    file_name=file.filename,
+                    file_type=file_type
+                )
+            metrics.inc(db_rows_stored, len(stored_contents), endpoint="custom")
             if stored_contents:  # Ensure some data was actually stored
                 db_storage_status = "success"
                 db_storage_message = f"Successfully stored {len(stored_contents)} content items in database"
@@ -663,27 +1131,33 @@ async def generate_custom_scripts(
         except Exception as e:
             db_storage_status = "failed"
             db_storage_message = f"Failed to store in database: {str(e)}"
-            print(f"Database storage error: {str(e)}")
+            logger.error(f"Database storage error: {str(e)}")
 
         
-        return {
+        return FastJSONResponse({
             "status": "success",
             "message": "Custom content generated successfully",
-            "output_file": output_file,
+            # Runs no longer get their own JSON file; this points at GET /outputs/{run_id}
+            "output_file": f"/outputs/{output_run_id}",
+            "output_run_id": output_run_id,
+            "usage": run_usage.summary(),
             "database_storage": {
                 "status": db_storage_status,
                 "message": db_storage_message
             },
             "results": results
-        }
+        })
 
     except Exception as e:
-        print(f"Error during content generation: {str(e)}")
+        logger.exception(f"Error during content generation: {str(e)}")
         raise HTTPException(
             status_code=500,
             detail=f"Content generation failed: {str(e)}"
         )
     finally:
+        # A run that failed before its output was queued still spent tokens
+        if output_run_id is None:
+            persist_usage("custom", "custom_content", run_usage, file.filename)
         # Cleanup uploaded file
         if 'file_path' in locals() and os.path.exists(file_path):
             os.remove(file_path)   
@@ -695,39 +1169,80 @@ async def generate_custom_scripts(
 
 CACHE_EXPIRATION = 600
 
-class ContentItem(BaseModel):
-    type: str
-    text: str
-
-
-class MainContent(BaseModel):
-    type: str
-    text: str
-
-
-    
-class WeeklyContent(BaseModel):
+class ContentItemPatch(BaseModel):
     week: str
-    content_by_days: Dict[str, List[ContentItem]]
+    day: str
+    index: int
+    text: str
+    type: Optional[str] = None
+    version: int
 
 class CacheEntry:
     def __init__(self, content: WeeklyContent):
         self.content = content
         self.timestamp = time.time()
-        self.temp_id = str(int(self.timestamp))
+        self.temp_id = new_sortable_id()
+        # Bumped on every edit; clients send it back for optimistic concurrency checks
+        self.version = 0
+
+def check_entry_version(entry: CacheEntry, expected_version: Optional[int]):
+    current_version = getattr(entry, "version", 0)
+    if expected_version is not None and expected_version != current_version:
+        raise HTTPException(
+            status_code=409,
+            detail=f"Content was modified concurrently (current version {current_version}, "
+                   f"expected {expected_version}). Reload and retry."
+        )
 
-def cleanup_expired_entries():
-    current_time = time.time()
-    expired_keys = [
-        key for key, entry in temp_storage.items()
-        if current_time - entry.timestamp > CACHE_EXPIRATION
-    ]
-    for key in expired_keys:
-        del temp_storage[key]
+def find_weekly_content(content, week: str) -> Optional[WeeklyContent]:
+    """Locate a week in a cached entry holding either one WeeklyContent or a dict of them."""
+    if isinstance(content, WeeklyContent):
+        return content if content.week.lower() == week.lower() else None
+    if isinstance(content, dict):
+        for key, weekly in content.items():
+            if key.lower() == week.lower() and isinstance(weekly, WeeklyContent):
+                return weekly
+    return None
 
 # Storage for permanent and temporary content
-content_storage: Dict[int, WeeklyContent] = {}
-temp_storage: Dict[str, CacheEntry] = {}
+# Bounded by CONTENT_STORAGE_MAX_MEMORY_BYTES; colder entries spill to compressed segments on disk
+content_storage = SpillStore(
+    # Each worker spills into its own subdirectory of CONTENT_STORAGE_DIR
+    directory=os.getenv("CONTENT_STORAGE_DIR", "./content_storage"),
+    max_memory_bytes=int(os.getenv("CONTENT_STORAGE_MAX_MEMORY_BYTES", str(32 * 1024 * 1024))),
+    max_disk_bytes=int(os.getenv("CONTENT_STORAGE_MAX_DISK_BYTES", str(1024 * 1024 * 1024)))
+)
+
+
+@app.on_event("shutdown")
+def close_content_storage():
+    content_storage.close()
+
+# Drafts expire CACHE_EXPIRATION seconds after their last access. Set
+# TEMP_STORAGE_BACKEND=sqlite or redis to share them between workers; redis also
+# needs TEMP_STORAGE_SECRET, which signs every stored value.
+temp_storage = create_temp_store(ttl=CACHE_EXPIRATION)
+
+
+def temp_expiration(temp_id: str) -> Optional[str]:
+    """ISO expiry time of a draft, or None if it expired since it was read."""
+    expires_at = temp_storage.expires_at(temp_id)
+    return datetime.fromtimestamp(expires_at).isoformat() if expires_at is not None else None
+
+
+def storage_samples():
+    """Cache and output-store counters, read from their stats() at scrape time."""
+    caches = (("temp_storage", temp_storage.stats()), ("content_storage", content_storage.stats()))
+    for cache, stats in caches:
+        yield "cache_hits_total", "counter", "Cache lookups that found an entry", {"cache": cache}, stats["hits"] + stats.get("disk_hits", 0)
+    for cache, stats in caches:
+        yield "cache_misses_total", "counter", "Cache lookups that found nothing", {"cache": cache}, stats["misses"]
+    yield "output_store_queued", "gauge", "Runs waiting for the output store writer", {}, output_store.queued
+    yield "output_store_written_total", "counter", "Runs written by the output store", {}, output_store.written
+    yield "output_store_errors_total", "counter", "Output store write errors", {}, output_store.errors
+
+
+metrics.collect(storage_samples)
 
 
 @app.post("/extract_content")
@@ -737,6 +1252,7 @@ async def extract_content(
     days: str = Form(...)
 ):
     file_path = None
+    run_usage = UsageTracker()
     try:
         if week < 1:
             raise HTTPException(status_code=400, detail="Week must be a positive integer.")
@@ -750,8 +1266,7 @@ async def extract_content(
                 status_code=400,
                 detail=f"Invalid day(s): {', '.join(invalid_days)}")
 
-        timestamp = int(time.time())
-        file_path = os.path.join(UPLOAD_DIR, f"{timestamp}_{file.filename}")
+        file_path = os.path.join(UPLOAD_DIR, f"{new_sortable_id()}_{file.filename}")
         file_content = await file.read()
         
         # Extract text from PDF
@@ -760,10 +1275,14 @@ async def extract_content(
             buffer.write(file_content)
             
         processor = FileProcessor()
+        file_type = Path(file.filename).suffix.lstrip('.')
         try:
-            extracted_text = processor.extract_text_from_file(file_path)
-            print(f"Successfully extracted text from {file.filename}")
-            print(f"Extracted text length: {len(extracted_text)} characters")
+            with metrics.stage("extract_content", "extract"):
+                extracted_text = processor.extract_text_from_file(file_path)
+            metrics.inc(extraction_bytes, len(file_content), file_type=file_type)
+            metrics.inc(extracted_chars, len(extracted_text), file_type=file_type)
+            logger.info(f"Successfully extracted text from {file.filename}")
+            logger.info(f"Extracted text length: {len(extracted_text)} characters")
         except Exception as e:
             raise HTTPException(
                 status_code=400,
@@ -771,24 +1290,23 @@ async def extract_content(
             )
 
         all_weeks_content = {}
-        research_crew = Crew(
-            agents=[script_research_agent],
-            tasks=[script_research_task],
-            process=Process.sequential
-        )
+        research_crew = crew_registry.get("research")
         
         for current_week in range(1, week + 1):
             week_content = {"content_by_days": {}}
             
             for day in day_list:
                 try:
-                    research_result = research_crew.kickoff(
-                        inputs={
-                            "text": extracted_text,
-                            "week": current_week,
-                            "day": day.capitalize()
-                        }
-                    )
+                    with metrics.stage("extract_content", "research"):
+                        research_result = run_usage.kickoff(
+                            research_crew,
+                            "research",
+                            inputs={
+                                "text": extracted_text,
+                                "week": current_week,
+                                "day": day.capitalize()
+                            }
+                        )
                     
                     if isinstance(research_result, dict) and 'output' in research_result:
                         day_content = research_result['output']
@@ -799,7 +1317,7 @@ async def extract_content(
                             {"type": "text", "text": str(research_result)}
                         ]
                 except Exception as e:
-                    print(f"Error processing week {current_week}, {day}: {str(e)}")
+                    logger.warning(f"Error processing week {current_week}, {day}: {str(e)}")
                     continue
             
             if week_content["content_by_days"]:
@@ -809,30 +1327,34 @@ async def extract_content(
                 )
 
         cache_entry = CacheEntry(all_weeks_content)
-        temp_storage[cache_entry.temp_id] = cache_entry
-        content_storage[int(cache_entry.temp_id)] = all_weeks_content
-        cleanup_expired_entries()
+        temp_storage.set(cache_entry.temp_id, cache_entry)
+        content_storage[cache_entry.temp_id] = all_weeks_content
 
         return {
             "status": "success",
             "message": "Content extracted successfully",
             "content": all_weeks_content,
+            "usage": run_usage.summary(),
             "temp_id": cache_entry.temp_id,
-            "content_storage_key": int(cache_entry.temp_id),
+            "version": cache_entry.version,
+            # content_storage is keyed by temp_id; content_storage_key is no longer returned
+            "content_storage_id": cache_entry.temp_id,
             "timestamp": datetime.now().isoformat(),
             "expiration": datetime.now() + timedelta(seconds=CACHE_EXPIRATION)
         }
     
     except Exception as e:
-        print(f"Error during content extraction: {str(e)}")
+        logger.exception(f"Error during content extraction: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Content extraction failed: {str(e)}")
     finally:
+        # Extraction keeps no output run, so its usage is recorded on its own, failed or not
+        persist_usage("extract_content", "extract_content", run_usage, file.filename)
         if file_path and os.path.exists(file_path):
             try:
                 os.remove(file_path)
-                print(f"Cleaned up file: {file_path}")
+                logger.info(f"Cleaned up file: {file_path}")
             except Exception as e:
-                print(f"Error cleaning up file: {str(e)}")
+                logger.warning(f"Error cleaning up file: {str(e)}")
 
 
 
@@ -841,21 +1363,28 @@ async def extract_content(
 @app.put("/update_content/{temp_id}")
 async def update_content(
     temp_id: str,
-    updated_content: WeeklyContent
+    updated_content: WeeklyContent,
+    version: Optional[int] = None
 ):
-    """Update stored content using temporary ID."""
+    """Update stored content using temporary ID.
+
+    Pass the last seen version to reject the update if someone else edited meanwhile.
+    """
     try:
-        cleanup_expired_entries()
-        
-        if temp_id not in temp_storage:
+        def replace_content(entry: CacheEntry) -> CacheEntry:
+            check_entry_version(entry, version)
+            entry.content = updated_content
+            entry.timestamp = time.time()
+            entry.version = getattr(entry, "version", 0) + 1
+            return entry
+
+        entry = temp_storage.update(temp_id, replace_content)
+        if entry is None:
             raise HTTPException(
                 status_code=404,
                 detail="Content not found or has expired. Please extract content again."
             )
         
-        temp_storage[temp_id].content = updated_content
-        temp_storage[temp_id].timestamp = time.time()
-        
         week_str = updated_content.week
         week_num = int(week_str.split()[1]) if len(week_str.split()) > 1 else 0
         if week_num > 0:
@@ -865,36 +1394,192 @@ async def update_content(
             "status": "success",
             "message": "Content updated successfully",
             "content": updated_content,
+            "version": entry.version,
             "timestamp": datetime.now().isoformat(),
             "expiration": datetime.now() + timedelta(seconds=CACHE_EXPIRATION)
         }
 
+    except HTTPException:
+        raise
     except Exception as e:
-        print(f"Error during content update: {str(e)}")
+        logger.error(f"Error during content update: {str(e)}")
         raise HTTPException(
             status_code=500,
             detail=f"Content update failed: {str(e)}"
         )
 
+@app.patch("/update_content/{temp_id}")
+async def patch_content(temp_id: str, patch: ContentItemPatch):
+    """Replace (or append) a single week/day/item of stored content in place.
+
+    patch.version must match the entry's current version, otherwise 409 is returned.
+    """
+    def apply_patch(entry: CacheEntry) -> CacheEntry:
+        check_entry_version(entry, patch.version)
+
+        weekly = find_weekly_content(entry.content, patch.week)
+        if weekly is None:
+            raise HTTPException(status_code=404, detail=f"Week not found: {patch.week}")
+
+        day = next((d for d in weekly.content_by_days if d.lower() == patch.day.lower()), None)
+        if day is None:
+            raise HTTPException(status_code=404, detail=f"Day not found in {patch.week}: {patch.day}")
+
+        items = weekly.content_by_days[day]
+        if patch.index == len(items):
+            items.append(ContentItem(type=patch.type or "text", text=patch.text))
+        elif 0 <= patch.index < len(items):
+            items[patch.index].text = patch.text
+            if patch.type:
+                items[patch.index].type = patch.type
+        else:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Item index {patch.index} out of range for {patch.week} {day} ({len(items)} items)"
+            )
+
+        entry.timestamp = time.time()
+        entry.version = getattr(entry, "version", 0) + 1
+        return entry
+
+    entry = temp_storage.update(temp_id, apply_patch)
+    if entry is None:
+        raise HTTPException(
+            status_code=404,
+            detail="Content not found or has expired. Please extract content again."
+        )
+
+    content_storage[temp_id] = entry.content
+    weekly = find_weekly_content(entry.content, patch.week)
+    day = next(d for d in weekly.content_by_days if d.lower() == patch.day.lower())
+    return {
+        "status": "success",
+        "message": "Content item updated successfully",
+        "week": weekly.week,
+        "day": day,
+        "items": weekly.content_by_days[day],
+        "version": entry.version,
+        "expiration": temp_expiration(temp_id)
+    }
+
 @app.get("/temp_content/{temp_id}")
 async def get_temp_content(temp_id: str):
     """Get content from temporary storage."""
-    cleanup_expired_entries()
-    
-    if temp_id not in temp_storage:
+    entry = temp_storage.get(temp_id)
+    if entry is None:
         raise HTTPException(
             status_code=404,
             detail="Content not found or has expired. Please extract content again."
         )
     
-    entry = temp_storage[temp_id]
     return {
         "content": entry.content,
+        "version": getattr(entry, "version", 0),
         "timestamp": datetime.fromtimestamp(entry.timestamp).isoformat(),
-        "expiration": datetime.fromtimestamp(entry.timestamp + CACHE_EXPIRATION).isoformat()
+        "expiration": temp_expiration(temp_id)
     }
 
 
+@app.get("/temp_storage/stats")
+async def get_temp_storage_stats():
+    """Size, hit rate and eviction counters of the temporary content cache."""
+    return temp_storage.stats()
+
+
+@app.get("/content_storage/stats")
+async def get_content_storage_stats():
+    """Memory/disk size, hit rate and spill counters of content_storage."""
+    return content_storage.stats()
+
+
+@app.get("/metrics")
+async def get_metrics():
+    """Stage histograms and pipeline counters in the Prometheus text format."""
+    if not metrics.enabled:
+        raise HTTPException(status_code=404, detail="Metrics are disabled")
+    return Response(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+@app.get("/profiles/{profile_id}")
+async def get_profile(profile_id: str, format: str = Query("json", description="json or collapsed (flamegraph input)")):
+    """A stored request profile: per-stage samples and spans, hottest frames and collapsed stacks."""
+    if not PROFILING_ENABLED:
+        raise HTTPException(status_code=404, detail="Profiling is disabled")
+    profile = profile_store.get(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    if format == "collapsed":
+        return Response(profile["collapsed"], media_type="text/plain; charset=utf-8")
+    return FastJSONResponse(profile)
+
+
+@app.get("/outputs", response_class=FastJSONResponse)
+async def search_outputs(
+    source_hash: Optional[str] = None,
+    file_name: Optional[str] = None,
+    platform: Optional[str] = None,
+    week: Optional[int] = None,
+    day: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    include_content: bool = True
+):
+    """Find historical posts by source document, file name, platform, week/day and date."""
+    posts = await asyncio.to_thread(
+        output_store.find_posts,
+        source_hash=source_hash,
+        file_name=file_name,
+        platform=platform.lower() if platform else None,
+        week=week,
+        day=day,
+        since=since.isoformat() if since else None,
+        until=until.isoformat() if until else None,
+        limit=limit,
+        include_content=include_content
+    )
+    return FastJSONResponse({"count": len(posts), "posts": posts})
+
+
+@app.get("/usage", response_class=FastJSONResponse)
+async def get_usage(
+    group_by: str = Query("day", description="Comma-separated: hour, day, month, run_id, kind, stage, platform, model"),
+    since: Optional[str] = Query(None, description="ISO timestamp, inclusive"),
+    until: Optional[str] = Query(None, description="ISO timestamp, exclusive"),
+    kind: Optional[str] = None,
+    platform: Optional[str] = None,
+    stage: Optional[str] = None
+):
+    """Token usage and estimated LLM cost of generation runs over time."""
+    try:
+        rows = output_store.find_usage(
+            [key.strip() for key in group_by.split(",") if key.strip()],
+            since=since,
+            until=until,
+            kind=kind,
+            platform=platform.lower() if platform else None,
+            stage=stage
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return FastJSONResponse({"group_by": group_by, "rows": rows})
+
+
+@app.get("/outputs/stats")
+async def get_output_store_stats():
+    """Run count, segment size and writer queue depth of the output store."""
+    return output_store.stats()
+
+
+@app.get("/outputs/{run_id}")
+async def get_output_run(run_id: str):
+    """Read back one generation run from the output store."""
+    run = await asyncio.to_thread(output_store.get_run, run_id)
+    if run is None:
+        raise HTTPException(status_code=404, detail="Output run not found")
+    return run
+
+
 @app.post("/regenerate_content")
 async def regenerate_content(
     week_content: str | None = None,
@@ -902,6 +1587,7 @@ async def regenerate_content(
     """Regenerate extracted content using the specified agent and task.
     Accepts only week_content as input.
     """
+    run_usage = UsageTracker()
     try:
         if week_content is None:
             raise HTTPException(
@@ -911,11 +1597,7 @@ async def regenerate_content(
             
         regenerated_content = {}
         
-        regenerate_crew = Crew(
-            agents=[regenrate_content_agent],
-            tasks=[regenrate_content_task],
-            process=Process.sequential
-        )
+        regenerate_crew = crew_registry.get("regenerate_content")
         
         try:
             # Create inputs dictionary based on provided parameters
@@ -923,14 +1605,14 @@ async def regenerate_content(
             if week_content is not None:
                 inputs["week_content"] = week_content
             
-            regenerate_result = regenerate_crew.kickoff(inputs=inputs)
+            regenerate_result = run_usage.kickoff(regenerate_crew, "regenerate_content", inputs=inputs)
             
             if isinstance(regenerate_result, dict) and 'output' in regenerate_result:
                 regenerated_content = regenerate_result['output']
             elif regenerate_result:
                 regenerated_content = str(regenerate_result)
         except Exception as e:
-            print(f"Error regenerating content: {str(e)}")
+            logger.error(f"Error regenerating content: {str(e)}")
             raise HTTPException(
                 status_code=500,
                 detail=f"Error regenerating content: {str(e)}"
@@ -939,8 +1621,8 @@ async def regenerate_content(
         # Create cache entry with only the provided content
         cache_data = {"week_content": week_content}
         new_cache_entry = CacheEntry(cache_data)
-        temp_storage[new_cache_entry.temp_id] = new_cache_entry
-        content_storage[int(new_cache_entry.temp_id)] = regenerated_content
+        temp_storage.set(new_cache_entry.temp_id, new_cache_entry)
+        content_storage[new_cache_entry.temp_id] = regenerated_content
         
         # Build response with only the relevant fields
         response = {
@@ -954,17 +1636,18 @@ async def regenerate_content(
         
         # Add the regenerated weekly content to the response
         response["week_content"] = regenerated_content
+        response["usage"] = run_usage.summary()
         
         return response
     
     except Exception as e:
-        print(f"Error during content regeneration: {str(e)}")
+        logger.error(f"Error during content regeneration: {str(e)}")
         raise HTTPException(
             status_code=500,
             detail=f"Content regeneration failed: {str(e)}"
         )
-
-    
+    finally:
+        persist_usage("regenerate_content", "regenerate_content", run_usage)
 
 
 @app.post("/regenerate_subcontent")
@@ -974,6 +1657,7 @@ async def regenerate_subcontent(
     """Regenerate extracted subcontent using the specified agent and task.
     Accepts only subcontent as input.
     """
+    run_usage = UsageTracker()
     try:
         if subcontent is None:
             raise HTTPException(
@@ -983,11 +1667,7 @@ async def regenerate_subcontent(
             
         regenerated_content = {}
         
-        regenerate_crew = Crew(
-            agents=[regenrate_content_agent],
-            tasks=[regenrate_content_task],
-            process=Process.sequential
-        )
+        regenerate_crew = crew_registry.get("regenerate_content")
         
         try:
             # Create inputs dictionary with the provided subcontent
@@ -995,14 +1675,14 @@ async def regenerate_subcontent(
             if subcontent is not None:
                 inputs["subcontent"] = subcontent
             
-            regenerate_result = regenerate_crew.kickoff(inputs=inputs)
+            regenerate_result = run_usage.kickoff(regenerate_crew, "regenerate_subcontent", inputs=inputs)
             
             if isinstance(regenerate_result, dict) and 'output' in regenerate_result:
                 regenerated_content = regenerate_result['output']
             elif regenerate_result:
                 regenerated_content = str(regenerate_result)
         except Exception as e:
-            print(f"Error regenerating subcontent: {str(e)}")
+            logger.error(f"Error regenerating subcontent: {str(e)}")
             raise HTTPException(
                 status_code=500,
                 detail=f"Error regenerating subcontent: {str(e)}"
@@ -1011,8 +1691,8 @@ async def regenerate_subcontent(
         # Create cache entry with the regenerated subcontent
         cache_data = {"subcontent": regenerated_content}
         new_cache_entry = CacheEntry(cache_data)
-        temp_storage[new_cache_entry.temp_id] = new_cache_entry
-        content_storage[int(new_cache_entry.temp_id)] = regenerated_content
+        temp_storage.set(new_cache_entry.temp_id, new_cache_entry)
+        content_storage[new_cache_entry.temp_id] = regenerated_content
         
         # Build response with the regenerated subcontent
         response = {
@@ -1025,229 +1705,78 @@ async def regenerate_subcontent(
         }
         
         response["subcontent"] = regenerated_content
+        response["usage"] = run_usage.summary()
         
         return response
     
     except Exception as e:
-        print(f"Error during subcontent regeneration: {str(e)}")
+        logger.error(f"Error during subcontent regeneration: {str(e)}")
         raise HTTPException(
             status_code=500,
             detail=f"Subcontent regeneration failed: {str(e)}"
         )
+    finally:
+        persist_usage("regenerate_subcontent", "regenerate_subcontent", run_usage)
 
 
 
 
 
 
-# Store default values from agents and tasks
-DEFAULT_AGENTS = {
-    "script_research_agent": {
-        "role": script_research_agent.role,
-        "goal": script_research_agent.goal,
-        "backstory": script_research_agent.backstory
-    },
-    "qc_agent": {
-        "role": qc_agent.role,
-        "goal": qc_agent.goal,
-        "backstory": qc_agent.backstory
-    },
-    "script_rewriter_agent": {
-        "role": script_rewriter_agent.role,
-        "goal": script_rewriter_agent.goal,
-        "backstory": script_rewriter_agent.backstory
-    },
-    "linkedin_agent": {
-        "role": linkedin_agent.role,
-        "goal": linkedin_agent.goal,
-        "backstory": linkedin_agent.backstory
-    },
-    "instagram_agent": {
-        "role": instagram_agent.role,
-        "goal": instagram_agent.goal,
-        "backstory": instagram_agent.backstory
-    },
-    "facebook_agent": {
-        "role": facebook_agent.role,
-        "goal": facebook_agent.goal,
-        "backstory": facebook_agent.backstory
-    },
-    "twitter_agent": {
-        "role": twitter_agent.role,
-        "goal": twitter_agent.goal,
-        "backstory": twitter_agent.backstory
-    },
-    "wordpress_agent": {
-        "role": wordpress_agent.role,
-        "goal": wordpress_agent.goal,
-        "backstory": wordpress_agent.backstory
-    },
-    "youtube_agent": {
-        "role": youtube_agent.role,
-        "goal": youtube_agent.goal,
-        "backstory": youtube_agent.backstory
-    },
-    "tiktok_agent": {
-        "role": tiktok_agent.role,
-        "goal": tiktok_agent.goal,
-        "backstory": tiktok_agent.backstory
-    },
-    "regenrate_content_agent": {
-        "role": regenrate_content_agent.role,
-        "goal": regenrate_content_agent.goal,
-        "backstory": regenrate_content_agent.backstory
-    },
-    "regenrate_subcontent_agent": {
-        "role": regenrate_subcontent_agent.role,
-        "goal": regenrate_subcontent_agent.goal,
-        "backstory": regenrate_subcontent_agent.backstory
-    },
-    
-    # Add other agents similarly
-}
-
-DEFAULT_TASKS = {
-    "script_research_task": {
-        "description": script_research_task.description,
-        "expected_output": script_research_task.expected_output
-    },
-    "qc_task": {
-        "description": qc_task.description,
-        "expected_output": qc_task.expected_output
-    },
-    "script_rewriter_task": {
-        "description": script_rewriter_task.description,
-        "expected_output": script_rewriter_task.expected_output
-    },
-    "linkedin_task": {
-        "description": linkedin_task.description,
-        "expected_output": linkedin_task.expected_output
-    },
-    "instagram_task": {
-        "description": instagram_task.description,
-        "expected_output": instagram_task.expected_output
-    },
-    "facebook_task": {
-        "description": facebook_task.description,
-        "expected_output": facebook_task.expected_output
-    },
-    "twitter_task": {
-        "description": twitter_task.description,
-        "expected_output": twitter_task.expected_output
-    },
-    "wordpress_task": {
-        "description": wordpress_task.description,
-        "expected_output": wordpress_task.expected_output
-    },
-    "youtube_task": {
-        "description": youtube_task.description,
-        "expected_output": youtube_task.expected_output
-    },
-    "tiktok_task": {
-        "description": tiktok_task.description,
-        "expected_output": tiktok_task.expected_output
-    },
-    "regenrate_content_task": {
-        "description": regenrate_content_task.description,
-        "expected_output": regenrate_content_task.expected_output
-    },
-    "regenrate_subcontent_task": {
-        "description": regenrate_subcontent_task.description,
-        "expected_output": regenrate_subcontent_task.expected_output
-    },
-    # Add other tasks similarly
-}
-
-# Store current configurations
-# Store current configurations
-current_agents = DEFAULT_AGENTS.copy()
-current_tasks = DEFAULT_TASKS.copy()
-
 class UpdateRequest(BaseModel):
     role: str = None
     goal: str = None
     backstory: str = None
     description: str = None
     expected_output: str = None
+    # Config version the change was made against; a stale one is rejected with 409
+    version: Optional[int] = None
 
 
-
-def update_python_file(file_path, class_name, updates):
-    with open(file_path, "r") as f:
-        content = f.read()
-
-    for key, value in updates.items():
-        if value:  # Only update if a new value is provided
-            pattern = rf'({key}\s*=\s*""")([\s\S]*?)("""\s*)'
-            replacement = rf'\1{value}\3'
-            content = re.sub(pattern, replacement, content, count=1)  # Replace only first occurrence
-
-    with open(file_path, "w") as f:
-        f.write(content)
+@app.get("/config")
+def get_config_version():
+    """Current config version (usable in cache keys) and the names with overrides."""
+    snapshot = agent_config.current()
+    return {
+        "version": snapshot.version,
+        "overridden": sorted(snapshot.overrides),
+        "crews_version": crew_registry.version
+    }
 
 
 @app.get("/config/{name}")
 def get_config(name: str):
-    if name in current_agents:
-        return {"current": current_agents[name], "default": DEFAULT_AGENTS[name]}
-    elif name in current_tasks:
-        return {"current": current_tasks[name], "default": DEFAULT_TASKS[name]}
-    else:
+    try:
+        return {
+            "current": agent_config.values(name),
+            "default": agent_config.defaults(name),
+            "version": agent_config.version
+        }
+    except KeyError:
         raise HTTPException(status_code=404, detail="Agent or Task not found")
 
 @app.put("/config/{name}")
 def update_config(name: str, update: UpdateRequest):
-    if name in current_agents:
-        agent_file = "agents.py"
-        updates = {}
-        if update.role:
-            current_agents[name]["role"] = update.role
-            updates["role"] = update.role
-        if update.goal:
-            current_agents[name]["goal"] = update.goal
-            updates["goal"] = update.goal
-        if update.backstory:
-            current_agents[name]["backstory"] = update.backstory
-            updates["backstory"] = update.backstory
-        update_python_file(agent_file, name, updates)
-        return {"message": "Agent updated successfully", "current": current_agents[name], "default": DEFAULT_AGENTS[name]}
-    elif name in current_tasks:
-        task_file = "tasks.py"
-        updates = {}
-        if update.description:
-            current_tasks[name]["description"] = update.description
-            updates["description"] = update.description
-        if update.expected_output:
-            current_tasks[name]["expected_output"] = update.expected_output
-            updates["expected_output"] = update.expected_output
-        update_python_file(task_file, name, updates)
-        return {"message": "Task updated successfully", "current": current_tasks[name], "default": DEFAULT_TASKS[name]}
-    else:
+    try:
+        kind = "Agent" if name in agent_config.base_agents else "Task"
+        snapshot = agent_config.update(name, update.dict(exclude={"version"}), expected_version=update.version)
+    except KeyError:
         raise HTTPException(status_code=404, detail="Agent or Task not found")
+    except ConfigVersionConflict as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    crew_registry.build()
+    return {
+        "message": f"{kind} updated successfully",
+        "current": agent_config.values(name),
+        "default": agent_config.defaults(name),
+        "version": snapshot.version
+    }
 
 @app.post("/config/reset")
 def reset_config():
-    global current_agents, current_tasks
-    current_agents = {key: value.copy() for key, value in DEFAULT_AGENTS.items()}
-    current_tasks = {key: value.copy() for key, value in DEFAULT_TASKS.items()}
-    
-    def restore_defaults(file_path, defaults):
-        with open(file_path, "r") as f:
-            content = f.read()
-
-        for class_name, values in defaults.items():
-            for key, value in values.items():
-                pattern = rf'({key}\s*=\s*""")(.*?)(\s*""")'
-                replacement = rf'\1{value}\3'
-                content = re.sub(pattern, replacement, content, flags=re.DOTALL)
-
-        with open(file_path, "w") as f:
-            f.write(content)
-
-    restore_defaults("agents.py", DEFAULT_AGENTS)
-    restore_defaults("tasks.py", DEFAULT_TASKS)
-
-    return {"message": "All configurations reset to default values."}
+    snapshot = agent_config.reset()
+    crew_registry.build()
+    return {"message": "All configurations reset to default values.", "version": snapshot.version}
 
 
 
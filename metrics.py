@@ -0,0 +1,203 @@
+# metrics.py
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+import logging
+import math
+import threading
+import time
+
+from profiling import current_profile
+
+logger = logging.getLogger(__name__)
+
+# Seconds; LLM kickoffs dominate, so the upper buckets reach several minutes
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(tuple(str(labels.get(name, "")) for name in self.labelnames), 0)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines.append(f"{self.name}{_labels(self.labelnames, key)} {_number(value)}")
+        return lines
+
+
+class Histogram:
+    """Cumulative-bucket histogram; each observation increments one bucket."""
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        # label values -> [per-bucket counts, sum]
+        self._series: Dict[Tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels) -> None:
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * len(self.buckets), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def count(self, **labels) -> int:
+        series = self._series.get(tuple(str(labels.get(name, "")) for name in self.labelnames))
+        return sum(series[0]) if series else 0
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted((key, list(counts), total) for key, (counts, total) in self._series.items())
+        for key, counts, total in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                le = f'le="{_number(bound)}"'
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, key)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, key)} {cumulative}")
+        return lines
+
+
+class _NoopTimer:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+NOOP_TIMER = _NoopTimer()
+
+
+class _StageTimer:
+    __slots__ = ("registry", "labels", "profile", "started")
+
+    def __init__(self, registry: Optional["MetricsRegistry"], labels: Dict[str, str], profile=None):
+        self.registry = registry
+        self.labels = labels
+        self.profile = profile
+
+    def __enter__(self):
+        if self.profile is not None:
+            platform = self.labels["platform"]
+            self.profile.enter_stage(f"{self.labels['stage']}:{platform}" if platform else self.labels["stage"])
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        if self.profile is not None:
+            self.profile.exit_stage()
+        if self.registry is None:
+            return False
+        self.registry.stage_seconds.observe(time.perf_counter() - self.started, **self.labels)
+        if exc_type is not None:
+            self.registry.errors.inc(endpoint=self.labels["endpoint"], stage=self.labels["stage"])
+        return False
+
+
+class MetricsRegistry:
+    """Pipeline metrics rendered in the Prometheus text exposition format.
+
+    When disabled, stage() hands back a shared no-op context manager and
+    inc() returns before taking any lock, so instrumented code
+    pays one attribute check. Collectors registered with collect() are
+    called only at scrape time, for values other components already count
+    (cache hits, queue depths).
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._metrics: List = []
+        self._collectors: List[Callable[[], Iterable[Tuple[str, str, str, Dict[str, str], float]]]] = []
+        self.stage_seconds = self.histogram(
+            "pipeline_stage_seconds", "Time spent in each pipeline stage", ("endpoint", "stage", "platform")
+        )
+        self.errors = self.counter("pipeline_errors_total", "Exceptions raised per pipeline stage", ("endpoint", "stage"))
+
+    def counter(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Counter:
+        metric = Counter(name, documentation, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name: str, documentation: str, labelnames: Iterable[str] = (), buckets=DEFAULT_BUCKETS) -> Histogram:
+        metric = Histogram(name, documentation, labelnames, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def collect(self, collector: Callable[[], Iterable[Tuple[str, str, str, Dict[str, str], float]]]) -> None:
+        """Register collector() -> [(name, type, help, labels, value)], read at scrape time."""
+        self._collectors.append(collector)
+
+    def stage(self, endpoint: str, stage: str, platform: str = ""):
+        """Time a block as one stage; an exception escaping it counts as a stage error.
+
+        The stage also annotates the request's profile when one is being taken.
+        """
+        profile = current_profile.get()
+        if not self.enabled and profile is None:
+            return NOOP_TIMER
+        labels = {"endpoint": endpoint, "stage": stage, "platform": platform}
+        return _StageTimer(self if self.enabled else None, labels, profile)
+
+    def inc(self, counter: Counter, amount: float = 1, **labels) -> None:
+        if self.enabled:
+            counter.inc(amount, **labels)
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        for collector in self._collectors:
+            try:
+                samples = list(collector())
+            except Exception as e:
+                logger.error(f"Metrics collector error: {str(e)}")
+                continue
+            declared = set()
+            for name, kind, documentation, labels, value in samples:
+                if name not in declared:
+                    lines.append(f"# HELP {name} {documentation}")
+                    lines.append(f"# TYPE {name} {kind}")
+                    declared.add(name)
+                names = tuple(labels)
+                lines.append(f"{name}{_labels(names, tuple(labels[n] for n in names))} {_number(value)}")
+        return "\n".join(lines) + "\n"
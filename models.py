@@ -1,6 +1,8 @@
 # models.py
-from sqlalchemy import Column, Integer, String, Date, SmallInteger, Enum
+from sqlalchemy import Column, Integer, BigInteger, String, Date, DateTime, Enum
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.orm import validates
+import hashlib
 import enum
 
 Base = declarative_base()
@@ -17,20 +19,59 @@ class PlatformEnum(enum.Enum):
 class ContentStatus(enum.Enum):
     pending= "pending"
     uploaded = "uploaded"
+    # Near-duplicate of an earlier post in its run, held back for review (DUPLICATE_POLICY=flag)
+    duplicate = "duplicate"
+
+def compute_content_hash(text: str) -> str:
+    """SHA-256 hex digest used to look content up by body without scanning it"""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+# 64-bit ids; SQLite only autoincrements a plain INTEGER primary key (already 64-bit there)
+ContentId = BigInteger().with_variant(Integer, "sqlite")
+
 
 class Content(Base):
     __tablename__ = 'content'
 
-    id = Column(SmallInteger, primary_key=True, autoincrement=True)
+    id = Column(ContentId, primary_key=True, autoincrement=True)
     week = Column(Integer, nullable=False)
     day = Column(String(20), nullable=False)
     content = Column(String, nullable=False)
     title = Column(String(255), nullable=False)
-    status = Column(Enum(ContentStatus), default=ContentStatus.pending)
+    status = Column(Enum(ContentStatus), default=ContentStatus.pending, index=True)
     date_upload = Column(Date, nullable=False)
     platform = Column(Enum(PlatformEnum), nullable=False)
     file_name = Column(String(255), nullable=False)
     file_type = Column(String(10), nullable=False)
+    content_hash = Column(String(64), index=True)
+
+    @validates('content')
+    def _sync_content_hash(self, key, value):
+        # Keep the indexed hash in step with every assignment to content
+        self.content_hash = compute_content_hash(value) if value is not None else None
+        return value
+
+    def __repr__(self):
+        return f"<Content(id={self.id}, week={self.week}, day={self.day}, platform={self.platform})>"
+
+
+class ContentArchive(Base):
+    """Uploaded content moved out of the hot 'content' table by the archival job"""
+    __tablename__ = 'content_archive'
+
+    id = Column(ContentId, primary_key=True, autoincrement=False)
+    week = Column(Integer, nullable=False)
+    day = Column(String(20), nullable=False)
+    content = Column(String, nullable=False)
+    title = Column(String(255), nullable=False)
+    status = Column(Enum(ContentStatus), default=ContentStatus.uploaded)
+    date_upload = Column(Date, nullable=False, index=True)
+    platform = Column(Enum(PlatformEnum), nullable=False)
+    file_name = Column(String(255), nullable=False)
+    file_type = Column(String(10), nullable=False)
+    content_hash = Column(String(64), index=True)
+    archived_at = Column(DateTime, nullable=False)
 
     def __repr__(self):
-        return f"<Content(id={self.id}, week={self.week}, day={self.day}, platform={self.platform})>"
\ No newline at end of file
+        return f"<ContentArchive(id={self.id}, week={self.week}, day={self.day}, platform={self.platform})>"
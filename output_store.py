@@ -0,0 +1,501 @@
+# output_store.py
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+import gzip
+import json
+import logging
+import os
+import queue
+import re
+import secrets
+import sqlite3
+import threading
+
+from cache import new_sortable_id
+from usage import USAGE_FIELDS
+
+logger = logging.getLogger(__name__)
+
+WEEK_DAY_PATTERN = re.compile(r"Week\s+(\d+)\s*-\s*([A-Za-z]+)")
+LEGACY_OUTPUT_PATTERN = re.compile(r"^(custom_content|content)_(\d{8}_\d{6})\.json$")
+# group_by keys accepted by find_usage() and the column expression each groups on
+USAGE_GROUPS = {
+    "hour": "substr(created_at, 1, 13)",
+    "day": "substr(created_at, 1, 10)",
+    "month": "substr(created_at, 1, 7)",
+    "run_id": "run_id",
+    "kind": "kind",
+    "stage": "stage",
+    "platform": "platform",
+    "model": "model",
+}
+
+
+class OutputStore:
+    """Append-only store for generation outputs.
+
+    Each run is one JSON line, gzip-compressed as its own member and appended to
+    a daily segment file owned by this store instance
+    (outputs-YYYYMMDD-<writer>-N.ndjson.gz), so workers sharing the directory
+    never append to the same file and offsets stay exact. Concatenated members
+    are still a valid gzip stream, so a segment can be read with zcat, and a
+    single run is read back by seeking to its member. A SQLite index maps run
+    id, source file hash, file name, platform and time to segment offsets, and
+    keeps one row per post (platform, week, day, title, counts) so queries can
+    be answered from the index and only matching runs are decompressed. Token
+    usage and cost per stage/platform/model go into a usage table that
+    retention leaves alone, so cost history outlives the content.
+
+    Writes go through a background thread so requests never wait on disk.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        segment_bytes: int = 64 * 1024 * 1024,
+        retention_days: Optional[int] = None
+    ):
+        self.directory = directory
+        self.segment_dir = os.path.join(directory, "segments")
+        self.segment_bytes = segment_bytes
+        self.retention_days = retention_days
+        os.makedirs(self.segment_dir, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            os.path.join(directory, "index.sqlite3"), timeout=30, check_same_thread=False
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS runs ("
+            "run_id TEXT NOT NULL, kind TEXT NOT NULL, file_name TEXT, source_hash TEXT, "
+            "platform TEXT NOT NULL, post_count INTEGER NOT NULL, created_at TEXT NOT NULL, "
+            "segment TEXT NOT NULL, offset INTEGER NOT NULL, length INTEGER NOT NULL, "
+            "PRIMARY KEY (run_id, platform))"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS posts ("
+            "run_id TEXT NOT NULL, platform TEXT NOT NULL, position INTEGER NOT NULL, "
+            "week INTEGER, day TEXT, title TEXT, word_count INTEGER, char_count INTEGER, "
+            "kind TEXT NOT NULL, file_name TEXT, source_hash TEXT, created_at TEXT NOT NULL, "
+            "PRIMARY KEY (run_id, platform, position))"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS imported_files (path TEXT PRIMARY KEY, run_id TEXT NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS usage ("
+            "run_id TEXT NOT NULL, kind TEXT NOT NULL, stage TEXT NOT NULL, platform TEXT NOT NULL, "
+            "model TEXT NOT NULL, prompt_tokens INTEGER NOT NULL, cached_prompt_tokens INTEGER NOT NULL, "
+            "completion_tokens INTEGER NOT NULL, total_tokens INTEGER NOT NULL, "
+            "successful_requests INTEGER NOT NULL, cost_usd REAL, created_at TEXT NOT NULL, "
+            "PRIMARY KEY (run_id, stage, platform, model))"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_usage_created_at ON usage (created_at)")
+        for column in ("source_hash", "file_name", "created_at", "segment"):
+            self._conn.execute(f"CREATE INDEX IF NOT EXISTS ix_runs_{column} ON runs ({column})")
+        for column in ("source_hash", "file_name", "created_at"):
+            self._conn.execute(f"CREATE INDEX IF NOT EXISTS ix_posts_{column} ON posts ({column})")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_posts_platform_week_day ON posts (platform, week, day)")
+        self._conn.commit()
+
+        self._queue: "queue.Queue[Optional[dict]]" = queue.Queue()
+        self._writer: Optional[threading.Thread] = None
+        self._writer_lock = threading.Lock()
+        self._segment: Optional[str] = None
+        # Segment names carry the pid plus a random suffix, unique per store instance
+        self.writer_id = f"{os.getpid()}-{secrets.token_hex(2)}"
+        self.written = 0
+        self.errors = 0
+
+    def submit(
+        self,
+        results: Dict[str, List[Dict]],
+        kind: str,
+        file_name: Optional[str] = None,
+        source_hash: Optional[str] = None,
+        usage: Optional[List[Dict[str, Any]]] = None
+    ) -> str:
+        """Queue a run for writing and return its run id immediately.
+
+        usage is UsageTracker.rows() for the run, if it was tracked.
+        """
+        record = {
+            "run_id": new_sortable_id(),
+            "kind": kind,
+            "file_name": file_name,
+            "source_hash": source_hash,
+            "created_at": datetime.now().isoformat(),
+            "results": results
+        }
+        if usage is not None:
+            record["usage"] = usage
+        self._ensure_writer()
+        self._queue.put(record)
+        return record["run_id"]
+
+    def submit_usage(self, usage: List[Dict[str, Any]], kind: str, file_name: Optional[str] = None) -> str:
+        """Queue token usage for a run with no output to keep (failed runs, extraction, rewrites)."""
+        return self.submit({}, kind, file_name=file_name, usage=usage)
+
+    @property
+    def queued(self) -> int:
+        return self._queue.qsize()
+
+    def flush(self) -> None:
+        """Block until every queued run has been written."""
+        self._queue.join()
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._queue.put(None)
+            self._writer.join()
+            self._writer = None
+
+    def write(self, record: Dict[str, Any]) -> None:
+        """Append a run synchronously (used by the writer thread)."""
+        data = self._encode(record)
+        with self._lock:
+            self._append(record, data)
+            self._conn.commit()
+            self.written += 1
+
+    def _append(self, record: Dict[str, Any], data: bytes) -> None:
+        """Append an encoded run to the active segment and add its index rows, uncommitted.
+
+        Usage-only records (no results) get their usage rows and nothing else.
+        """
+        if record["results"]:
+            segment = self._active_segment(record["created_at"], len(data))
+            path = os.path.join(self.segment_dir, segment)
+            with open(path, "ab") as f:
+                offset = f.tell()
+                f.write(data)
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO runs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        record["run_id"], record["kind"], record["file_name"], record["source_hash"],
+                        platform, len(posts), record["created_at"], segment, offset, len(data)
+                    )
+                    for platform, posts in record["results"].items()
+                ]
+            )
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO posts VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            self._post_rows(record)
+        )
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO usage VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [
+                (
+                    record["run_id"], record["kind"], row["stage"], row["platform"], row["model"],
+                    *(row[field] for field in USAGE_FIELDS), row["cost_usd"], record["created_at"]
+                )
+                for row in record.get("usage", ())
+            ]
+        )
+
+    def get_run(self, run_id: str) -> Optional[Dict[str, Any]]:
+        """Read one run back from its segment, or None if unknown."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT segment, offset, length FROM runs WHERE run_id = ? LIMIT 1", (run_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        return self._read(*row)
+
+    def find_runs(
+        self,
+        source_hash: Optional[str] = None,
+        file_name: Optional[str] = None,
+        platform: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        limit: int = 100
+    ) -> List[Dict[str, Any]]:
+        """Query the index; returns metadata rows without reading any segment."""
+        clauses, params = [], []
+        for column, value in (("source_hash", source_hash), ("file_name", file_name), ("platform", platform)):
+            if value:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if since:
+            clauses.append("created_at >= ?")
+            params.append(since)
+        if until:
+            clauses.append("created_at < ?")
+            params.append(until)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+
+        with self._lock:
+            cursor = self._conn.execute(
+                "SELECT run_id, kind, file_name, source_hash, platform, post_count, created_at "
+                f"FROM runs {where} ORDER BY created_at DESC LIMIT ?",
+                params + [limit]
+            )
+            columns = [column[0] for column in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    def find_posts(
+        self,
+        source_hash: Optional[str] = None,
+        file_name: Optional[str] = None,
+        platform: Optional[str] = None,
+        week: Optional[int] = None,
+        day: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        limit: int = 100,
+        include_content: bool = True
+    ) -> List[Dict[str, Any]]:
+        """Query the post index, newest first.
+
+        With include_content each matching run is decompressed once and the
+        full post is returned; otherwise only the indexed metadata is.
+        """
+        clauses, params = [], []
+        for column, value in (
+            ("p.source_hash", source_hash), ("p.file_name", file_name),
+            ("p.platform", platform), ("p.week", week), ("p.day", day.lower() if day else None)
+        ):
+            if value is not None and value != "":
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if since:
+            clauses.append("p.created_at >= ?")
+            params.append(since)
+        if until:
+            clauses.append("p.created_at < ?")
+            params.append(until)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+
+        with self._lock:
+            cursor = self._conn.execute(
+                "SELECT p.run_id, p.kind, p.file_name, p.source_hash, p.platform, p.position, "
+                "p.week, p.day, p.title, p.word_count, p.char_count, p.created_at, "
+                "r.segment, r.offset, r.length "
+                f"FROM posts p JOIN runs r ON r.run_id = p.run_id AND r.platform = p.platform {where} "
+                "ORDER BY p.created_at DESC, p.platform, p.position LIMIT ?",
+                params + [limit]
+            )
+            columns = [column[0] for column in cursor.description]
+            rows = [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+        runs: Dict[str, Dict[str, Any]] = {}
+        for row in rows:
+            location = (row.pop("segment"), row.pop("offset"), row.pop("length"))
+            if include_content:
+                if row["run_id"] not in runs:
+                    runs[row["run_id"]] = self._read(*location)
+                row["post"] = runs[row["run_id"]]["results"][row["platform"]][row["position"]]
+        return rows
+
+    def find_usage(
+        self,
+        group_by: List[str],
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        kind: Optional[str] = None,
+        platform: Optional[str] = None,
+        stage: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Token and cost totals per group (keys of USAGE_GROUPS), oldest first."""
+        unknown = [key for key in group_by if key not in USAGE_GROUPS]
+        if unknown:
+            raise ValueError(f"Unknown group_by: {', '.join(unknown)}")
+        clauses, params = [], []
+        for column, value in (("kind", kind), ("platform", platform), ("stage", stage)):
+            if value:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if since:
+            clauses.append("created_at >= ?")
+            params.append(since)
+        if until:
+            clauses.append("created_at < ?")
+            params.append(until)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        groups = [f"{USAGE_GROUPS[key]} AS {key}" for key in group_by]
+        totals = [f"SUM({field}) AS {field}" for field in USAGE_FIELDS]
+        group_clause = f"GROUP BY {', '.join(USAGE_GROUPS[key] for key in group_by)} ORDER BY 1" if group_by else ""
+
+        with self._lock:
+            cursor = self._conn.execute(
+                f"SELECT {', '.join(groups + totals)}, SUM(cost_usd) AS cost_usd, "
+                "COUNT(DISTINCT run_id) AS runs, COUNT(*) - COUNT(cost_usd) AS unpriced_rows "
+                f"FROM usage {where} {group_clause}",
+                params
+            )
+            columns = [column[0] for column in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    def backfill_index(self) -> int:
+        """Bring the index up to date with data written before it existed.
+
+        Imports legacy per-run JSON files from the output directory (once
+        each, leaving the files in place) and adds post rows for runs that
+        were stored before the post index. Returns the number of runs indexed.
+        """
+        indexed = 0
+        with self._lock:
+            imported = {row[0] for row in self._conn.execute("SELECT path FROM imported_files")}
+            missing = self._conn.execute(
+                "SELECT DISTINCT segment, offset, length FROM runs "
+                "WHERE run_id NOT IN (SELECT run_id FROM posts) AND post_count > 0"
+            ).fetchall()
+
+        for name in sorted(os.listdir(self.directory)):
+            match = LEGACY_OUTPUT_PATTERN.match(name)
+            if not match or name in imported:
+                continue
+            try:
+                with open(os.path.join(self.directory, name), encoding="utf-8") as f:
+                    results = json.load(f)
+                record = {
+                    "run_id": new_sortable_id(),
+                    "kind": match.group(1),
+                    "file_name": None,
+                    "source_hash": None,
+                    "created_at": datetime.strptime(match.group(2), "%Y%m%d_%H%M%S").isoformat(),
+                    "results": results
+                }
+                if self._import(name, record):
+                    indexed += 1
+            except Exception as e:
+                logger.warning(f"Output store could not import {name}: {str(e)}")
+
+        for location in missing:
+            record = self._read(*location)
+            with self._lock:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO posts VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    self._post_rows(record)
+                )
+                self._conn.commit()
+            indexed += 1
+        return indexed
+
+    def _import(self, name: str, record: Dict[str, Any]) -> bool:
+        """Claim a legacy file and index its run in one transaction.
+
+        Workers share the index, so the claim in imported_files decides which
+        one imports the file; the others see no inserted row and skip it.
+        """
+        data = self._encode(record)
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                claimed = self._conn.execute(
+                    "INSERT OR IGNORE INTO imported_files VALUES (?, ?)", (name, record["run_id"])
+                ).rowcount
+                if claimed:
+                    self._append(record, data)
+                self._conn.commit()
+            except Exception:
+                self._conn.rollback()
+                raise
+        if claimed:
+            self.written += 1
+        return bool(claimed)
+
+    def apply_retention(self, retention_days: Optional[int] = None) -> int:
+        """Delete whole segments older than retention_days; returns segments removed."""
+        retention_days = retention_days if retention_days is not None else self.retention_days
+        if retention_days is None:
+            return 0
+        cutoff = f"outputs-{(datetime.now() - timedelta(days=retention_days)):%Y%m%d}"
+        removed = 0
+        with self._lock:
+            for segment in sorted(os.listdir(self.segment_dir)):
+                if segment >= cutoff:
+                    break
+                try:
+                    os.remove(os.path.join(self.segment_dir, segment))
+                except FileNotFoundError:
+                    # Another worker's retention pass got there first
+                    pass
+                self._conn.execute(
+                    "DELETE FROM posts WHERE run_id IN (SELECT run_id FROM runs WHERE segment = ?)", (segment,)
+                )
+                self._conn.execute("DELETE FROM runs WHERE segment = ?", (segment,))
+                removed += 1
+            self._conn.commit()
+        return removed
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            runs, rows = self._conn.execute("SELECT COUNT(DISTINCT run_id), COUNT(*) FROM runs").fetchone()
+            posts = self._conn.execute("SELECT COUNT(*) FROM posts").fetchone()[0]
+        segments = os.listdir(self.segment_dir)
+        return {
+            "runs": runs,
+            "index_rows": rows,
+            "posts": posts,
+            "segments": len(segments),
+            "segment_bytes": sum(os.path.getsize(os.path.join(self.segment_dir, s)) for s in segments),
+            "queued": self.queued,
+            "written": self.written,
+            "errors": self.errors
+        }
+
+    def _active_segment(self, created_at: str, incoming: int) -> str:
+        prefix = f"outputs-{created_at[:10].replace('-', '')}-{self.writer_id}-"
+        current = self._segment
+        if current and current.startswith(prefix) and os.path.exists(
+            os.path.join(self.segment_dir, current)
+        ) and os.path.getsize(os.path.join(self.segment_dir, current)) + incoming <= self.segment_bytes:
+            return current
+
+        existing = sorted(s for s in os.listdir(self.segment_dir) if s.startswith(prefix))
+        if existing and os.path.getsize(os.path.join(self.segment_dir, existing[-1])) + incoming <= self.segment_bytes:
+            self._segment = existing[-1]
+        else:
+            self._segment = f"{prefix}{len(existing):04d}.ndjson.gz"
+        return self._segment
+
+    @staticmethod
+    def _encode(record: Dict[str, Any]) -> bytes:
+        return gzip.compress(
+            (json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
+        )
+
+    @staticmethod
+    def _post_rows(record: Dict[str, Any]) -> List[tuple]:
+        rows = []
+        for platform, posts in record["results"].items():
+            for position, post in enumerate(posts):
+                match = WEEK_DAY_PATTERN.search(str(post.get("week_day", "")))
+                rows.append((
+                    record["run_id"], platform, position,
+                    int(match.group(1)) if match else None,
+                    match.group(2).lower() if match else None,
+                    post.get("title"), post.get("word_count"), post.get("char_count"),
+                    record["kind"], record["file_name"], record["source_hash"], record["created_at"]
+                ))
+        return rows
+
+    def _read(self, segment: str, offset: int, length: int) -> Dict[str, Any]:
+        with open(os.path.join(self.segment_dir, segment), "rb") as f:
+            f.seek(offset)
+            return json.loads(gzip.decompress(f.read(length)))
+
+    def _ensure_writer(self) -> None:
+        with self._writer_lock:
+            if self._writer is None or not self._writer.is_alive():
+                self._writer = threading.Thread(target=self._run_writer, name="output-store-writer", daemon=True)
+                self._writer.start()
+
+    def _run_writer(self) -> None:
+        while True:
+            record = self._queue.get()
+            try:
+                if record is None:
+                    return
+                self.write(record)
+            except Exception as e:
+                self.errors += 1
+                logger.error(f"Output store write error for run {record.get('run_id')}: {str(e)}", extra={"run_id": record.get("run_id")})
+            finally:
+                self._queue.task_done()
@@ -0,0 +1,171 @@
+# phrase_filter.py
+from typing import Dict, List, Optional, Tuple
+import re
+
+# Forbidden words and phrases from the qc_agent goal, with every inflection
+# written out, mapped to a neutral replacement. "" deletes the phrase, but only
+# as a sentence opener followed by punctuation ("Buckle up, ..."); anywhere else
+# it is flagged instead. None means the right rewrite depends on context
+# ("prepared a report" vs "be prepared"), so the phrase is only flagged and left
+# for the LLM QC pass.
+FORBIDDEN_PHRASES: Dict[str, Optional[str]] = {
+    "strap in": "", "strap yourself in": "", "strap yourselves in": "",
+    "buckle up": "", "brace yourself": "", "brace yourselves": "",
+    "get ready": "", "be prepared": "",
+    "strap": None, "straps": None, "buckle": None, "buckles": None,
+    "delve into": "explore", "delves into": "explores", "delved into": "explored", "delving into": "exploring",
+    "delve": "look", "delves": "looks", "delved": "looked", "delving": "looking",
+    "dive into": "explore", "dives into": "explores", "dived into": "explored",
+    "dove into": "explored", "diving into": "exploring",
+    "prepare": None, "prepares": None, "prepared": None, "preparing": None,
+    "tapestry": "mix", "tapestries": "mixes",
+    "vibrant": "lively",
+    "in the realm of": "in", "realm": "area", "realms": "areas",
+    "landscape": None, "landscapes": None,
+    "embark on": "start", "embarks on": "starts", "embarked on": "started", "embarking on": "starting",
+    "embark": None, "embarks": None, "embarked": None, "embarking": None,
+    "revolutionize": "transform", "revolutionizes": "transforms",
+    "revolutionized": "transformed", "revolutionizing": "transforming",
+    "revolutionise": "transform", "revolutionises": "transforms",
+    "revolutionised": "transformed", "revolutionising": "transforming",
+    "navigate": None, "navigates": None, "navigated": None, "navigating": None,
+    "in the rapidly changing": "in the changing",
+    "ever-evolving": "changing", "ever evolving": "changing",
+    "taken by storm": "widely adopted",
+    "wild ride": "eventful period",
+    "hilarious": "funny",
+    "captivating": "engaging",
+    "fascinating": "interesting",
+    "quest": "effort", "quests": "efforts",
+    "adventure": "experience", "adventures": "experiences",
+    "journey": "process", "journeys": "processes",
+}
+
+
+def trie_pattern(phrases) -> str:
+    """Regex alternation for phrases, factored into a character trie.
+
+    Shared prefixes are matched once ("delv" for delve/delves/delving...),
+    so each position in the text costs one branch per distinct first
+    character instead of one attempt per phrase. Spaces match any run of
+    whitespace.
+    """
+    trie: Dict = {}
+    for phrase in phrases:
+        node = trie
+        for char in phrase:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node: Dict) -> str:
+        branches = [
+            (r"\s+" if char == " " else re.escape(char)) + build(child)
+            for char, child in sorted(node.items()) if char
+        ]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+        if "" in node:
+            return f"(?:{body})?"
+        return body
+
+    return build(trie)
+
+
+class ForbiddenPhraseFilter:
+    """Finds and rewrites forbidden phrases with one compiled regex.
+
+    All phrases are compiled into a single case-insensitive, trie-factored
+    pattern; optional suffixes are greedy, so "delving into" wins over
+    "delving". A scan is one pass over the text.
+    """
+
+    def __init__(self, phrases: Optional[Dict[str, Optional[str]]] = None):
+        self.phrases = {
+            self._normalize(phrase): replacement
+            for phrase, replacement in (phrases if phrases is not None else FORBIDDEN_PHRASES).items()
+        }
+        alternatives = trie_pattern(self.phrases)
+        # tail swallows the punctuation and spaces after a deleted opener ("Buckle up, ")
+        self.pattern = re.compile(rf"\b(?P<phrase>{alternatives})\b(?P<tail>[,:;!…]*[ \t]*)", re.IGNORECASE)
+
+    def is_clean(self, text: str) -> bool:
+        return self.pattern.search(text) is None
+
+    def find(self, text: str) -> List[Tuple[str, int, int]]:
+        """(phrase, start, end) for every forbidden phrase in text."""
+        return [
+            (self._normalize(match.group("phrase")), match.start("phrase"), match.end("phrase"))
+            for match in self.pattern.finditer(text)
+        ]
+
+    def rewrite(self, text: str) -> Tuple[str, List[str]]:
+        """Replace every phrase that has a rewrite.
+
+        Returns the new text and the phrases left in place because they have
+        no safe replacement here. Openers are only deleted at the start of a
+        sentence when punctuation follows them, so the rest of the sentence
+        still reads on its own.
+        """
+        unresolved = []
+        pieces = []
+        position = 0
+        for match in self.pattern.finditer(text):
+            pieces.append(text[position:match.start()])
+            position = match.end()
+            phrase = match.group("phrase")
+            replacement = self.phrases[self._normalize(phrase)]
+            if replacement:
+                pieces[-1] = self._fix_article(pieces[-1], replacement)
+                pieces.append(self._match_case(phrase, replacement) + match.group("tail"))
+            elif replacement == "" and self._is_opener(text, match):
+                # Keep exactly one space between the previous sentence and the rest
+                before = pieces[-1].rstrip(" \t")
+                if text[position:position + 1].strip():
+                    pieces[-1] = before + (" " if before and not before.endswith("\n") else "")
+                    pieces.append(text[position].upper())
+                    position += 1
+                else:
+                    pieces[-1] = before
+            else:
+                unresolved.append(self._normalize(phrase))
+                pieces.append(match.group())
+        pieces.append(text[position:])
+        return "".join(pieces), unresolved
+
+    @classmethod
+    def _is_opener(cls, text: str, match: "re.Match") -> bool:
+        """True for a phrase that starts a sentence and is set off by punctuation."""
+        return cls._starts_sentence(text, match.start()) and match.group("tail").strip(" \t") != ""
+
+    @staticmethod
+    def _starts_sentence(text: str, index: int) -> bool:
+        while index > 0 and text[index - 1] in " \t":
+            index -= 1
+        return index == 0 or text[index - 1] in ".!?…\n"
+
+    @staticmethod
+    def _fix_article(before: str, replacement: str) -> str:
+        """Switch a/an before the replacement ("a quest" -> "an effort")."""
+        match = re.search(r"\b(a|an|A|An)(\s+)$", before)
+        if not match:
+            return before
+        article = "an" if replacement[0].lower() in "aeiou" else "a"
+        if match.group(1)[0].isupper():
+            article = article.capitalize()
+        return before[:match.start()] + article + match.group(2)
+
+    @staticmethod
+    def _normalize(phrase: str) -> str:
+        return " ".join(phrase.lower().split())
+
+    @staticmethod
+    def _match_case(original: str, replacement: str) -> str:
+        if original.isupper() and len(original) > 1:
+            return replacement.upper()
+        if original[0].isupper():
+            return replacement[0].upper() + replacement[1:]
+        return replacement
+
+
+phrase_filter = ForbiddenPhraseFilter()
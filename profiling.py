@@ -0,0 +1,232 @@
+# profiling.py
+from collections import Counter
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+import hmac
+import json
+import logging
+import os
+import sys
+import threading
+import time
+
+from cache import new_sortable_id
+
+logger = logging.getLogger(__name__)
+
+# The profiler of the request running in this context, if it asked for one
+current_profile: ContextVar[Optional["SamplingProfiler"]] = ContextVar("current_profile", default=None)
+
+MAX_STACK_DEPTH = 64
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{os.path.basename(code.co_filename)}:{code.co_name}:{frame.f_lineno}"
+
+
+class SamplingProfiler:
+    """Samples one thread's Python stack every interval seconds from a helper thread.
+
+    Samples are aggregated as (stage, collapsed stack) -> count, so memory
+    grows with the number of distinct stacks, not with duration. The stage is
+    whatever the profiled code last entered with enter_stage(); metrics.stage()
+    does this for every timed pipeline stage.
+    """
+
+    def __init__(self, interval: float = 0.005, max_seconds: float = 600.0):
+        self.id = new_sortable_id()
+        self.interval = interval
+        self.max_seconds = max_seconds
+        self.samples: Counter = Counter()
+        self.stage_spans: List[Tuple[str, float, float]] = []
+        self._stages: List[Tuple[str, float]] = []
+        self._thread_id: Optional[int] = None
+        self._sampler: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.started_at: Optional[str] = None
+        self._started = 0.0
+        self.duration = 0.0
+
+    def start(self, thread_id: Optional[int] = None) -> None:
+        self._thread_id = thread_id or threading.get_ident()
+        self.started_at = datetime.now().isoformat()
+        self._started = time.perf_counter()
+        self._sampler = threading.Thread(target=self._run, name=f"profiler-{self.id}", daemon=True)
+        self._sampler.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._sampler is not None:
+            self._sampler.join()
+        self.duration = time.perf_counter() - self._started
+
+    def enter_stage(self, stage: str) -> None:
+        self._stages.append((stage, time.perf_counter()))
+
+    def exit_stage(self) -> None:
+        if self._stages:
+            stage, started = self._stages.pop()
+            self.stage_spans.append((stage, started - self._started, time.perf_counter() - started))
+
+    def _run(self) -> None:
+        deadline = self._started + self.max_seconds
+        while not self._stop.wait(self.interval) and time.perf_counter() < deadline:
+            frame = sys._current_frames().get(self._thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None and len(stack) < MAX_STACK_DEPTH:
+                stack.append(_frame_label(frame))
+                frame = frame.f_back
+            try:
+                stage = self._stages[-1][0]
+            except IndexError:
+                stage = "-"
+            self.samples[(stage, ";".join(reversed(stack)))] += 1
+
+    def collapsed(self) -> str:
+        """Stacks in the collapsed format read by flamegraph.pl and speedscope, stage as the root frame."""
+        return "".join(f"{stage};{stack} {count}\n" for (stage, stack), count in self.samples.most_common())
+
+    def report(self, top: int = 50) -> Dict[str, Any]:
+        total = sum(self.samples.values())
+        stages: Counter = Counter()
+        self_samples: Counter = Counter()
+        total_samples: Counter = Counter()
+        for (stage, stack), count in self.samples.items():
+            stages[stage] += count
+            frames = stack.split(";")
+            self_samples[frames[-1]] += count
+            for frame in set(frames):
+                total_samples[frame] += count
+        return {
+            "id": self.id,
+            "started_at": self.started_at,
+            "duration_seconds": round(self.duration, 4),
+            "interval_ms": self.interval * 1000,
+            "samples": total,
+            "stages": {
+                stage: {"samples": count, "share": round(count / total, 4)} for stage, count in stages.most_common()
+            },
+            "stage_spans": [
+                {"stage": stage, "offset_seconds": round(offset, 4), "seconds": round(seconds, 4)}
+                for stage, offset, seconds in self.stage_spans
+            ],
+            "top_self": [{"frame": frame, "samples": count} for frame, count in self_samples.most_common(top)],
+            "top_total": [{"frame": frame, "samples": count} for frame, count in total_samples.most_common(top)],
+        }
+
+
+class ProfileStore:
+    """Finished profiles as JSON files, keeping only the newest keep of them."""
+
+    def __init__(self, directory: str, keep: int = 50):
+        self.directory = directory
+        self.keep = keep
+        os.makedirs(directory, exist_ok=True)
+
+    def save(self, profile: SamplingProfiler, **metadata) -> str:
+        data = {**profile.report(), **metadata, "collapsed": profile.collapsed()}
+        tmp_path = os.path.join(self.directory, f".{profile.id}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, self._path(profile.id))
+        self._prune()
+        return profile.id
+
+    def get(self, profile_id: str) -> Optional[Dict[str, Any]]:
+        if not profile_id.isalnum():
+            return None
+        try:
+            with open(self._path(profile_id), encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def list(self) -> List[str]:
+        return sorted((name[:-5] for name in os.listdir(self.directory) if name.endswith(".json")), reverse=True)
+
+    def _path(self, profile_id: str) -> str:
+        return os.path.join(self.directory, f"{profile_id}.json")
+
+    def _prune(self) -> None:
+        for profile_id in self.list()[self.keep:]:
+            try:
+                os.remove(self._path(profile_id))
+            except FileNotFoundError:
+                pass
+
+
+class ProfilingMiddleware:
+    """Profiles requests to the given paths that ask for it with X-Profile or ?profile=.
+
+    Only active when enabled; with a token set, the flag must equal the token,
+    otherwise any of 1/true/yes. At most max_concurrent requests are profiled
+    at once; others run normally. The profile id is returned in X-Profile-Id.
+    The sampled thread is the one the endpoint starts on, i.e. the event loop
+    for async endpoints, so work another request does on the loop between
+    awaits can show up in the profile.
+    """
+
+    def __init__(
+        self,
+        app,
+        store: ProfileStore,
+        paths: Tuple[str, ...],
+        enabled: bool = False,
+        token: Optional[str] = None,
+        interval: float = 0.005,
+        max_concurrent: int = 2
+    ):
+        self.app = app
+        self.store = store
+        self.paths = paths
+        self.enabled = enabled
+        self.token = token
+        self.interval = interval
+        self._slots = threading.BoundedSemaphore(max_concurrent)
+
+    def requested(self, scope) -> bool:
+        if not self.enabled or scope["type"] != "http" or scope["path"] not in self.paths:
+            return False
+        value = dict(scope.get("headers") or ()).get(b"x-profile", b"").decode("latin-1")
+        if not value:
+            for pair in scope.get("query_string", b"").decode("latin-1").split("&"):
+                name, _, flag = pair.partition("=")
+                if name == "profile":
+                    value = flag
+        if not value:
+            return False
+        if self.token:
+            return hmac.compare_digest(value.encode("latin-1"), self.token.encode("latin-1"))
+        return value.lower() in ("1", "true", "yes")
+
+    async def __call__(self, scope, receive, send):
+        if not self.requested(scope) or not self._slots.acquire(blocking=False):
+            await self.app(scope, receive, send)
+            return
+
+        profile = SamplingProfiler(self.interval)
+        status = {}
+
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+                message["headers"] = list(message.get("headers") or ()) + [(b"x-profile-id", profile.id.encode())]
+            await send(message)
+
+        token = current_profile.set(profile)
+        profile.start()
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            profile.stop()
+            current_profile.reset(token)
+            self._slots.release()
+            try:
+                self.store.save(profile, method=scope["method"], path=scope["path"], status=status.get("code"))
+                logger.info(f"Saved profile {profile.id} for {scope['path']}", extra={"profile_id": profile.id})
+            except Exception as e:
+                logger.error(f"Error saving profile {profile.id}: {str(e)}")
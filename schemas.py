@@ -0,0 +1,18 @@
+# schemas.py
+from pydantic import BaseModel
+from typing import Dict, List
+
+
+class ContentItem(BaseModel):
+    type: str
+    text: str
+
+
+class MainContent(BaseModel):
+    type: str
+    text: str
+
+
+class WeeklyContent(BaseModel):
+    week: str
+    content_by_days: Dict[str, List[ContentItem]]
@@ -0,0 +1,91 @@
+# sentences.py
+from functools import lru_cache
+from typing import List, Union
+import re
+
+DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+DAY_INDEX = {day.lower(): index for index, day in enumerate(DAYS)}
+
+# Sentence end: terminal punctuation (plus closing quotes/brackets) followed by
+# whitespace, or a blank line between paragraphs.
+SENTENCE_BOUNDARY = re.compile(r"[.!?…]+[\"'”’)\]]*\s+|\n\s*\n")
+ABBREVIATIONS = {
+    "mr", "mrs", "ms", "dr", "prof", "sr", "jr", "st", "vs", "e.g", "i.e",
+    "inc", "ltd", "corp", "fig", "approx", "dept", "jan", "feb", "apr", "jun",
+    "jul", "aug", "sep", "sept", "oct", "nov", "dec"
+}
+
+
+def day_index(day: str) -> int:
+    """Position of a weekday name in the week, case-insensitive."""
+    return DAY_INDEX[day.strip().lower()]
+
+
+class SentenceIndex:
+    """Sentence offsets into a text, computed once.
+
+    Windows of consecutive sentences are returned as a single slice of the
+    original text, so the sentences are never materialized or re-joined; a
+    window that wraps past the last sentence costs one extra slice.
+    """
+
+    __slots__ = ("text", "starts", "ends")
+
+    def __init__(self, text: str):
+        self.text = text
+        self.starts: List[int] = []
+        self.ends: List[int] = []
+
+        position = 0
+        for match in SENTENCE_BOUNDARY.finditer(text):
+            if match.group().startswith(".") and self._is_abbreviation(match.start()):
+                continue
+            self._add(position, match.start() + len(match.group().rstrip()))
+            position = match.end()
+        self._add(position, len(text))
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def __getitem__(self, index: int) -> str:
+        return self.text[self.starts[index]:self.ends[index]]
+
+    def window(self, start: int, count: int) -> str:
+        """count consecutive sentences from start, wrapping to the beginning."""
+        total = len(self.starts)
+        if total == 0 or count <= 0:
+            return ""
+        count = min(count, total)
+        start %= total
+        last = start + count - 1
+        if last < total:
+            return self.text[self.starts[start]:self.ends[last]]
+        return (
+            self.text[self.starts[start]:self.ends[total - 1]] + " "
+            + self.text[self.starts[0]:self.ends[last - total]]
+        )
+
+    def _add(self, start: int, end: int) -> None:
+        while start < end and self.text[start].isspace():
+            start += 1
+        if start < end:
+            self.starts.append(start)
+            self.ends.append(end)
+
+    def _is_abbreviation(self, dot: int) -> bool:
+        word_start = dot
+        while word_start > 0 and not self.text[word_start - 1].isspace():
+            word_start -= 1
+        word = self.text[word_start:dot].lstrip("(\"'").lower()
+        # Single initials ("J. Smith") and known abbreviations don't end a sentence
+        return (len(word) == 1 and word.isalpha()) or word in ABBREVIATIONS
+
+
+@lru_cache(maxsize=64)
+def sentence_index(text: str) -> SentenceIndex:
+    """Shared SentenceIndex for a text; every post drawn from it reuses one index."""
+    return SentenceIndex(text)
+
+
+def as_sentence_index(content: Union[str, SentenceIndex]) -> SentenceIndex:
+    return content if isinstance(content, SentenceIndex) else sentence_index(content)
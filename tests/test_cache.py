@@ -0,0 +1,199 @@
+import os
+
+import pytest
+
+import cache
+from cache import TTLCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache.time, "monotonic", clock)
+    return clock
+
+
+def test_entries_expire_ttl_after_last_access(clock):
+    store = TTLCache(ttl=10)
+    store.set("a", 1)
+    store.set("b", 2)
+    clock.now += 6
+    assert store.get("a") == 1  # pushes a's deadline to now + 10
+    clock.now += 6
+    assert "b" not in store
+    assert store.get("a") == 1
+    clock.now += 10
+    assert store.get("a") is None
+    assert store.expirations == 2
+    assert store.stats()["entries"] == 0
+
+
+def test_least_recently_used_entry_is_evicted(clock):
+    store = TTLCache(ttl=10, max_entries=2)
+    store.set("a", 1)
+    store.set("b", 2)
+    store.get("a")
+    store.set("c", 3)
+    assert "b" not in store
+    assert store.get("a") == 1 and store.get("c") == 3
+    assert store.evictions == 1
+
+
+def test_byte_budget_evicts_oldest_but_keeps_newest(clock):
+    store = TTLCache(ttl=10, max_bytes=10, sizer=len)
+    store.set("a", "xxxxxx")
+    store.set("b", "yyyyyy")
+    assert "a" not in store and store.get("b") == "yyyyyy"
+    store.set("c", "z" * 50)
+    assert len(store) == 1 and store.get("c") == "z" * 50
+
+
+def test_codec_round_trips_and_update_is_atomic(clock):
+    store = TTLCache(ttl=10, codec=cache.CompressedPickleCodec())
+    store.set("a", {"items": [1, 2]})
+    assert store.update("a", lambda value: {**value, "items": value["items"] + [3]}) == {"items": [1, 2, 3]}
+    assert store.get("a") == {"items": [1, 2, 3]}
+    assert store.update("missing", lambda value: value) is None
+
+    def fail(value):
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        store.update("a", fail)
+    assert store.get("a") == {"items": [1, 2, 3]}
+
+
+def test_expires_at_is_none_once_the_entry_is_gone(clock):
+    store = TTLCache(ttl=10)
+    store.set("a", 1)
+    assert store.expires_at("a") is not None
+    store.pop("a")
+    assert store.expires_at("a") is None
+
+
+def test_signed_codec_rejects_tampered_or_foreign_values():
+    codec = cache.SignedCodec(b"secret")
+    data = codec.encode({"a": 1})
+    assert codec.decode(data) == {"a": 1}
+
+    tampered = data[:-1] + bytes([data[-1] ^ 1])
+    with pytest.raises(ValueError):
+        codec.decode(tampered)
+    with pytest.raises(ValueError):
+        cache.SignedCodec(b"other").decode(data)
+    with pytest.raises(ValueError):
+        cache.SignedCodec(b"")
+
+
+@pytest.fixture
+def wall_clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache.time, "time", clock)
+    return clock
+
+
+def test_sqlite_store_is_shared_between_instances_and_expires(tmp_path, wall_clock):
+    path = str(tmp_path / "temp.sqlite3")
+    first, second = cache.SQLiteTTLStore(path, ttl=10), cache.SQLiteTTLStore(path, ttl=10)
+    first.set("a", {"week": 1})
+    assert second.get("a") == {"week": 1}
+    assert second.update("a", lambda value: {**value, "week": 2}) == {"week": 2}
+    assert first.get("a") == {"week": 2}
+    assert first.expires_at("a") == wall_clock.now + 10
+
+    wall_clock.now += 11
+    assert first.get("a") is None
+    assert "a" not in second and len(second) == 0
+
+
+def test_sqlite_store_evicts_soonest_expiring_entries(tmp_path, wall_clock):
+    store = cache.SQLiteTTLStore(str(tmp_path / "temp.sqlite3"), ttl=10, max_entries=2)
+    for key in ("a", "b", "c"):
+        store.set(key, key)
+        wall_clock.now += 1
+    assert "a" not in store
+    assert store.get("b") == "b" and store.get("c") == "c"
+    assert store.evictions == 1
+
+
+@pytest.fixture
+def redis_store(monkeypatch):
+    fakeredis = pytest.importorskip("fakeredis")
+    import redis
+
+    server = fakeredis.FakeRedis()
+    monkeypatch.setattr(redis.Redis, "from_url", staticmethod(lambda url: server))
+    return cache.RedisTTLStore("redis://localhost:6379/0", ttl=10, secret="secret")
+
+
+def test_redis_store_round_trips_and_updates(redis_store):
+    redis_store.set("a", {"week": 1})
+    assert redis_store.get("a") == {"week": 1}
+    assert redis_store.update("a", lambda value: {**value, "week": 2}) == {"week": 2}
+    assert redis_store.expires_at("a") is not None
+    assert redis_store.pop("a") == {"week": 2}
+    assert redis_store.get("a") is None
+    assert redis_store.expires_at("a") is None
+
+
+def test_redis_store_refuses_values_without_a_valid_signature(redis_store):
+    redis_store._client.set("temp_storage:a", cache.CompressedPickleCodec().encode({"week": 1}))
+    with pytest.raises(ValueError):
+        redis_store.get("a")
+
+
+def spill_store(tmp_path, **kwargs):
+    # A 3KB memory budget holds about one or two of the values below
+    return cache.SpillStore(str(tmp_path), max_memory_bytes=3000, **kwargs)
+
+
+def spill_value(key):
+    return [f"{key}-{index:04d}" for index in range(200)]
+
+
+def test_spill_store_spills_cold_entries_and_reads_them_back(tmp_path):
+    store = spill_store(tmp_path)
+    values = {key: spill_value(key) for key in "abcde"}
+    for key, value in values.items():
+        store[key] = value
+
+    assert store.stats()["disk_entries"] > 0
+    assert store.spills == store.stats()["disk_entries"]
+    for key, value in values.items():
+        assert store[key] == value
+    assert store.disk_hits > 0
+    assert len(store) == 5
+    with pytest.raises(KeyError):
+        store["missing"]
+
+
+def test_spill_store_drops_oldest_segments_over_the_disk_budget(tmp_path):
+    store = spill_store(tmp_path, max_disk_bytes=1000, segment_bytes=100)
+    for index in range(20):
+        store[index] = spill_value(index)
+
+    assert store.dropped > 0
+    assert store.get(0) is None
+    assert store.get(19) == spill_value(19)
+    assert 0 < store.stats()["disk_bytes"] <= 1000
+
+
+def test_spill_store_close_removes_only_its_own_directory(tmp_path):
+    (tmp_path / "keep.txt").write_text("unrelated")
+    store = spill_store(tmp_path)
+    for key in "abcde":
+        store[key] = spill_value(key)
+    directory = store.directory
+
+    store.close()
+    assert not os.path.exists(directory)
+    assert (tmp_path / "keep.txt").read_text() == "unrelated"
+    assert len(store) == 0
@@ -0,0 +1,98 @@
+from datetime import date
+
+import pytest
+
+from database import DatabaseManager
+from models import Content, ContentArchive, ContentStatus, PlatformEnum
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path / 'content.db'}")
+    return DatabaseManager()
+
+
+def add_content(db, *rows):
+    """Insert (platform, week, file_name, status, date_upload) rows; returns their ids."""
+    session = next(db.get_db_session())
+    try:
+        contents = [
+            Content(
+                week=week, day="Monday", content=f"post {index}", title="title", status=status,
+                date_upload=uploaded, platform=platform, file_name=file_name, file_type="txt"
+            )
+            for index, (platform, week, file_name, status, uploaded) in enumerate(rows)
+        ]
+        session.add_all(contents)
+        session.commit()
+        return [content.id for content in contents]
+    finally:
+        session.close()
+
+
+def statuses(db):
+    session = next(db.get_db_session())
+    try:
+        return {content.id: content.status for content in session.query(Content).all()}
+    finally:
+        session.close()
+
+
+TODAY = date.today()
+PENDING, UPLOADED = ContentStatus.pending, ContentStatus.uploaded
+
+
+def test_bulk_status_update_by_ids_skips_rows_already_in_status(db):
+    first, second, third = add_content(
+        db,
+        (PlatformEnum.LINKEDIN, 1, "a.txt", PENDING, TODAY),
+        (PlatformEnum.LINKEDIN, 1, "a.txt", UPLOADED, TODAY),
+        (PlatformEnum.TWITTER, 1, "a.txt", PENDING, TODAY),
+    )
+    assert db.update_content_status_bulk(UPLOADED, content_ids=[first, second, 999]) == [first]
+    assert statuses(db) == {first: UPLOADED, second: UPLOADED, third: PENDING}
+
+
+def test_bulk_status_update_by_filters(db):
+    ids = add_content(
+        db,
+        (PlatformEnum.LINKEDIN, 1, "a.txt", PENDING, TODAY),
+        (PlatformEnum.LINKEDIN, 2, "a.txt", PENDING, TODAY),
+        (PlatformEnum.TWITTER, 1, "a.txt", PENDING, TODAY),
+        (PlatformEnum.LINKEDIN, 1, "b.txt", PENDING, TODAY),
+    )
+    updated = db.update_content_status_bulk(UPLOADED, file_name="a.txt", platform=PlatformEnum.LINKEDIN, week=1)
+    assert updated == [ids[0]]
+    assert sorted(db.update_content_status_bulk(UPLOADED, file_name="a.txt")) == [ids[1], ids[2]]
+
+
+def test_bulk_status_update_needs_a_filter(db):
+    with pytest.raises(ValueError):
+        db.update_content_status_bulk(UPLOADED)
+
+
+def test_archive_moves_only_old_uploaded_rows(db):
+    old = date(2020, 1, 1)
+    archived_id, pending_id, recent_id = add_content(
+        db,
+        (PlatformEnum.LINKEDIN, 1, "a.txt", UPLOADED, old),
+        (PlatformEnum.LINKEDIN, 1, "a.txt", PENDING, old),
+        (PlatformEnum.LINKEDIN, 1, "a.txt", UPLOADED, TODAY),
+    )
+    assert db.archive_uploaded_content(30, batch_size=1) == 1
+    assert set(statuses(db)) == {pending_id, recent_id}
+
+    session = next(db.get_db_session())
+    try:
+        (row,) = session.query(ContentArchive).all()
+        assert (row.id, row.content, row.status, row.date_upload) == (archived_id, "post 0", UPLOADED, old)
+        assert row.archived_at is not None
+    finally:
+        session.close()
+    assert db.archive_uploaded_content(30) == 0
+
+
+def test_archive_works_through_several_batches(db):
+    add_content(db, *[(PlatformEnum.TWITTER, 1, "a.txt", UPLOADED, date(2020, 1, 1))] * 5)
+    assert db.archive_uploaded_content(30, batch_size=2) == 5
+    assert statuses(db) == {}
@@ -0,0 +1,55 @@
+import random
+
+import pytest
+
+import dedup
+from dedup import MinHasher, NearDuplicateIndex, choose_bands
+
+
+def words(seed, count=60):
+    rng = random.Random(seed)
+    return [f"word{rng.randrange(10000)}" for _ in range(count)]
+
+
+BASE = " ".join(words(1))
+# One word in sixty changed: most three-word shingles are shared
+EDITED = " ".join(words(1)[:30] + ["changed"] + words(1)[31:])
+UNRELATED = " ".join(words(2))
+
+
+def test_identical_text_is_a_duplicate_of_the_first_key():
+    index = NearDuplicateIndex(0.5)
+    assert index.check("Week 1 - Monday", BASE) is None
+    assert index.check("Week 1 - Tuesday", BASE) == ("Week 1 - Monday", 1.0)
+    assert len(index) == 1  # duplicates are not remembered
+
+
+def test_unrelated_text_is_not_a_duplicate():
+    index = NearDuplicateIndex(0.5)
+    index.check("a", BASE)
+    assert index.check("b", UNRELATED) is None
+    assert len(index) == 2
+
+
+@pytest.mark.parametrize("threshold, duplicate", [(0.5, True), (0.99, False)])
+def test_threshold_decides_whether_a_small_edit_counts(threshold, duplicate):
+    index = NearDuplicateIndex(threshold)
+    index.check("a", BASE)
+    match = index.check("b", EDITED)
+    assert (match is not None) == duplicate
+    if match:
+        assert match[0] == "a" and threshold <= match[1] < 1.0
+
+
+def test_signatures_are_the_same_with_and_without_numpy(monkeypatch):
+    pytest.importorskip("numpy")
+    vectorized = MinHasher().signature(BASE)
+    monkeypatch.setattr(dedup, "np", None)
+    assert MinHasher().signature(BASE) == vectorized
+
+
+@pytest.mark.parametrize("threshold", [0.3, 0.5, 0.8])
+def test_band_midpoint_is_near_the_threshold(threshold):
+    bands, rows = choose_bands(64, threshold)
+    assert bands * rows == 64
+    assert abs((1 / bands) ** (1 / rows) - threshold) < 0.15
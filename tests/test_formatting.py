@@ -0,0 +1,29 @@
+import pytest
+
+from formatting import PostFormatter
+
+TEXT = "Hello there world, this is a longer post body"
+
+
+@pytest.mark.parametrize("limits", [
+    {"chars": 1}, {"chars": 10}, {"chars": 28}, {"chars": 29}, {"chars": 40},
+    {"words": 1}, {"words": 2}, {"words": 3}, {"graphemes": 12},
+])
+def test_output_never_exceeds_limits(limits):
+    post = PostFormatter("linkedin", limits).format(TEXT)
+    assert post.char_count == len(post.content)
+    assert post.char_count <= limits.get("chars", post.char_count)
+    assert post.grapheme_count <= limits.get("graphemes", post.grapheme_count)
+    assert post.word_count <= limits.get("words", post.word_count)
+
+
+def test_suffix_dropped_when_it_cannot_fit():
+    post = PostFormatter("linkedin", {"chars": 10}).format(TEXT)
+    assert post.content == "Hello…"
+    assert PostFormatter("linkedin", {"chars": 10}).format("").content == ""
+
+
+def test_suffix_kept_when_it_fits():
+    post = PostFormatter("linkedin", {"chars": 40}).format(TEXT)
+    assert post.content.endswith("\n\n#Professional #Development")
+    assert post.truncated
@@ -0,0 +1,112 @@
+import gzip
+import json
+import os
+from datetime import datetime, timedelta
+
+import pytest
+
+from output_store import OutputStore
+
+
+def post(week_day, title):
+    return {"week_day": week_day, "title": title, "content": f"{title} body", "word_count": 2, "char_count": 9}
+
+
+RESULTS = {
+    "linkedin": [post("Week 1 - Monday", "First"), post("Week 1 - Tuesday", "Second")],
+    "twitter": [post("Week 2 - Friday", "Third")],
+}
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = OutputStore(str(tmp_path))
+    yield store
+    store.close()
+
+
+def test_submitted_runs_are_indexed_and_read_back(store):
+    run_id = store.submit(RESULTS, kind="content", file_name="plan.txt", source_hash="abc")
+    store.flush()
+
+    run = store.get_run(run_id)
+    assert run["results"] == RESULTS and run["file_name"] == "plan.txt"
+    assert {row["platform"]: row["post_count"] for row in store.find_runs(source_hash="abc")} == {
+        "linkedin": 2, "twitter": 1
+    }
+    assert store.find_runs(file_name="other.txt") == []
+
+    posts = store.find_posts(platform="linkedin", week=1, day="Tuesday")
+    assert [(row["title"], row["position"]) for row in posts] == [("Second", 1)]
+    assert posts[0]["post"] == RESULTS["linkedin"][1]
+    assert "post" not in store.find_posts(week=2, include_content=False)[0]
+    assert store.get_run("unknown") is None
+
+
+def test_segments_are_one_gzip_member_per_run(store, tmp_path):
+    for _ in range(3):
+        store.submit(RESULTS, kind="content")
+    store.flush()
+
+    (segment,) = os.listdir(tmp_path / "segments")
+    assert f"-{store.writer_id}-" in segment
+    with gzip.open(tmp_path / "segments" / segment, "rt", encoding="utf-8") as f:
+        assert [json.loads(line)["results"] for line in f] == [RESULTS] * 3
+
+
+def test_usage_only_runs_write_no_segment(store, tmp_path):
+    usage = [{
+        "stage": "qc", "platform": "", "model": "gpt-4o-mini", "prompt_tokens": 10, "cached_prompt_tokens": 0,
+        "completion_tokens": 5, "total_tokens": 15, "successful_requests": 1, "cost_usd": 0.1
+    }]
+    store.submit_usage(usage, kind="content")
+    store.flush()
+
+    assert os.listdir(tmp_path / "segments") == []
+    assert store.find_runs() == []
+    (row,) = store.find_usage(["kind", "stage"])
+    assert (row["kind"], row["stage"], row["total_tokens"], row["runs"]) == ("content", "qc", 15, 1)
+
+
+def test_retention_removes_old_segments_with_their_index_rows(store):
+    old = {
+        "run_id": "old", "kind": "content", "file_name": None, "source_hash": None,
+        "created_at": (datetime.now() - timedelta(days=40)).isoformat(), "results": RESULTS
+    }
+    store.write(old)
+    new_id = store.submit(RESULTS, kind="content")
+    store.flush()
+
+    assert store.apply_retention(30) == 1
+    assert store.get_run("old") is None
+    assert store.get_run(new_id) is not None
+    assert {row["run_id"] for row in store.find_posts(include_content=False)} == {new_id}
+    assert store.apply_retention() == 0  # no retention configured
+
+
+def test_backfill_imports_legacy_files_once(tmp_path):
+    (tmp_path / "content_20240102_030405.json").write_text(json.dumps(RESULTS), encoding="utf-8")
+    (tmp_path / "custom_content_20240103_000000.json").write_text(json.dumps({"twitter": []}), encoding="utf-8")
+    (tmp_path / "notes.json").write_text("{}", encoding="utf-8")
+    (tmp_path / "content_20240104_000000.json").write_text("not json", encoding="utf-8")
+
+    first = OutputStore(str(tmp_path))
+    second = OutputStore(str(tmp_path))
+    assert first.backfill_index() == 2
+    assert second.backfill_index() == 0
+    assert first.backfill_index() == 0
+
+    runs = first.find_runs(platform="linkedin")
+    assert [(row["kind"], row["created_at"]) for row in runs] == [("content", "2024-01-02T03:04:05")]
+    assert first.find_posts(week=2, day="friday")[0]["post"] == RESULTS["twitter"][0]
+    assert (tmp_path / "content_20240102_030405.json").exists()
+
+
+def test_backfill_adds_post_rows_for_runs_indexed_before_them(store):
+    store.submit(RESULTS, kind="content")
+    store.flush()
+    store._conn.execute("DELETE FROM posts")
+    store._conn.commit()
+
+    assert store.backfill_index() == 1
+    assert len(store.find_posts(include_content=False)) == 3
@@ -0,0 +1,48 @@
+import pytest
+
+from phrase_filter import ForbiddenPhraseFilter, phrase_filter
+
+
+@pytest.mark.parametrize("text, phrase", [
+    ("You should get ready for the exam.", "get ready"),
+    ("Teams must be prepared to respond quickly.", "be prepared"),
+    ("Get ready for the exam.", "get ready"),
+    ("He prepared a detailed report.", "prepared"),
+    ("We will navigate to the settings page.", "navigate"),
+    ("The landscape photo", "landscape"),
+    ("Passengers embarked at noon.", "embarked"),
+])
+def test_context_dependent_phrases_are_only_flagged(text, phrase):
+    rewritten, unresolved = phrase_filter.rewrite(text)
+    assert rewritten == text
+    assert unresolved == [phrase]
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("Buckle up, this is big.", "This is big."),
+    ("Done.   Buckle up!  Next one.", "Done. Next one."),
+    ("Done. Buckle up!", "Done."),
+    ("Line one.\nStrap in: it gets wild.", "Line one.\nIt gets wild."),
+])
+def test_openers_are_deleted_at_sentence_start(text, expected):
+    assert phrase_filter.rewrite(text) == (expected, [])
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("Let's delve into the data.", "Let's explore the data."),
+    ("It is a quest worth taking.", "It is an effort worth taking."),
+    ("A Vibrant community.", "A Lively community."),
+])
+def test_safe_replacements(text, expected):
+    assert phrase_filter.rewrite(text) == (expected, [])
+
+
+def test_unresolved_text_is_not_clean():
+    text = "Teams must be prepared to respond quickly."
+    assert not phrase_filter.is_clean(text)
+    assert phrase_filter.find(text) == [("be prepared", 11, 22)]
+
+
+def test_custom_phrases():
+    custom = ForbiddenPhraseFilter({"synergy": "teamwork"})
+    assert custom.rewrite("Synergy wins.") == ("Teamwork wins.", [])
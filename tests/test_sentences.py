@@ -0,0 +1,34 @@
+import pytest
+
+from sentences import SentenceIndex, day_index
+
+TEXT = " ".join(f"Sentence number {index} talks about topic {index % 7}." for index in range(40))
+
+
+def legacy_window(content, start, count):
+    """Window selection as generate_unique_content did it before SentenceIndex, without wrapping."""
+    sentences = content.split('. ')
+    return '. '.join(sentences[start:start + count])
+
+
+@pytest.mark.parametrize("start, count", [(0, 5), (3, 15), (20, 5), (25, 15), (35, 5)])
+def test_windows_match_the_old_split_slicing(start, count):
+    window = SentenceIndex(TEXT).window(start, count)
+    # Same sentences; the old split dropped the period of a window's last sentence
+    assert window == legacy_window(TEXT, start, count).rstrip(".") + "."
+
+
+def test_windows_wrap_to_the_beginning():
+    index = SentenceIndex("One. Two. Three.")
+    assert index.window(2, 2) == "Three. One."
+    assert index.window(4, 5) == "Two. Three. One."
+    assert SentenceIndex("").window(0, 5) == ""
+
+
+def test_abbreviations_and_initials_do_not_split_sentences():
+    index = SentenceIndex("Dr. Smith met J. Doe today! Was it e.g. planned?\n\nNew paragraph")
+    assert list(index) == ["Dr. Smith met J. Doe today!", "Was it e.g. planned?", "New paragraph"]
+
+
+def test_day_index_is_case_insensitive():
+    assert [day_index(day) for day in ("monday", " Saturday ", "SUNDAY")] == [0, 5, 6]
@@ -0,0 +1,57 @@
+import threading
+import time
+
+from usage import UsageTracker
+
+
+class FakeAgent:
+    def __init__(self):
+        self.prompt_tokens = 0
+
+
+class FakeCrew:
+    """Adds tokens to its agent's lifetime counter halfway through each kickoff."""
+
+    def __init__(self, agent, tokens):
+        self.agents = [agent]
+        self.tokens = tokens
+
+    def calculate_usage_metrics(self):
+        return {"prompt_tokens": self.agents[0].prompt_tokens}
+
+    def kickoff(self, inputs):
+        time.sleep(0.01)
+        self.agents[0].prompt_tokens += self.tokens
+        time.sleep(0.01)
+        return "done"
+
+
+def test_overlapping_kickoffs_on_a_shared_agent_count_only_their_own_tokens():
+    agent = FakeAgent()
+    trackers = [UsageTracker() for _ in range(4)]
+    threads = [
+        threading.Thread(target=tracker.kickoff, args=(FakeCrew(agent, 10 * (i + 1)), "qc", {}))
+        for i, tracker in enumerate(trackers)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert [tracker.summary()["prompt_tokens"] for tracker in trackers] == [10, 20, 30, 40]
+
+
+def test_crew_without_usage_metrics_falls_back_to_token_usage():
+    class Result:
+        token_usage = {"prompt_tokens": 7, "completion_tokens": 3}
+
+    class Crew:
+        agents = []
+
+        def kickoff(self, inputs):
+            return Result()
+
+    tracker = UsageTracker()
+    tracker.kickoff(Crew(), "research", {})
+    assert tracker.summary()["prompt_tokens"] == 7
+    assert tracker.summary()["completion_tokens"] == 3
@@ -1,5 +1,5 @@
 # tools.py
-from typing import Dict, Optional
+from typing import Dict, Optional, Union
 import pandas as pd
 import speech_recognition as sr
 # from pydx2 import PdfReader
@@ -15,11 +15,12 @@ from crewai_tools import PDFSearchTool
 from PyPDF2 import PdfReader
 from pathlib import Path
 from datetime import datetime
+from sentences import SentenceIndex, as_sentence_index, day_index
 
 
 
 PLATFORM_LIMITS = {
-    "twitter": {"chars": None, "words": 280},
+    "twitter": {"chars": None, "words": 280, "graphemes": 280},
     "instagram": {"chars": None, "words": 400},
     "linkedin": {"chars": None, "words": 600},
     "facebook": {"chars": None, "words": 1000},
@@ -253,83 +254,53 @@ class FileProcessor:
         except Exception as e:
             raise Exception(f"Markdown extraction error: {str(e)}")
 
-def generate_unique_content(content: str, week: int, day: str, platform: str) -> str:
+UNIQUE_CONTENT_PREFIXES = {
+    "twitter": "Day  ",
+    "instagram": "📱",
+    "linkedin": "💡 Professional Insight - ",
+    "facebook": "🎯 Thought of the Day - ",
+}
+
+DIFFERENT_CONTENT_PREFIXES = {
+    "twitter": "Update # - ",
+    "instagram": "📱 \n",
+    "linkedin": "💡 Professional Insight # - ",
+    "facebook": "🎯 Update # - ",
+}
+
+
+def generate_unique_content(content: Union[str, SentenceIndex], week: int, day: str, platform: str, shift: int = 0) -> str:
     """
-    Generate unique content based on week and day context
+    Generate unique content based on week and day context.
+    content may be a prebuilt SentenceIndex to share one index across posts;
+    shift moves the window forward by that many sentences (used to regenerate).
     """
-    # Split content into sentences
-    sentences = content.split('. ')
-    
-    # Use week and day to select different portions of content
-    start_idx = ((week - 1) * 5 + ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"].index(day)) % len(sentences)
-    
-    # Take a different subset of sentences for each day
-    num_sentences = min(5, len(sentences))  # Take up to 5 sentences
-    selected_sentences = sentences[start_idx:start_idx + num_sentences]
-    
-    # If we need more sentences, wrap around to the beginning
-    if len(selected_sentences) < num_sentences:
-        selected_sentences.extend(sentences[:num_sentences - len(selected_sentences)])
-    
-    # Join sentences back together
-    unique_content = '. '.join(selected_sentences)
-    
-    # Add platform-specific formatting
-    if platform == "twitter":
-        unique_content = f"Day  {unique_content}"
-    elif platform == "instagram":
-        unique_content = f"📱{unique_content}"
-    elif platform == "linkedin":
-        unique_content = f"💡 Professional Insight - {unique_content}"
-    elif platform == "facebook":
-        unique_content = f"🎯 Thought of the Day - {unique_content}"
-    
-    return unique_content
+    sentences = as_sentence_index(content)
+    if not len(sentences):
+        return UNIQUE_CONTENT_PREFIXES.get(platform, "")
+
+    # Use week and day to select a different window of up to 5 sentences
+    start_idx = ((week - 1) * 5 + day_index(day) + shift) % len(sentences)
+    unique_content = sentences.window(start_idx, 5)
+
+    return UNIQUE_CONTENT_PREFIXES.get(platform, "") + unique_content
 
 
-def generate_different_content(content, week, day, platform, post_number):
+def generate_different_content(content: Union[str, SentenceIndex], week: int, day: str, platform: str, post_number: int, shift: int = 0) -> str:
     """
     Generate unique content based on week, day context, and post number to ensure
     different content for multiple posts on the same day
     """
-    # Split content into sentences
-    sentences = content.split('. ')
-    
-    # Calculate different starting points for different posts on the same day
-    base_idx = ((week - 1) * 5 + ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"].index(day)) % len(sentences)
-    post_offset = (post_number - 1) * 3  # Offset by 3 sentences for each post
-    start_idx = (base_idx + post_offset) % len(sentences)
-    
-    # Take a different subset of sentences for each post
-    num_sentences = min(15, len(sentences))  # Take up to 5 sentences
-    selected_sentences = sentences[start_idx:start_idx + num_sentences]
-    
-    # If we need more sentences, wrap around to the beginning
-    if len(selected_sentences) < num_sentences:
-        remaining = num_sentences - len(selected_sentences)
-        selected_sentences.extend(sentences[:remaining])
-    
-    # Join sentences back together
-    unique_content = '. '.join(selected_sentences)
-    
-    # Add platform-specific formatting with post number
-    if platform == "twitter":
-        unique_content = f"Update # - {unique_content}"
-    elif platform == "instagram":
-        unique_content = f"📱 \n{unique_content}"
-    elif platform == "linkedin":
-        unique_content = f"💡 Professional Insight # - {unique_content}"
-    elif platform == "facebook":
-        unique_content = f"🎯 Update # - {unique_content}"
-    elif platform == "youtube":
-        unique_content == f" {unique_content}"
-    elif platform == "tiktok":
-        unique_content == f" {unique_content}"
-    
-    return unique_content
-
+    sentences = as_sentence_index(content)
+    if not len(sentences):
+        return DIFFERENT_CONTENT_PREFIXES.get(platform, "")
 
+    # Offset by 3 sentences for each post on the same day, then take up to 15
+    base_idx = ((week - 1) * 5 + day_index(day)) % len(sentences)
+    start_idx = (base_idx + (post_number - 1) * 3 + shift) % len(sentences)
+    unique_content = sentences.window(start_idx, 15)
 
+    return DIFFERENT_CONTENT_PREFIXES.get(platform, "") + unique_content
 
 
 def extract_title_from_content(content: str) -> str:
@@ -351,47 +322,6 @@ def extract_title_from_content(content: str) -> str:
     
     return "Untitled Post"
 
-def process_content_for_platform(content: str, platform: str, limits: Dict) -> str:
-    """
-    Process and format content according to platform-specific limits
-    """
-    # Clean content
-    content = content.strip()
-    
-    # Apply character limit if specified
-    if limits.get("chars"):
-        content = content[:limits["chars"]]
-    
-    # Apply word limit if specified
-    if limits.get("words"):
-        words = content.split()
-        content = ' '.join(words[:limits["words"]])
-    
-    # Add platform-specific formatting
-    if platform == "twitter":
-        # Leave room for hashtags
-        if len(content) > 240:
-            content = content[:237] + "..."
-        content += "#Content #Social"
-    
-    elif platform == "instagram":
-        content += "#Instagram #Social"
-    
-    elif platform == "linkedin":
-        content += "#Professional #Development"
-    
-    elif platform == "facebook":
-        content += "Like and share if you agree! 👍"
-
-    elif platform == "youtube":
-        content += "#Professional #Development"
-
-    elif platform == "tiktok":
-        content == "follow for more"
-    
-    return content.strip()
-
-
 # Instantiate FileProcessor
 file_processor = FileProcessor()
 
@@ -401,114 +331,3 @@ file_processor = FileProcessor()
 #     description="A universal tool for extracting text from various file formats.",
 #     func=lambda file_path: file_processor.extract_text_from_file(file_path),  # Use 'func' as the field name
 # )
-
-
-
-def trim_content(content: str, platform: str, limits: dict) -> str:
-    """Trim content based on platform-specific character or word limits."""
-    char_limit = limits.get(platform, {}).get("chars")
-    word_limit = limits.get(platform, {}).get("words")
-    
-    # Apply character limit
-    if char_limit:
-        content = content[:char_limit].strip()
-    
-    # Apply word limit
-    if word_limit:
-        words = content.split()
-        content = " ".join(words[:word_limit]).strip()
-    
-    return content
-
-
-
-def generate_twitter_post(content: str, limits: dict) -> str:
-    """Generate a concise Twitter post with dynamic hashtags."""
-    content = trim_content(content, "twitter", limits)
-    hashtags = "#Trending #Innovation #Tech"
-    return f"{content}\n\n{hashtags}"
-
-# twitter_post_tool = Tool(
-#     name="TwitterPostGeneratorTool",
-#     description="Generates concise and impactful tweets with dynamic hashtags, respecting platform limits.",
-#     func=lambda content: generate_twitter_post(content, PLATFORM_LIMITS),
-# )
-
-
-
-def generate_instagram_post(content: str, limits: dict) -> str:
-    """Generate an Instagram post with emojis and hashtags."""
-    content = trim_content(content, "instagram", limits)
-    hashtags = "#InstaLife #Photography #Explore"
-    emoji = "📸✨"
-    return f"{emoji} {content.strip()} {hashtags}"
-
-# instagram_post_tool = Tool(
-#     name="InstagramPostGeneratorTool",
-#     description="Generates Instagram captions with emojis and hashtags, respecting platform limits.",
-#     func=lambda content: generate_instagram_post(content, PLATFORM_LIMITS),
-# )
-
-
-def generate_linkedin_post(content: str, limits: dict) -> str:
-    """Generate a professional LinkedIn post with hashtags."""
-    content = trim_content(content, "linkedin", limits)
-    hashtags = "#Professional #Leadership #Growth"
-    return f"{content.strip()} {hashtags} Engage with this post by sharing your thoughts!"
-
-# linkedin_post_tool = Tool(
-#     name="LinkedInPostGeneratorTool",
-#     description="Generates professional LinkedIn posts with dynamic formatting and hashtags.",
-#     func=lambda content: generate_linkedin_post(content, PLATFORM_LIMITS),
-# )
-
-
-def generate_facebook_post(content: str, limits: dict) -> str:
-    """Generate a friendly Facebook post."""
-    content = trim_content(content, "facebook", limits)
-    return f"{content.strip()} Like and share if you agree! 👍"
-
-# facebook_post_tool = Tool(
-#     name="FacebookPostGeneratorTool",
-#     description="Generates friendly and engaging Facebook posts, respecting platform limits.",
-#     func=lambda content: generate_facebook_post(content, PLATFORM_LIMITS),
-# )
-
-
-def generate_wordpress_post(content: str, limits: dict) -> str:
-    """Generate a WordPress blog post with SEO-friendly structure."""
-    content = trim_content(content, "wordpress", limits)
-    # title = "Blog Title: " + (content[:50] + "..." if len(content) > 50 else content)
-    return f" {content.strip()} #SEO #WordPress"
-
-# wordpress_post_tool = Tool(
-#     name="WordPressPostGeneratorTool",
-#     description="Generates SEO-optimized WordPress blog posts, respecting platform limits.",
-#     func=lambda content: generate_wordpress_post(content, PLATFORM_LIMITS),
-# )
-
-
-def generate_youtube_post(content: str, limits: dict) -> str:
-    """Generate a youtube post which is further used for image or video genration"""
-    content = trim_content(content, "youtube", limits)
-    # title = "Blog Title: " + (content[:50] + "..." if len(content) > 50 else content)
-    return f" {content.strip()} "
-
-# youtube_post_tool = Tool(
-#     name="youtubePostGeneratorTool",
-#     description="Generate a youtube post which is further used for image or video genration.",
-#     func=lambda content: generate_youtube_post(content, PLATFORM_LIMITS),
-# )
-
-
-def generate_tiktok_post(content: str, limits: dict) -> str:
-    """Generate a tiktok post which is further used for image or video genration"""
-    content = trim_content(content, "tiktok", limits)
-    # title = "Blog Title: " + (content[:50] + "..." if len(content) > 50 else content)
-    return f" {content.strip()} "
-
-# tiktok_post_tool = Tool(
-#     name="tiktokPostGeneratorTool",
-#     description="Generate a youtube post which is further used for image or video genration.",
-#     func=lambda content: generate_tiktok_post(content, PLATFORM_LIMITS),
-# )
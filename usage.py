@@ -0,0 +1,133 @@
+# usage.py
+from contextlib import ExitStack
+from typing import Any, Dict, List, Optional, Tuple
+import json
+import os
+import threading
+import weakref
+
+USAGE_FIELDS = ("prompt_tokens", "cached_prompt_tokens", "completion_tokens", "total_tokens", "successful_requests")
+
+# USD per million (prompt, completion) tokens; MODEL_PRICES (a JSON object of
+# model -> [prompt, completion]) overrides or extends these.
+DEFAULT_MODEL_PRICES = {
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4-turbo": (10.00, 30.00),
+    "gpt-4": (30.00, 60.00),
+    "gpt-3.5-turbo": (0.50, 1.50),
+}
+
+
+def load_prices() -> Dict[str, Tuple[float, float]]:
+    prices = dict(DEFAULT_MODEL_PRICES)
+    if os.getenv("MODEL_PRICES"):
+        prices.update({model: tuple(price) for model, price in json.loads(os.environ["MODEL_PRICES"]).items()})
+    return prices
+
+
+MODEL_PRICES = load_prices()
+
+# One lock per live agent object, held while a kickoff on it is measured
+_agent_locks: Dict[int, threading.Lock] = {}
+_agent_locks_guard = threading.Lock()
+
+
+def agent_lock(agent: Any) -> threading.Lock:
+    with _agent_locks_guard:
+        lock = _agent_locks.get(id(agent))
+        if lock is None:
+            lock = _agent_locks[id(agent)] = threading.Lock()
+            try:
+                weakref.finalize(agent, _agent_locks.pop, id(agent), None)
+            except TypeError:  # not weak-referenceable: keep the lock for the process lifetime
+                pass
+        return lock
+
+
+def usage_counts(metrics: Any) -> Dict[str, int]:
+    """Token counts from a crewai UsageMetrics object or dict (zeros if missing)."""
+    if metrics is None:
+        return dict.fromkeys(USAGE_FIELDS, 0)
+    if isinstance(metrics, dict):
+        return {field: int(metrics.get(field) or 0) for field in USAGE_FIELDS}
+    return {field: int(getattr(metrics, field, 0) or 0) for field in USAGE_FIELDS}
+
+
+def crew_model(crew: Any) -> str:
+    agents = getattr(crew, "agents", None) or []
+    llm = getattr(agents[0], "llm", None) if agents else None
+    model = getattr(llm, "model", llm)
+    return str(model) if model else "unknown"
+
+
+def cost(model: str, prompt_tokens: int, completion_tokens: int) -> Optional[float]:
+    """USD cost of the tokens, or None for a model without a known price."""
+    price = MODEL_PRICES.get(model) or MODEL_PRICES.get(model.split("/")[-1])
+    if price is None:
+        return None
+    return (prompt_tokens * price[0] + completion_tokens * price[1]) / 1_000_000
+
+
+class UsageTracker:
+    """Token usage of one request, aggregated per (stage, platform, model).
+
+    crewai keeps usage counters on each agent for the agent's lifetime, and the
+    prebuilt crews are reused across requests, so a kickoff's usage is the
+    difference of crew.calculate_usage_metrics() before and after it. That
+    difference only belongs to one run if no other run uses the same agents
+    meanwhile, so measured kickoffs hold a lock on each of the crew's agents:
+    runs on a shared crew take turns, while runs on crew.copy() (whose agents
+    have their own counters) still proceed in parallel. Crews without
+    calculate_usage_metrics fall back to the result's token_usage.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._usage: Dict[Tuple[str, str, str], Dict[str, int]] = {}
+
+    def kickoff(self, crew: Any, stage: str, inputs: Dict[str, Any], platform: str = "") -> Any:
+        calculate = getattr(crew, "calculate_usage_metrics", None)
+        if calculate is None:
+            result = crew.kickoff(inputs=inputs)
+            counts = usage_counts(getattr(result, "token_usage", None))
+        else:
+            agents = {id(agent): agent for agent in getattr(crew, "agents", None) or []}
+            with ExitStack() as stack:
+                # Fixed order, so crews sharing several agents cannot deadlock
+                for key in sorted(agents):
+                    stack.enter_context(agent_lock(agents[key]))
+                before = usage_counts(calculate())
+                result = crew.kickoff(inputs=inputs)
+                after = usage_counts(calculate())
+            counts = {field: max(after[field] - before[field], 0) for field in USAGE_FIELDS}
+        self.add(stage, platform, crew_model(crew), counts)
+        return result
+
+    def add(self, stage: str, platform: str, model: str, counts: Dict[str, int]) -> None:
+        with self._lock:
+            entry = self._usage.setdefault((stage, platform, model), dict.fromkeys(USAGE_FIELDS, 0))
+            for field in USAGE_FIELDS:
+                entry[field] += counts.get(field, 0)
+
+    def rows(self) -> List[Dict[str, Any]]:
+        """One row per stage/platform/model with its token counts and cost."""
+        with self._lock:
+            items = sorted(self._usage.items())
+        return [
+            {
+                "stage": stage,
+                "platform": platform,
+                "model": model,
+                **counts,
+                "cost_usd": cost(model, counts["prompt_tokens"], counts["completion_tokens"])
+            }
+            for (stage, platform, model), counts in items
+        ]
+
+    def summary(self) -> Dict[str, Any]:
+        rows = self.rows()
+        return {
+            **{field: sum(row[field] for row in rows) for field in USAGE_FIELDS},
+            "cost_usd": round(sum(row["cost_usd"] or 0.0 for row in rows), 6)
+        }